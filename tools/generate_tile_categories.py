@@ -3,50 +3,43 @@
 Odyssey Tile Categorization System
 Generates comprehensive tile categories for the Tiled tileset
 Based on standard Odyssey map editor layer classifications
+
+Categories come from tools/python/tile_classifier.py, which labels every tile
+of tiles_part1/2.png from its color and alpha features, so one enhanced .tsx
+is written per sheet part. Run from the repository root.
 """
 
-def generate_tile_categories():
-    """Generate XML entries for all 3584 Odyssey tiles with proper categorization"""
-
-    # Define tile ranges based on Odyssey tileset structure
-    tile_categories = {
-        # BOTTOM LAYER - Base terrain tiles (typically first few rows)
-        'bottom': {
-            'grass': list(range(0, 49)),  # First 7 rows - grass variants
-            'dirt': list(range(49, 98)),  # Next 7 rows - dirt variants
-            'water': list(range(98, 147)), # Next 7 rows - water variants
-            'stone': list(range(147, 196)), # Next 7 rows - stone variants
-            'sand': list(range(196, 245)), # Sand terrain
-            'snow': list(range(245, 294)), # Snow terrain
-            'lava': list(range(294, 343)), # Lava terrain
-        },
-
-        # MIDDLE LAYER - Objects and structures
-        'middle': {
-            'buildings': list(range(343, 700)),    # Buildings, castles, houses
-            'vegetation': list(range(700, 1050)),  # Trees, bushes, plants
-            'obstacles': list(range(1050, 1400)), # Rocks, boulders, barriers
-            'furniture': list(range(1400, 1750)), # Indoor objects, furniture
-            'decorations': list(range(1750, 2100)), # Decorative objects
-            'paths': list(range(2100, 2450)),     # Roads, bridges, pathways
-        },
-
-        # FOREGROUND LAYER - Effects and overlays
-        'foreground': {
-            'effects': list(range(2450, 2800)),    # Visual effects, magic
-            'overlays': list(range(2800, 3150)),   # Shadows, lighting
-            'details': list(range(3150, 3500)),    # Small details, particles
-            'ui_elements': list(range(3500, 3584)), # UI related tiles
-        }
-    }
+import argparse
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "python"))
+from tile_classifier import CATEGORIES, LAYERS, load_labels
+from tile_features import COLUMNS, TILE_SHEETS, TILE_SIZE
+
+OUTPUT_FORMAT = "tiled_projects/odyssey_tileset_part{part}_enhanced.tsx"
+WANG_COLORS = OrderedDict([
+    ("grass", "#4c7c2f"), ("dirt", "#8b4513"), ("water", "#0066cc"), ("stone", "#666666"),
+    ("sand", "#f4a460"), ("snow", "#ffffff"), ("lava", "#ff4500"),
+])
+
+def generate_tile_categories(labels, confidence, first, count):
+    """Generate XML entries for tiles first..first+count-1 of the classified sheet, grouped by layer and category"""
 
     xml_entries = []
 
-    for layer_type, categories in tile_categories.items():
+    for layer_type, categories in LAYERS.items():
         xml_entries.append(f'\n <!-- {layer_type.upper()} LAYER TILES -->')
 
-        for category, tile_ids in categories.items():
-            xml_entries.append(f'\n <!-- {category.title()} tiles -->')
+        for category in categories:
+            tile_ids = np.flatnonzero(labels[first:first + count] == CATEGORIES.index(category))
+            if not len(tile_ids):
+                continue
+            xml_entries.append(f'\n <!-- {category.title()} tiles ({len(tile_ids)}) -->')
 
             for tile_id in tile_ids:
                 description = f"{category.replace('_', ' ').title()} tile"
@@ -62,6 +55,7 @@ def generate_tile_categories():
   <properties>
    <property name="layer_type" value="{layer_type}"/>
    <property name="category" value="{category}"/>
+   <property name="confidence" type="float" value="{confidence[first + tile_id]:.2f}"/>
    <property name="description" value="{description}"/>
   </properties>
  </tile>'''
@@ -69,38 +63,43 @@ def generate_tile_categories():
 
     return '\n'.join(xml_entries)
 
-def create_enhanced_tileset():
-    """Create enhanced tileset XML with all tile categorizations"""
+def terrain_tiles(labels, confidence, first, count):
+    """Most confident tile id of each terrain within the part, -1 when the part has none"""
+    tiles = OrderedDict()
+    for terrain in LAYERS['bottom']:
+        chosen = np.where(labels[first:first + count] == CATEGORIES.index(terrain),
+                          confidence[first:first + count], -1)
+        tiles[terrain] = int(chosen.argmax()) if chosen.max() >= 0 else -1
+    return tiles
+
+def create_enhanced_tileset(part, image_path, output_path, labels, confidence, first, count):
+    """Create enhanced tileset XML for one sheet part with its classified tiles"""
 
-    header = '''<?xml version="1.0" encoding="UTF-8"?>
-<tileset version="1.10" tiledversion="1.11.0" name="Odyssey Tileset (Enhanced)" tilewidth="32" tileheight="32" tilecount="3584" columns="7">
- <image source="C:/Users/dougd/GoldenSunMMO/GoldenSunMMO-Dev/assets-odyssey/tiles.png" width="224" height="16384"/>
+    with Image.open(image_path) as image:
+        width, height = image.size
+    image_source = os.path.relpath(image_path, os.path.dirname(output_path)).replace(os.sep, "/")
+    terrains = terrain_tiles(labels, confidence, first, count)
+
+    header = f'''<?xml version="1.0" encoding="UTF-8"?>
+<tileset version="1.10" tiledversion="1.11.0" name="Odyssey Tiles Part {part} (Enhanced)" tilewidth="{TILE_SIZE}" tileheight="{TILE_SIZE}" tilecount="{count}" columns="{COLUMNS}">
+ <image source="{image_source}" width="{width}" height="{height}"/>
 
  <!-- Terrain Types for Auto-tiling -->
- <terraintypes>
-  <terrain name="Grass" tile="0"/>
-  <terrain name="Dirt" tile="49"/>
-  <terrain name="Water" tile="98"/>
-  <terrain name="Stone" tile="147"/>
-  <terrain name="Sand" tile="196"/>
-  <terrain name="Snow" tile="245"/>
-  <terrain name="Lava" tile="294"/>
- </terraintypes>'''
-
-    tile_definitions = generate_tile_categories()
+ <terraintypes>'''
+    for terrain, tile in terrains.items():
+        header += f'\n  <terrain name="{terrain.title()}" tile="{tile}"/>'
+    header += '\n </terraintypes>'
+
+    tile_definitions = generate_tile_categories(labels, confidence, first, count)
 
     footer = '''
 
  <!-- Wang Sets for Terrain Transitions -->
  <wangsets>
-  <wangset name="Terrain Transitions" type="corner" tile="-1">
-   <wangcolor name="Grass" color="#4c7c2f" tile="0" probability="1"/>
-   <wangcolor name="Dirt" color="#8b4513" tile="49" probability="1"/>
-   <wangcolor name="Water" color="#0066cc" tile="98" probability="1"/>
-   <wangcolor name="Stone" color="#666666" tile="147" probability="1"/>
-   <wangcolor name="Sand" color="#f4a460" tile="196" probability="1"/>
-   <wangcolor name="Snow" color="#ffffff" tile="245" probability="1"/>
-   <wangcolor name="Lava" color="#ff4500" tile="294" probability="1"/>
+  <wangset name="Terrain Transitions" type="corner" tile="-1">'''
+    for terrain, color in WANG_COLORS.items():
+        footer += f'\n   <wangcolor name="{terrain.title()}" color="{color}" tile="{terrains[terrain]}" probability="1"/>'
+    footer += '''
   </wangset>
  </wangsets>
 
@@ -126,20 +125,38 @@ def create_enhanced_tileset():
 
     return header + tile_definitions + footer
 
-# Generate the enhanced tileset
-if __name__ == "__main__":
-    enhanced_tileset = create_enhanced_tileset()
-
-    # Write to file
-    output_path = "C:/Users/dougd/GoldenSunMMO/GoldenSunMMO-Dev/tiled_projects/odyssey_tileset_enhanced.tsx"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(enhanced_tileset)
+def main():
+    parser = argparse.ArgumentParser(description='Generate categorized Odyssey tilesets from classified tiles')
+    parser.add_argument('--output', default=OUTPUT_FORMAT, help='Output path, {part} is the sheet part number')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute the tile feature table')
+    args = parser.parse_args()
+
+    table, labels, confidence = load_labels(use_cache=not args.no_cache)
+    part_counts = np.bincount(table["part"], minlength=len(TILE_SHEETS))
+
+    first = 0
+    for part, (image_path, count) in enumerate(zip(TILE_SHEETS, part_counts), 1):
+        output_path = args.output.format(part=part)
+        enhanced_tileset = create_enhanced_tileset(part, image_path, output_path, labels, confidence, first, count)
+
+        # Write to file
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(enhanced_tileset)
+
+        part_labels = labels[first:first + count]
+        print(f"Enhanced tileset created: {output_path}")
+        print(f"- {count} tiles, {int((part_labels > 0).sum())} categorized:")
+        for layer_type, categories in LAYERS.items():
+            found = ", ".join(f"{category} {int((part_labels == CATEGORIES.index(category)).sum())}"
+                              for category in categories)
+            print(f"  {layer_type}: {found}")
+        first += count
 
-    print(f"Enhanced tileset created: {output_path}")
     print("Features:")
-    print("- 3584 tiles categorized by layer type (bottom/middle/foreground)")
-    print("- Categories: grass, dirt, water, stone, sand, snow, lava terrains")
-    print("- Objects: buildings, vegetation, obstacles, furniture, decorations, paths")
-    print("- Effects: visual effects, overlays, details, UI elements")
-    print("- Wang sets for auto-tiling terrain transitions")
-    print("- Object types for spawn points, exits, NPCs, monsters")
\ No newline at end of file
+    print("- Categories from per-tile color/alpha features, with a confidence property")
+    print("- Terrain types and wang colors use the most confident tile of each terrain")
+    print("- Object types for spawn points, exits, NPCs, monsters")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
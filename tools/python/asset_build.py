@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Incremental Asset Build
+Runs the asset tools as a dependency graph instead of by hand. Each step
+declares its command, input files (globs allowed) and outputs (files or
+directories). Steps depend on the steps whose outputs they read.
+
+A step reruns only when it is stale: never built, command changed, an
+input or the tool's code (the script and the local modules it imports)
+changed by content hash, or an output is missing or was modified since the
+build. Inputs are fingerprinted when a step is about to start, so a step
+whose upstream reran but produced identical files is not rerun. Independent
+steps run in parallel. Fingerprints are kept in the asset cache. Steps
+whose tool has its own process or thread pool get "--workers" set so the
+steps running at once share the CPUs instead of each starting one worker
+per CPU.
+
+Steps with missing source inputs (the Odyssey BMPs are not in the tree)
+are skipped; their existing outputs then serve as sources downstream.
+
+Usage:
+  python tools/python/asset_build.py                  # bring everything up to date
+  python tools/python/asset_build.py atlas --explain  # one target (and its upstream), with reasons
+  python tools/python/asset_build.py --dry-run        # show what would run
+"""
+
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
+
+from asset_cache import CACHE_DIR, cache_path, file_hash
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(TOOLS_DIR))
+BUILD_VERSION = 1
+TILE_PARTS = ["assets-odyssey/tiles_part1.png", "assets-odyssey/tiles_part2.png"]
+SPRITE_PARTS = ["assets-odyssey/sprites_part1.png", "assets-odyssey/sprites_part2.png"]
+
+# name -> command (script and arguments, run from the repository root), inputs, outputs,
+# and workers_flag for tools with their own worker pool
+STEPS = OrderedDict([
+    ("sheets", {
+        "command": ["tools/python/asset_pipeline.py"],
+        "inputs": ["assets-odyssey/tiles.bmp", "assets-odyssey/sprites.bmp", "assets-odyssey/interface.bmp"],
+        "outputs": TILE_PARTS + SPRITE_PARTS + ["assets-odyssey/interface.png"],
+    }),
+    ("tile_categories", {
+        "command": ["tools/generate_tile_categories.py"],
+        "inputs": TILE_PARTS,
+        "outputs": ["tiled_projects/odyssey_tileset_part1_enhanced.tsx",
+                    "tiled_projects/odyssey_tileset_part2_enhanced.tsx"],
+    }),
+    ("tile_pyramid", {
+        "command": ["tools/python/tile_pyramid.py"],
+        "inputs": TILE_PARTS,
+        "outputs": ["assets/tile_pyramid"],
+        "workers_flag": "--workers",
+    }),
+    ("atlas", {
+        "command": ["tools/python/atlas_pack.py"],
+        "inputs": TILE_PARTS + SPRITE_PARTS,
+        "outputs": ["assets-odyssey/atlas"],
+    }),
+    ("map_renders", {
+        "command": ["tools/python/tmx_render.py"],
+        # The tilesets the maps reference; not a *.tsx glob, which would also
+        # match the *_enhanced.tsx outputs of tile_categories
+        "inputs": ["maps/World Maps/*", "tiled_projects/collision_tileset.tsx",
+                   "tiled_projects/odyssey_tileset_part1.tsx", "tiled_projects/odyssey_tileset_part2.tsx"] + TILE_PARTS,
+        "outputs": ["assets/map_renders"],
+        "workers_flag": "--workers",
+    }),
+])
+
+def expand(patterns):
+    """Declared paths with globs expanded (sorted); plain paths are kept even when missing."""
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return paths
+
+def fingerprint(path):
+    """Content hash of a file, or of every file under a directory; None when missing."""
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for folder, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(folder, name)
+                digest.update(f"{os.path.relpath(file_path, path)}:{file_hash(file_path)}\n".encode())
+        return "dir:" + digest.hexdigest()
+    if os.path.exists(path):
+        return file_hash(path)
+    return None
+
+def code_files(script):
+    """The script plus every tools/python module it imports, directly or not."""
+    found, queue = [], [script]
+    while queue:
+        path = queue.pop()
+        if path in found or not os.path.exists(path):
+            continue
+        found.append(path)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else \
+                [node.module] if isinstance(node, ast.ImportFrom) and node.module and not node.level else []
+            for name in names:
+                module = os.path.join(TOOLS_DIR, name.split(".")[0] + ".py")
+                if os.path.exists(module):
+                    queue.append(os.path.relpath(module))
+    return sorted(found)
+
+def dependencies(steps):
+    """{step: set of steps producing one of its inputs}"""
+    deps = {}
+    for name, step in steps.items():
+        deps[name] = set()
+        for other, other_step in steps.items():
+            if other == name:
+                continue
+            for output in other_step["outputs"]:
+                if any(output == pattern or fnmatch(output, pattern) or pattern.startswith(output + "/")
+                       for pattern in step["inputs"]):
+                    deps[name].add(other)
+    return deps
+
+def topological(deps, targets):
+    """targets and everything upstream of them, in dependency order. Raises ValueError on a cycle."""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle through '{name}'")
+        visiting.add(name)
+        for dep in sorted(deps[name]):
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for target in targets:
+        visit(target)
+    return order
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return state.get("steps", {}) if state.get("version") == BUILD_VERSION else {}
+
+def save_state(path, steps):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": BUILD_VERSION, "steps": steps}, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def signature(step):
+    """Current command, input and code fingerprints of a step"""
+    return {
+        "command": step["command"],
+        "inputs": {path: fingerprint(path) for path in expand(step["inputs"])},
+        "code": {path: fingerprint(path) for path in code_files(step["command"][0])},
+    }
+
+def compare(kind, old, new):
+    reasons = []
+    for path in sorted(set(old) | set(new)):
+        if path not in old:
+            reasons.append(f"{kind} added: {path}")
+        elif path not in new:
+            reasons.append(f"{kind} removed: {path}")
+        elif old[path] != new[path]:
+            reasons.append(f"{kind} changed: {path}")
+    return reasons
+
+def stale_reasons(step, current, record):
+    """Why a step has to run (empty when it is up to date)."""
+    if record is None:
+        return ["never built"]
+    reasons = []
+    if record["command"] != current["command"]:
+        reasons.append("command changed")
+    reasons += compare("input", record["inputs"], current["inputs"])
+    reasons += compare("code", record["code"], current["code"])
+    for path in expand(step["outputs"]):
+        now = fingerprint(path)
+        if now is None:
+            reasons.append(f"output missing: {path}")
+        elif now != record["outputs"].get(path):
+            reasons.append(f"output modified since the last build: {path}")
+    return reasons
+
+def run_command(command):
+    """Worker: run a step's script from the repository root. Returns (return code, output, seconds)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + command, capture_output=True, text=True, cwd=REPO_ROOT)
+    return result.returncode, result.stdout + result.stderr, time.perf_counter() - start
+
+def build(targets=None, jobs=None, force=False, dry_run=False, explain=False, verbose=False,
+          state_path=None, steps=STEPS):
+    """
+    Bring targets (default: every step) and their upstream steps up to date.
+    Returns {step: status}; status is "ran", "up to date", "skipped",
+    "failed", "blocked" or "would run" (dry_run).
+    """
+    state_path = state_path or cache_path("build", "state", ".json", CACHE_DIR)
+    deps = dependencies(steps)
+    order = topological(deps, targets or list(steps))
+    state = load_state(state_path)
+    status = {}
+    running = {}    # future -> step name
+    signatures = {}  # step name -> fingerprints taken when it started
+
+    def report(name, text, reasons=()):
+        print(f"{name}: {text}")
+        if explain:
+            for reason in reasons:
+                print(f"    - {reason}")
+
+    def start_ready(pool):
+        for name in order:
+            if name in status or name in running.values() or not all(dep in status for dep in deps[name]):
+                continue
+            step = steps[name]
+            upstream = [dep for dep in sorted(deps[name]) if status[dep] in ("failed", "blocked")]
+            if upstream:
+                status[name] = "blocked"
+                report(name, "blocked", [f"upstream step {dep} {status[dep]}" for dep in upstream])
+                continue
+            missing = [path for path in expand(step["inputs"]) if not os.path.exists(path)]
+            if missing:
+                have_outputs = all(os.path.exists(path) for path in expand(step["outputs"]))
+                status[name] = "skipped" if have_outputs else "blocked"
+                report(name, "skipped, using existing outputs" if have_outputs else "blocked",
+                       [f"input missing: {path}" for path in missing])
+                continue
+
+            current = signature(step)
+            reasons = ["forced"] if force else stale_reasons(step, current, state.get(name))
+            rerun_upstream = [dep for dep in sorted(deps[name]) if status[dep] == "would run"]
+            if dry_run and not reasons and rerun_upstream:
+                reasons = [f"may change: upstream step {dep} would run" for dep in rerun_upstream]
+            if not reasons:
+                status[name] = "up to date"
+                report(name, "up to date", ["inputs, code and outputs match the last build"])
+            elif dry_run:
+                status[name] = "would run"
+                report(name, "would run", reasons)
+            else:
+                report(name, "running", reasons)
+                command = step["command"]
+                if "workers_flag" in step:
+                    command = command + [step["workers_flag"], str(child_workers)]
+                running[pool.submit(run_command, command)] = name
+                signatures[name] = current
+
+    workers = jobs or os.cpu_count() or 1
+    child_workers = max(1, (os.cpu_count() or 1) // workers)
+    with ThreadPoolExecutor(workers) as pool:
+        start_ready(pool)
+        while running:
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                returncode, output, seconds = future.result()
+                outputs = {path: fingerprint(path) for path in expand(steps[name]["outputs"])}
+                missing = [path for path, value in outputs.items() if value is None]
+                lines = output.rstrip().splitlines()
+                if lines and (verbose or returncode):
+                    for line in lines if verbose else lines[-20:]:
+                        print(f"    | {line}")
+                if returncode or missing:
+                    status[name] = "failed"
+                    problem = f"exit code {returncode}" if returncode else f"did not write {', '.join(missing)}"
+                    print(f"{name}: FAILED after {seconds:.1f}s ({problem})")
+                    state.pop(name, None)
+                else:
+                    status[name] = "ran"
+                    print(f"{name}: done in {seconds:.1f}s")
+                    state[name] = dict(signatures[name], outputs=outputs)
+                save_state(state_path, state)
+            start_ready(pool)
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild stale asset steps in dependency order')
+    parser.add_argument('targets', nargs='*', help=f"Steps to bring up to date (default: all of {', '.join(STEPS)})")
+    parser.add_argument('--explain', action='store_true', help='Show why each step runs or is skipped')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would run')
+    parser.add_argument('--force', action='store_true', help='Run the selected steps even when up to date')
+    parser.add_argument('-j', '--jobs', type=int, help='Steps run at once (default: CPU count)')
+    parser.add_argument('--verbose', action='store_true', help="Print every step's output")
+    args = parser.parse_args()
+
+    unknown = [target for target in args.targets if target not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+
+    os.chdir(REPO_ROOT)  # Step paths are relative to the repository root
+    start = time.perf_counter()
+    status = build(args.targets, args.jobs, args.force, args.dry_run, args.explain, args.verbose)
+    elapsed = time.perf_counter() - start
+
+    counts = OrderedDict()
+    for value in status.values():
+        counts[value] = counts.get(value, 0) + 1
+    print(f"\n{len(status)} steps in {elapsed:.1f}s: " + ", ".join(f"{count} {value}" for value, count in counts.items()))
+    return 1 if "failed" in counts else 0
+
+if __name__ == "__main__":
+    exit(main())
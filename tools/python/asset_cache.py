@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Content-Hash Asset Cache
+Derived data (masks, tables, previews) stored under .asset_cache/ and keyed
+by the SHA-256 of the source file plus the parameters that produced it, so
+results are reused until the sheet's pixels actually change.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+CACHE_DIR = ".asset_cache"
+HASH_BLOCK = 1 << 20
+
+_hash_memo = {}
+
+def file_hash(path):
+    """SHA-256 hex digest of a file, memoized per (path, size, mtime) in this process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+        _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+def files_hash(paths):
+    """One digest for a group of files (order matters), e.g. the parts of a split sheet."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+def cache_key(source_hash, **params):
+    """Short key combining a source hash with the parameters of the computation."""
+    text = json.dumps(params, sort_keys=True)
+    return f"{source_hash[:16]}-{hashlib.sha256(text.encode()).hexdigest()[:8]}"
+
+def cache_path(kind, key, suffix=".npz", cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, kind, key + suffix)
+
+def load_arrays(kind, key, cache_dir=CACHE_DIR):
+    """Arrays stored by save_arrays() as a dict, or None on a miss."""
+    path = cache_path(kind, key, cache_dir=cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None  # Truncated or foreign file: recompute
+
+def save_arrays(kind, key, arrays, cache_dir=CACHE_DIR):
+    """Store named arrays atomically (write to a temp file, then rename)."""
+    path = cache_path(kind, key, cache_dir=cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp.npz"
+    np.savez_compressed(temp_path, **arrays)
+    os.replace(temp_path, path)
+    return path
+
+def cached_arrays(kind, key, compute, cache_dir=CACHE_DIR):
+    """
+    Return (arrays, hit). On a miss compute() is called; it must return a
+    dict of arrays, which is stored before being returned.
+    """
+    arrays = load_arrays(kind, key, cache_dir)
+    if arrays is not None:
+        return arrays, True
+    arrays = compute()
+    save_arrays(kind, key, arrays, cache_dir)
+    return arrays, False
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the asset cache')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Cache directory')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached entry')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.cache_dir):
+        print(f"No cache at '{args.cache_dir}'")
+        return 0
+    if args.clear:
+        shutil.rmtree(args.cache_dir)
+        print(f"Cleared '{args.cache_dir}'")
+        return 0
+
+    for kind in sorted(os.listdir(args.cache_dir)):
+        kind_dir = os.path.join(args.cache_dir, kind)
+        files = os.listdir(kind_dir)
+        size = sum(os.path.getsize(os.path.join(kind_dir, name)) for name in files)
+        print(f"{kind:<20} {len(files):>5} entries {size:>12,} bytes")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
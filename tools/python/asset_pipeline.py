@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Odyssey Asset Pipeline
+Single-pass replacement for the convert_assets -> fix_tile_transparency ->
+fix_tile_seams -> split_tileset/split_sprites chain. Each source BMP is decoded
+once, every stage runs in memory, and each output PNG is encoded once.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from fix_tile_seams import fix_seams_strips
+from fix_tile_transparency import make_black_transparent_array
+from indexed_png import color_keys, rgba_array, save_png
+from sheet_strips import chunk_ranges
+
+# Source sheet -> stages applied after decoding, in order
+SHEETS = OrderedDict([
+    ("tiles", ("convert", "color_key", "seams", "chunk")),
+    ("sprites", ("convert", "color_key", "chunk")),
+    ("interface", ("convert",)),
+])
+
+def decode(path):
+    """Fully decode an image file and release the file handle."""
+    with Image.open(path) as img:
+        img.load()
+    return img
+
+class StageTimer:
+    """Accumulates wall time per stage name across all sheets."""
+
+    def __init__(self):
+        self.totals = OrderedDict()
+
+    def run(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - start
+        return result
+
+def process_sheet(name, stages, source_dir, output_dir, timer, indexed=False):
+    """
+    Run one sheet through its stages. Returns list of (path, bytes) written.
+    indexed writes outputs with <= 256 colors as palette PNGs.
+    """
+    source_path = os.path.join(source_dir, f"{name}.bmp")
+    if not os.path.exists(source_path):
+        print(f"File not found: {source_path}")
+        return []
+
+    print(f"\n=== {name.upper()} ===")
+    img = timer.run("decode", decode, source_path)
+    print(f"Decoded {source_path}: {img.size[0]}x{img.size[1]} {img.mode}")
+
+    if "convert" in stages and img.mode != "RGB":
+        img = timer.run("convert", img.convert, "RGB")
+
+    if "color_key" not in stages:
+        # Plain conversion output, same settings as convert_assets.py
+        output_path = os.path.join(output_dir, f"{name}.png")
+        if indexed:
+            info = timer.run("encode", save_png, np.asarray(img), output_path, True)
+            print(f"  Indexed: {info['colors']} color palette" if info["mode"] == "exact"
+                  else "  Indexed: more than 256 colors, kept as RGB")
+        else:
+            timer.run("encode", lambda: img.save(output_path, "PNG", optimize=True))
+        return [(output_path, os.path.getsize(output_path))]
+
+    pixels = timer.run("convert", lambda: np.array(img.convert("RGBA")))
+    img.close()
+
+    cleared = timer.run("color_key", make_black_transparent_array, pixels)
+    print(f"Color key: {cleared} black pixels made transparent")
+
+    written = []
+
+    def write(rows, output_path):
+        if indexed:
+            info = timer.run("encode", save_png, rows, output_path, True)
+            mode = f", {info['colors']} color palette" if info["mode"] == "exact" else ""
+        else:
+            image = timer.run("chunk", Image.fromarray, rows, "RGBA")
+            timer.run("encode", image.save, output_path, "PNG")
+            mode = ""
+        size = os.path.getsize(output_path)
+        written.append((output_path, size))
+        print(f"  Saved: {output_path} ({rows.shape[0]}px, {size:,} bytes{mode})")
+
+    if "chunk" in stages:
+        # The chain keeps the color-keyed full sheet next to its parts; seams
+        # were only ever fixed in the parts, so write it before that stage
+        write(pixels, os.path.join(output_dir, f"{name}.png"))
+
+    if "seams" in stages:
+        fixed = timer.run("seams", fix_seams_strips, pixels)
+        print(f"Seam fix: {fixed} semi-transparent pixels snapped")
+
+    ranges = list(chunk_ranges(pixels.shape[0])) if "chunk" in stages else [(0, pixels.shape[0])]
+    for chunk_idx, (start_y, end_y) in enumerate(ranges):
+        suffix = f"_part{chunk_idx + 1}" if "chunk" in stages else ""
+        write(pixels[start_y:end_y], os.path.join(output_dir, f"{name}{suffix}.png"))
+
+    return written
+
+def run_pipeline(source_dir, output_dir, sheets=None, indexed=False):
+    """Run the fused pipeline. Returns (stage timings, list of (path, bytes))."""
+    os.makedirs(output_dir, exist_ok=True)
+    timer = StageTimer()
+    written = []
+    for name, stages in SHEETS.items():
+        if sheets and name not in sheets:
+            continue
+        written.extend(process_sheet(name, stages, source_dir, output_dir, timer, indexed))
+    return timer.totals, written
+
+def run_legacy_chain(source_dir, fused_outputs=()):
+    """
+    Run the original script chain in a scratch copy of source_dir.
+    Returns (step timings, list of (path, bytes) counting every file each step
+    wrote, list of fused outputs whose pixels differ from the chain's).
+    """
+    import convert_assets
+    import fix_tile_seams
+    import fix_tile_transparency
+    import split_sprites
+    import split_tileset
+
+    def transparency():
+        for name in ("tiles", "sprites"):
+            sheet_input = fix_tile_transparency.prepare_sheet(name)
+            if sheet_input:
+                fix_tile_transparency.make_black_transparent(sheet_input, fix_tile_transparency.SHEETS[name][1])
+
+    def seams():
+        for part in sorted(os.listdir("assets-odyssey")):
+            if part.startswith("tiles_part"):
+                path = os.path.join("assets-odyssey", part)
+                fix_tile_seams.fix_seams(path, path)
+
+    steps = [
+        ("convert_assets", convert_assets.main),
+        ("fix_tile_transparency", transparency),
+        ("split_tileset", split_tileset.split_tileset),
+        ("split_sprites", split_sprites.split_sprites),
+        ("fix_tile_seams", seams),
+    ]
+
+    timings = OrderedDict()
+    written = []
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        scratch = os.path.join(workdir, "assets-odyssey")
+        os.makedirs(scratch)
+        for name in SHEETS:
+            bmp_path = os.path.join(source_dir, f"{name}.bmp")
+            if os.path.exists(bmp_path):
+                shutil.copy(bmp_path, scratch)
+
+        os.chdir(workdir)
+        try:
+            for step, func in steps:
+                before = {f: os.stat(os.path.join(scratch, f)).st_mtime_ns for f in os.listdir(scratch)}
+                start = time.perf_counter()
+                func()
+                timings[step] = time.perf_counter() - start
+                for f in sorted(os.listdir(scratch)):
+                    stat = os.stat(os.path.join(scratch, f))
+                    if f.endswith(".png") and before.get(f) != stat.st_mtime_ns:
+                        written.append((f"{step}:{f}", stat.st_size))
+        finally:
+            os.chdir(previous_cwd)
+
+        mismatches = []
+        for path in fused_outputs:
+            chain_path = os.path.join(scratch, os.path.basename(path))
+            if not os.path.exists(chain_path):
+                mismatches.append(path)
+                continue
+            with Image.open(path) as fused, Image.open(chain_path) as chain:
+                if fused.mode == "P":
+                    # Indexed output: compare visible RGBA (transparent pixels' RGB is dropped)
+                    same = np.array_equal(color_keys(rgba_array(fused)), color_keys(rgba_array(chain)))
+                else:
+                    same = np.array_equal(np.array(fused), np.array(chain))
+                if not same:
+                    mismatches.append(path)
+
+    return timings, written, mismatches
+
+def print_report(title, timings, written):
+    """Print per-stage times and bytes written."""
+    total_bytes = sum(size for _, size in written)
+    print(f"\n=== {title} ===")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<22} {seconds:8.3f}s")
+    print(f"  {'total':<22} {sum(timings.values()):8.3f}s")
+    print(f"  Files written: {len(written)}, {total_bytes:,} bytes")
+    return total_bytes
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode, color-key, seam-fix and chunk Odyssey sheets in one pass')
+    parser.add_argument('--source-dir', default='assets-odyssey', help='Directory with sprites/tiles/interface BMPs')
+    parser.add_argument('--output-dir', default='assets-odyssey', help='Directory for the PNG outputs')
+    parser.add_argument('--sheet', action='append', choices=list(SHEETS), help='Only process this sheet (repeatable)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Also run the old script chain in a scratch directory and compare')
+    parser.add_argument('--indexed', action='store_true', help='Write sheets with <= 256 colors as palette PNGs')
+    args = parser.parse_args()
+
+    timings, written = run_pipeline(args.source_dir, args.output_dir, args.sheet, args.indexed)
+    fused_bytes = print_report("FUSED PIPELINE", timings, written)
+
+    if args.compare:
+        legacy_timings, legacy_written, mismatches = run_legacy_chain(
+            args.source_dir, [path for path, _ in written])
+        legacy_bytes = print_report("SCRIPT CHAIN", legacy_timings, legacy_written)
+        fused_time = sum(timings.values())
+        legacy_time = sum(legacy_timings.values())
+        print("\n=== COMPARISON ===")
+        print(f"  Time:  {legacy_time:.3f}s -> {fused_time:.3f}s ({legacy_time / max(fused_time, 1e-9):.1f}x)")
+        print(f"  Bytes: {legacy_bytes:,} -> {fused_bytes:,} ({legacy_bytes - fused_bytes:,} fewer bytes written)")
+        print(f"  Pixels: {'identical' if not mismatches else 'DIFFER in ' + ', '.join(mismatches)}")
+        return 1 if mismatches else 0
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Texture Atlas Packer
+Cuts the Odyssey sprite and tile sheets into cells, trims each cell's
+transparent border, drops empty and byte-identical cells, and packs the rest
+into power-of-two atlas pages with a skyline (bottom-left) packer.
+
+Next to the pages a JSON file describes every cell for Godot:
+  region  [x, y, w, h] of the trimmed pixels in the page (AtlasTexture.region)
+  margin  [offset_x, offset_y, cell_w - w, cell_h - h] (AtlasTexture.margin),
+          restoring the trimmed border so the cell keeps its original size
+  uv      [u0, v0, u1, v1] normalized page coordinates
+Cells that were identical share one region. The report compares the pages'
+RGBA8 size with the split sheets they replace.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from dedup_cells import DEDUP_SETS
+from sheet_strips import load_cells
+
+OUTPUT_DIR = "assets-odyssey/atlas"
+MAX_PAGE = 4096
+MIN_PAGE = 64
+PAGE_STEPS = 2  # Also try page caps of max / 2 and max / 4
+PADDING = 1  # Transparent pixels between packed regions (avoids filtering bleed)
+ATLAS_VERSION = 1
+
+def trim_boxes(cells):
+    """(n, 4) [x, y, w, h] bounding boxes of the visible pixels of each cell; w = h = 0 when empty."""
+    visible = cells[..., 3] > 0
+    rows, cols = visible.any(axis=2), visible.any(axis=1)
+    size = cells.shape[1]
+    top = rows.argmax(axis=1)
+    bottom = size - rows[:, ::-1].argmax(axis=1)
+    left = cols.argmax(axis=1)
+    right = cells.shape[2] - cols[:, ::-1].argmax(axis=1)
+    boxes = np.stack([left, top, right - left, bottom - top], axis=1)
+    boxes[~rows.any(axis=1)] = 0
+    return boxes
+
+class Skyline:
+    """Bottom-left skyline packer for one page: the skyline is a list of [x, y, width] segments."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.segments = [[0, 0, width]]
+
+    def find(self, w, h):
+        """(y, x, segment index) of the lowest, then leftmost, position for a w x h rect, or None."""
+        best = None
+        segments = self.segments
+        for i, (x, _, _) in enumerate(segments):
+            if x + w > self.width:
+                break
+            top, remaining, j = 0, w, i
+            while remaining > 0:
+                top = max(top, segments[j][1])
+                remaining -= segments[j][2]
+                j += 1
+            if top + h <= self.height and (best is None or (top, x) < best[:2]):
+                best = (top, x, i)
+        return best
+
+    def place(self, w, h):
+        """Reserve a w x h rect; returns its (x, y) or None when the page is full."""
+        found = self.find(w, h)
+        if found is None:
+            return None
+        y, x, i = found
+        segments = self.segments
+        segments.insert(i, [x, y + h, w])
+        # Cut the segments now under the new one
+        j = i + 1
+        while j < len(segments) and segments[j][0] < x + w:
+            end = segments[j][0] + segments[j][2]
+            if end <= x + w:
+                del segments[j]
+            else:
+                segments[j][2] = end - (x + w)
+                segments[j][0] = x + w
+                break
+        # Merge neighbours at the same height
+        j = max(i - 1, 0)
+        while j < len(segments) - 1:
+            if segments[j][1] == segments[j + 1][1]:
+                segments[j][2] += segments[j + 1][2]
+                del segments[j + 1]
+            else:
+                j += 1
+        return x, y
+
+    def used(self):
+        """(width, height) actually covered by placed rects"""
+        covered = [segment for segment in self.segments if segment[1] > 0]
+        if not covered:
+            return 0, 0
+        return max(x + w for x, _, w in covered), max(y for _, y, _ in covered)
+
+def next_pow2(value):
+    return 1 << max(0, int(value - 1).bit_length())
+
+def page_sizes(max_page=MAX_PAGE):
+    """Power-of-two (w, h) page sizes up to max_page, smallest area first, squarer first"""
+    sides = [1 << bit for bit in range(MIN_PAGE.bit_length() - 1, max_page.bit_length())]
+    return sorted(((w, h) for w in sides for h in sides if h <= w), key=lambda size: (size[0] * size[1], size[0]))
+
+def fill(rects, width, height, stop_on_miss=False):
+    """Skyline-pack (index, w, h) rects into one page: ([(index, x, y)], [left over indices], skyline)."""
+    skyline = Skyline(width, height)
+    placed, left = [], []
+    for i, w, h in rects:
+        position = skyline.place(w, h)
+        if position:
+            placed.append((i,) + position)
+        elif stop_on_miss:
+            return None, None, None
+        else:
+            left.append(i)
+    return placed, left, skyline
+
+def pack_pages(sizes, max_page=MAX_PAGE, padding=PADDING):
+    """
+    Pack (w, h) sizes, tallest first, into power-of-two pages. While the
+    rest does not fit one max_page page, a full max_page page is filled;
+    the rest then goes to the smallest power-of-two page that holds it.
+    Returns (placements [(page, x, y)], page sizes [(w, h)]).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    padded = {i: (sizes[i][0] + padding, sizes[i][1] + padding) for i in order}
+    placements = [None] * len(sizes)
+    pages = []
+    remaining = order
+    while remaining:
+        rects = [(i,) + padded[i] for i in remaining]
+        area = sum(w * h for _, w, h in rects)
+        placed = None
+        for width, height in page_sizes(max_page):
+            if width * height >= area:
+                placed, left, skyline = fill(rects, width, height, stop_on_miss=True)
+                if placed is not None:
+                    break
+        if placed is None:
+            placed, left, skyline = fill(rects, max_page, max_page)
+            if not placed:
+                raise ValueError(f"a {sizes[left[0]]} region does not fit a {max_page}px page")
+        page = len(pages)
+        for i, x, y in placed:
+            placements[i] = (page, x, y)
+        used_w, used_h = skyline.used()
+        pages.append((max(MIN_PAGE, next_pow2(used_w)), max(MIN_PAGE, next_pow2(used_h))))
+        remaining = left
+    return placements, pages
+
+def pack(sizes, max_page=MAX_PAGE, padding=PADDING, page_steps=PAGE_STEPS):
+    """
+    pack_pages with max_page and the next page_steps smaller caps, keeping
+    the layout with the least page area (fewer pages on ties). One half-empty
+    4096 page costs more memory than two well-filled 2048 ones.
+    """
+    best = None
+    for step in range(page_steps + 1):
+        cap = max_page >> step
+        if cap < MIN_PAGE or any(w + padding > cap or h + padding > cap for w, h in sizes):
+            break
+        placements, pages = pack_pages(sizes, cap, padding)
+        score = (sum(w * h for w, h in pages), len(pages))
+        if best is None or score < best[0]:
+            best = (score, placements, pages)
+    if best is None:
+        return pack_pages(sizes, max_page, padding)
+    return best[1], best[2]
+
+def build_atlas(name, sheet_paths, cols, output_dir=OUTPUT_DIR, max_page=MAX_PAGE, padding=PADDING):
+    """Trim, deduplicate, pack and write one sheet set. Returns the report dict."""
+    cells, part_counts = load_cells(sheet_paths, cols)
+    size = cells.shape[1]
+    boxes = trim_boxes(cells)
+
+    # Unique trimmed regions: identical cells (same box, same pixels) share one
+    regions, region_of = [], np.full(len(cells), -1)
+    seen = {}
+    for index in np.flatnonzero(boxes[:, 2] > 0):
+        x, y, w, h = boxes[index]
+        pixels = cells[index, y:y + h, x:x + w]
+        key = (int(w), int(h), pixels.tobytes())
+        if key not in seen:
+            seen[key] = len(regions)
+            regions.append(index)
+        region_of[index] = seen[key]
+
+    sizes = [(int(boxes[i, 2]), int(boxes[i, 3])) for i in regions]
+    placements, pages = pack(sizes, max_page, padding)
+
+    os.makedirs(output_dir, exist_ok=True)
+    page_files = []
+    for page, (width, height) in enumerate(pages):
+        canvas = np.zeros((height, width, 4), dtype=np.uint8)
+        for region, (region_page, x, y) in enumerate(placements):
+            if region_page == page:
+                index = regions[region]
+                bx, by, w, h = boxes[index]
+                canvas[y:y + h, x:x + w] = cells[index, by:by + h, bx:bx + w]
+        file_name = f"{name}_atlas_{page}.png"
+        Image.fromarray(canvas, "RGBA").save(os.path.join(output_dir, file_name), "PNG")
+        page_files.append({"file": file_name, "width": width, "height": height})
+
+    sprites = {}
+    starts = np.concatenate([[0], np.cumsum(part_counts)])
+    for index in np.flatnonzero(region_of >= 0):
+        part = int(np.searchsorted(starts, index, side="right")) - 1
+        local = int(index - starts[part])
+        page, x, y = placements[region_of[index]]
+        bx, by, w, h = (int(value) for value in boxes[index])
+        page_w, page_h = pages[page]
+        sprites[f"{name}_{part + 1}_{local // cols:03d}_{local % cols:02d}"] = {
+            "index": int(index),
+            "page": page,
+            "region": [x, y, w, h],
+            "margin": [bx, by, size - w, size - h],
+            "uv": [round(x / page_w, 6), round(y / page_h, 6), round((x + w) / page_w, 6), round((y + h) / page_h, 6)],
+        }
+
+    with open(os.path.join(output_dir, f"{name}_atlas.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": ATLAS_VERSION, "cell_size": size, "columns": cols, "padding": padding,
+                   "pages": page_files, "sprites": sprites}, f, indent=1)
+
+    source_bytes = 0
+    for path in sheet_paths:
+        with Image.open(path) as image:
+            source_bytes += image.width * image.height * 4
+    page_area = sum(width * height for width, height in pages)
+    return {
+        "cells": len(cells),
+        "sprites": len(sprites),
+        "regions": len(regions),
+        "pages": pages,
+        "occupancy": sum(w * h for w, h in sizes) / page_area if page_area else 0.0,
+        "source_bytes": source_bytes,
+        "atlas_bytes": page_area * 4,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack trimmed sprite/tile cells into power-of-two atlas pages')
+    parser.add_argument('--set', choices=list(DEDUP_SETS) + ['all'], default='all', help='Sheet set to pack')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Where pages and JSON are written')
+    parser.add_argument('--max-page', type=int, default=MAX_PAGE, help='Largest page side (power of two)')
+    parser.add_argument('--padding', type=int, default=PADDING, help='Pixels between regions')
+    args = parser.parse_args()
+
+    names = list(DEDUP_SETS) if args.set == 'all' else [args.set]
+    for name in names:
+        config = DEDUP_SETS[name]
+        start = time.perf_counter()
+        report = build_atlas(name, config["sheets"], config["columns"], args.output_dir, args.max_page, args.padding)
+        elapsed = time.perf_counter() - start
+
+        saved = report["source_bytes"] - report["atlas_bytes"]
+        print(f"{name}: {report['sprites']} non-empty cells of {report['cells']} -> "
+              f"{report['regions']} unique trimmed regions ({elapsed:.2f}s)")
+        print(f"  Pages: {', '.join(f'{w}x{h}' for w, h in report['pages'])}, "
+              f"occupancy {report['occupancy'] * 100:.1f}%")
+        print(f"  VRAM (RGBA8): {report['source_bytes'] / 2**20:.1f}MB in split sheets -> "
+              f"{report['atlas_bytes'] / 2**20:.1f}MB in atlas pages "
+              f"({saved / 2**20:.1f}MB, {saved / report['source_bytes'] * 100:.0f}% saved)")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the component labeling engine against the old flood fill
+Runs the original find_sprite_grid (Python stack flood fill seeded on every
+second pixel) and the run-based labeling on a crop of the sprite sheet and on
+a synthetic sheet with thin sprites. Reports time, traced peak memory and
+how many rectangles agree. A full-seed flood fill (4 and 8 neighbours) is the
+exact reference.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from component_labels import component_boxes, image_mask
+
+def is_black_pixel(pixel, threshold=30):
+    """Check if a pixel is considered black."""
+    if isinstance(pixel, (list, tuple)):
+        return all(c <= threshold for c in pixel[:3])
+    return pixel <= threshold
+
+def legacy_find_sprite_grid(image, min_sprite_size=8, step=2, connectivity=4):
+    """Original flood fill; step=1 seeds every pixel, making it exact."""
+    width, height = image.size
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    neighbours = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if connectivity == 8:
+        neighbours += [(-1, -1), (1, -1), (-1, 1), (1, 1)]
+    boxes = []
+    visited = [[False for _ in range(width)] for _ in range(height)]
+
+    def flood_fill_bounds(start_x, start_y):
+        stack = [(start_x, start_y)]
+        min_x = max_x = start_x
+        min_y = max_y = start_y
+        while stack:
+            x, y = stack.pop()
+            if x < 0 or x >= width or y < 0 or y >= height or visited[y][x]:
+                continue
+            if is_black_pixel(image.getpixel((x, y))):
+                continue
+            visited[y][x] = True
+            min_x = min(min_x, x)
+            max_x = max(max_x, x)
+            min_y = min(min_y, y)
+            max_y = max(max_y, y)
+            for dx, dy in neighbours:
+                stack.append((x + dx, y + dy))
+        return min_x, min_y, max_x - min_x + 1, max_y - min_y + 1
+
+    for y in range(0, height, step):
+        for x in range(0, width, step):
+            if not visited[y][x] and not is_black_pixel(image.getpixel((x, y))):
+                sprite_x, sprite_y, sprite_w, sprite_h = flood_fill_bounds(x, y)
+                if sprite_w >= min_sprite_size and sprite_h >= min_sprite_size:
+                    boxes.append((sprite_x, sprite_y, sprite_w, sprite_h))
+    return boxes
+
+def thin_sprite_sheet(width=512, height=512, seed=0):
+    """Blocky sprites plus one-pixel outlines and diagonals on black."""
+    rng = np.random.default_rng(seed)
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(60):
+        x, y = rng.integers(0, width - 24), rng.integers(0, height - 24)
+        w, h = rng.integers(8, 24, size=2)
+        pixels[y:y + h, x:x + w] = rng.integers(40, 256, size=3)
+    for _ in range(40):
+        # Outlines on odd rows/columns contain no even (x, y) seed pixel
+        x, y = rng.integers(0, (width - 24) // 2) * 2 + 1, rng.integers(0, (height - 24) // 2) * 2 + 1
+        w, h = rng.integers(4, 10, size=2) * 2 + 1
+        pixels[y, x:x + w] = pixels[y + h - 1, x:x + w] = 200
+        pixels[y:y + h, x] = pixels[y:y + h, x + w - 1] = 200
+        if rng.random() < 0.5:
+            pixels[y + 2 + np.arange(h - 4), x + 2 + np.arange(h - 4) % (w - 4)] = 120  # Diagonal inside
+    return Image.fromarray(pixels, "RGB")
+
+def measure(func, *args):
+    """Returns (result, seconds, traced peak MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark connected-component labeling for splice --method flood')
+    parser.add_argument('--sheet', default='assets-odyssey/sprites_part1.png', help='Real sheet to crop')
+    parser.add_argument('--rows', type=int, default=1024, help='Rows of the real sheet for the legacy run')
+    parser.add_argument('--min-size', type=int, default=8, help='Minimum sprite width and height')
+    args = parser.parse_args()
+
+    sheet = Image.open(args.sheet).convert("RGB")
+    cases = {
+        "thin synthetic": thin_sprite_sheet(),
+        f"sheet {sheet.width}x{args.rows}": sheet.crop((0, 0, sheet.width, args.rows)),
+    }
+
+    print("=== COMPONENT LABELING BENCHMARK ===")
+    print(f"{'case':<20} {'method':<16} {'boxes':>6} {'time':>9} {'peak mem':>9}  agreement")
+    ok = True
+    for name, image in cases.items():
+        exact = {}
+        for connectivity in (4, 8):
+            reference, _, _ = measure(legacy_find_sprite_grid, image, args.min_size, 1, connectivity)
+            boxes, elapsed, peak = measure(lambda: component_boxes(image_mask(image), connectivity, args.min_size))
+            exact[connectivity] = set(boxes)
+            match = sorted(boxes) == sorted(reference)
+            ok &= match
+            print(f"{name:<20} {f'labels {connectivity}-conn':<16} {len(boxes):>6} {elapsed:8.3f}s "
+                  f"{peak:7.1f}MB  {'PASS' if match else 'FAIL'} vs full-seed flood fill")
+
+        legacy, elapsed, peak = measure(legacy_find_sprite_grid, image, args.min_size)
+        found = len(set(legacy) & exact[4])
+        print(f"{name:<20} {'legacy flood':<16} {len(legacy):>6} {elapsed:8.3f}s {peak:7.1f}MB  "
+              f"{found}/{len(exact[4])} exact boxes found")
+
+    full, elapsed, peak = measure(lambda: component_boxes(image_mask(sheet), 4, args.min_size))
+    print(f"\nFull {sheet.width}x{sheet.height} sheet: {len(full)} sprites in {elapsed:.3f}s, "
+          f"peak {peak:.1f}MB (labels, 4-conn)")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    exit(main())
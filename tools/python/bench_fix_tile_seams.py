@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark and bit-exact check for fix_tile_seams
+Times the original per-pixel loop against the array engine on generated
+sheets. The loop and the sheet generator live in tests/test_fix_tile_seams.py,
+which runs the bit-exact comparison under pytest.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from fix_tile_seams import fix_seams, fix_seams_strips
+from tests.test_fix_tile_seams import generate_sheet, legacy_fix_seams
+
+def run_case(width, height, seed, workdir):
+    """Run both implementations on one sheet and return (match, timings)."""
+    sheet = generate_sheet(width, height, seed)
+    input_path = os.path.join(workdir, f"sheet_{seed}.png")
+    output_path = os.path.join(workdir, f"sheet_{seed}_fixed.png")
+    sheet.save(input_path, "PNG")
+
+    legacy_img = Image.open(input_path).convert("RGBA")
+    start = time.perf_counter()
+    legacy_count = legacy_fix_seams(legacy_img)
+    legacy_time = time.perf_counter() - start
+
+    # Engine only, on the same decoded pixels the legacy loop saw
+    pixels = np.array(Image.open(input_path).convert("RGBA"))
+    start = time.perf_counter()
+    engine_count = fix_seams_strips(pixels)
+    engine_time = time.perf_counter() - start
+
+    # Full tool path: decode, fix, encode, then re-read what was written
+    start = time.perf_counter()
+    file_count = fix_seams(input_path, output_path)
+    file_time = time.perf_counter() - start
+    written = np.array(Image.open(output_path))
+
+    expected = np.array(legacy_img)
+    match = (legacy_count == engine_count == file_count
+             and np.array_equal(expected, pixels)
+             and np.array_equal(expected, written))
+    return match, legacy_count, engine_count, legacy_time, engine_time, file_time
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fix_tile_seams against the per-pixel loop')
+    parser.add_argument('--width', type=int, default=224, help='Sheet width (default: tiles_part width)')
+    parser.add_argument('--height', type=int, default=4096, help='Sheet height (16384 = full tiles_part1)')
+    parser.add_argument('--sheets', type=int, default=3, help='Number of generated sheets')
+    args = parser.parse_args()
+
+    print(f"=== FIX_TILE_SEAMS BENCHMARK ({args.width}x{args.height}) ===")
+    all_match = True
+    with tempfile.TemporaryDirectory() as workdir:
+        for seed in range(args.sheets):
+            match, legacy_count, new_count, legacy_time, engine_time, file_time = run_case(
+                args.width, args.height, seed, workdir)
+            all_match = all_match and match
+            print(f"\nSheet {seed}: {'MATCH' if match else 'MISMATCH'}")
+            print(f"  Fixed pixels: legacy {legacy_count}, array {new_count}")
+            print(f"  Legacy loop:  {legacy_time:.3f}s")
+            print(f"  Array engine: {engine_time:.3f}s ({legacy_time / engine_time:.0f}x faster)")
+            print(f"  fix_seams():  {file_time:.3f}s (including PNG decode/encode)")
+
+    print(f"\nBit-exact: {'PASS' if all_match else 'FAIL'}")
+    return 0 if all_match else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark and bit-exact check for fix_tile_transparency
+Compares the original per-pixel near-black loop with the array color key.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from fix_tile_transparency import make_black_transparent_array
+
+def legacy_make_black_transparent(img):
+    """Original pixels[x, y] loop from fix_tile_transparency.py (returns count)."""
+    pixels = img.load()
+    width, height = img.size
+    black_threshold = 10
+    transparent_count = 0
+
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if r < black_threshold and g < black_threshold and b < black_threshold:
+                pixels[x, y] = (0, 0, 0, 0)
+                transparent_count += 1
+
+    return transparent_count
+
+def generate_sheet(width, height, seed):
+    """Random RGB sheet with a large near-black background like the Odyssey BMPs."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    background = rng.random((height, width)) < 0.5
+    pixels[..., :3][background] = rng.integers(0, 12, size=(int(background.sum()), 3), dtype=np.uint8)
+    pixels[..., 3] = 255
+    return Image.fromarray(pixels, "RGBA")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fix_tile_transparency against the per-pixel loop')
+    parser.add_argument('--width', type=int, default=384, help='Sheet width (default: sprites width)')
+    parser.add_argument('--height', type=int, default=4096, help='Sheet height')
+    parser.add_argument('--sheets', type=int, default=3, help='Number of generated sheets')
+    args = parser.parse_args()
+
+    print(f"=== FIX_TILE_TRANSPARENCY BENCHMARK ({args.width}x{args.height}) ===")
+    all_match = True
+    for seed in range(args.sheets):
+        sheet = generate_sheet(args.width, args.height, seed)
+
+        legacy_img = sheet.copy()
+        start = time.perf_counter()
+        legacy_count = legacy_make_black_transparent(legacy_img)
+        legacy_time = time.perf_counter() - start
+
+        pixels = np.array(sheet)
+        start = time.perf_counter()
+        new_count = make_black_transparent_array(pixels)
+        new_time = time.perf_counter() - start
+
+        match = legacy_count == new_count and np.array_equal(np.array(legacy_img), pixels)
+        all_match = all_match and match
+        print(f"\nSheet {seed}: {'MATCH' if match else 'MISMATCH'}")
+        print(f"  Cleared pixels: legacy {legacy_count}, array {new_count}")
+        print(f"  Legacy loop:  {legacy_time:.3f}s")
+        print(f"  Array engine: {new_time:.3f}s ({legacy_time / new_time:.0f}x faster)")
+
+    # Exact key color must only touch pixels of exactly that color
+    pixels = np.zeros((4, 4, 4), dtype=np.uint8)
+    pixels[0, 0] = (255, 0, 255, 255)
+    pixels[0, 1] = (254, 0, 255, 255)
+    count = make_black_transparent_array(pixels, key_color=(255, 0, 255))
+    key_ok = count == 1 and not pixels[0, 0].any() and pixels[0, 1, 0] == 254
+    all_match = all_match and key_ok
+    print(f"\nKey color check: {'PASS' if key_ok else 'FAIL'}")
+
+    print(f"\nBit-exact: {'PASS' if all_match else 'FAIL'}")
+    return 0 if all_match else 1
+
+if __name__ == "__main__":
+    exit(main())
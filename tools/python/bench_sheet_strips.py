@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Peak-RSS benchmark for strip-streamed sheet processing
+Generates a synthetic 64k-row sprite sheet, then runs the full-load and the
+strip-streamed versions of splitting and seam fixing each in a fresh child
+process and reports its peak resident memory and wall time.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from fix_tile_seams import fix_seams, fix_seams_array
+from sheet_strips import StripWriter, chunk_ranges, split_sheet
+
+def generate_sheet(path, width, height, band_height=2048, seed=0):
+    """Write a tile-structured RGBA sheet band by band (never held in memory whole)."""
+    rng = np.random.default_rng(seed)
+    with StripWriter(path, width, height) as writer:
+        for y in range(0, height, band_height):
+            rows = min(band_height, height - y)
+            tiles = rng.integers(0, 256, size=((rows + 31) // 32, width // 32, 1, 1, 4), dtype=np.uint8)
+            band = np.broadcast_to(tiles, (tiles.shape[0], tiles.shape[1], 32, 32, 4))
+            band = band.transpose(0, 2, 1, 3, 4).reshape(-1, width, 4)[:rows].copy()
+            noise = rng.random((rows, width)) < 0.1
+            band[noise] ^= 0x0F
+            band[..., 3][rng.random((rows, width)) < 0.05] = 100
+            writer.write(band)
+
+def full_load_split(input_path, output_dir):
+    """The original split_sprites approach: open whole sheet, crop and save chunks."""
+    img = Image.open(input_path)
+    width, height = img.size
+    for chunk_idx, (start_y, end_y) in enumerate(chunk_ranges(height)):
+        chunk_img = img.crop((0, start_y, width, end_y))
+        chunk_img.save(os.path.join(output_dir, f"full_part{chunk_idx + 1}.png"), "PNG")
+
+def full_load_fix(input_path, output_dir):
+    """Seam fix on a fully decoded RGBA copy of the sheet."""
+    pixels = np.array(Image.open(input_path).convert("RGBA"))
+    fix_seams_array(pixels)
+    Image.fromarray(pixels, "RGBA").save(os.path.join(output_dir, "full_fixed.png"), "PNG")
+
+CASES = {
+    "full_load_split": full_load_split,
+    "strip_split": lambda path, out: split_sheet(path, os.path.join(out, "strip_part{}.png"), workers=1),
+    "full_load_fix": full_load_fix,
+    "strip_fix": lambda path, out: fix_seams(path, os.path.join(out, "strip_fixed.png")),
+}
+
+def run_child(case, input_path, output_dir):
+    """Entry point inside the child process: run one case and print its peak RSS."""
+    import resource
+    start = time.perf_counter()
+    CASES[case](input_path, output_dir)
+    elapsed = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024  # macOS reports bytes, Linux kilobytes
+    print(f"RESULT {max_rss} {elapsed:.3f}")
+
+def measure(case, input_path, output_dir):
+    """Run a case in a fresh interpreter. Returns (peak RSS in MB, seconds)."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", case, input_path, output_dir],
+        capture_output=True, text=True, check=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("RESULT "):
+            _, max_rss, elapsed = line.split()
+            return int(max_rss) / 1024, float(elapsed)
+    raise RuntimeError(f"{case} produced no result:\n{result.stdout}\n{result.stderr}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak-RSS benchmark for strip-streamed sheet tools')
+    parser.add_argument('--width', type=int, default=384, help='Sheet width (default: sprites width)')
+    parser.add_argument('--height', type=int, default=65536, help='Sheet height in pixel rows')
+    parser.add_argument('--child', nargs=3, metavar=('CASE', 'INPUT', 'OUTPUT_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        print("Peak RSS needs the 'resource' module (Linux/macOS)")
+        return 1
+
+    print(f"=== SHEET STRIPS BENCHMARK ({args.width}x{args.height}) ===")
+    with tempfile.TemporaryDirectory() as workdir:
+        sheet_path = os.path.join(workdir, "synthetic_sheet.png")
+        print("Generating synthetic sheet...")
+        generate_sheet(sheet_path, args.width, args.height)
+        raw_mb = args.width * args.height * 4 / (1024 * 1024)
+        print(f"  {os.path.getsize(sheet_path):,} bytes on disk, {raw_mb:.0f} MB as RGBA")
+
+        print(f"\n{'case':<18} {'peak RSS':>10} {'time':>9}")
+        for case in CASES:
+            max_rss, elapsed = measure(case, sheet_path, workdir)
+            print(f"{case:<18} {max_rss:8.0f}MB {elapsed:8.2f}s")
+
+        for name in ("part1", "part2", "part3", "part4"):
+            full_path = os.path.join(workdir, f"full_{name}.png")
+            strip_path = os.path.join(workdir, f"strip_{name}.png")
+            if os.path.exists(full_path) and not np.array_equal(
+                    np.array(Image.open(full_path).convert("RGBA")), np.array(Image.open(strip_path))):
+                print(f"MISMATCH: {name}")
+                return 1
+        print("\nChunk pixels: identical")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark exact (summed-area table) against sampled splicing
+Times splice_odyssey_sampled in both modes and the original getpixel sampler
+on a synthetic sheet with thin separators and on the full sprites.png. The
+exact rectangles are checked against the original full scan, the vectorized
+sampler against the original sampler, and the sprites sampling gets right
+are counted.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+from bench_splice_separators import full_sprite_sheet, grid_sheet, legacy_find_sprite_boundaries
+from splice_odyssey_sampled import find_sprite_boundaries_exact, find_sprite_boundaries_sampled
+from sprite_splicing import SheetImage, sprites_between
+
+def legacy_find_sprite_boundaries_sampled(image, black_threshold=10, sample_rate=4):
+    """Original getpixel sampler, kept here as the reference."""
+    width, height = image.size
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    horizontal_separators = []
+    for y in range(0, height, sample_rate):
+        is_separator = True
+        for x in range(0, width, sample_rate):
+            r, g, b = image.getpixel((x, y))
+            if r > black_threshold or g > black_threshold or b > black_threshold:
+                is_separator = False
+                break
+        if is_separator:
+            horizontal_separators.append(y)
+
+    vertical_separators = []
+    for x in range(0, width, sample_rate):
+        is_separator = True
+        for y in range(0, height, sample_rate):
+            r, g, b = image.getpixel((x, y))
+            if r > black_threshold or g > black_threshold or b > black_threshold:
+                is_separator = False
+                break
+        if is_separator:
+            vertical_separators.append(x)
+
+    return sprites_between(horizontal_separators, vertical_separators, tolerance=sample_rate)
+
+def timed(func, *args, repeat=3):
+    """Returns (result, best of repeat wall times)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def rects(sprites):
+    return [sprite['rect'] for sprite in sprites]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exact and sampled sprite splicing')
+    parser.add_argument('--sprites-dir', default='assets-odyssey', help='Directory with sprites_part*.png')
+    parser.add_argument('--sample-rate', type=int, default=4, help='Sample rate of the legacy mode')
+    parser.add_argument('--queries', type=int, default=100000, help='Random rectangle queries to time')
+    args = parser.parse_args()
+
+    sheets = {"synthetic grid": grid_sheet()}
+    parts = [os.path.join(args.sprites_dir, f"sprites_part{i}.png") for i in (1, 2)]
+    if all(os.path.exists(path) for path in parts):
+        sheets["sprites.png"] = full_sprite_sheet(parts)
+
+    rate = args.sample_rate
+    print("=== EXACT vs SAMPLED SPLICING ===")
+    print(f"{'sheet':<16} {'mode':<18} {'sprites':>8} {'time':>9}  result")
+    ok = True
+    for name, image in sheets.items():
+        image.load()
+        reference = rects(timed(legacy_find_sprite_boundaries, image, repeat=1)[0])
+
+        legacy, legacy_time = timed(legacy_find_sprite_boundaries_sampled, image, 10, rate)
+        sampled, sampled_time = timed(find_sprite_boundaries_sampled, image, 10, rate)
+        exact, exact_time = timed(find_sprite_boundaries_exact, image)
+        correct = len(set(rects(sampled)) & set(reference))
+        sampled_match = rects(sampled) == rects(legacy)
+        exact_match = rects(exact) == reference
+        ok &= sampled_match and exact_match
+
+        print(f"{name:<16} {f'getpixel sampled/{rate}':<18} {len(legacy):>8} {legacy_time:8.3f}s  "
+              f"{correct}/{len(reference)} rectangles correct")
+        print(f"{name:<16} {f'sampled/{rate}':<18} {len(sampled):>8} {sampled_time:8.3f}s  "
+              f"{'PASS' if sampled_match else 'FAIL'} vs getpixel sampler")
+        print(f"{name:<16} {'exact':<18} {len(exact):>8} {exact_time:8.3f}s  "
+              f"{'PASS' if exact_match else 'FAIL'} vs original full scan")
+
+    image = sheets["synthetic grid"]
+    table, build_time = timed(lambda: SheetImage(image).table(10))
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, image.width - 32, args.queries)
+    y = rng.integers(0, image.height - 32, args.queries)
+    w, h = rng.integers(1, 33, (2, args.queries))
+    start = time.perf_counter()
+    sums = table.rect_sum(x, y, w, h)
+    query_time = time.perf_counter() - start
+    mask = np.asarray(image.convert('RGB')).max(axis=-1) > 10
+    spot = all(sums[i] == mask[y[i]:y[i] + h[i], x[i]:x[i] + w[i]].sum() for i in range(200))
+    ok &= spot
+    print(f"\nSummed-area table: built in {build_time * 1000:.1f}ms, {args.queries} rectangle queries in "
+          f"{query_time * 1000:.1f}ms ({'PASS' if spot else 'FAIL'} spot check)")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    exit(main())
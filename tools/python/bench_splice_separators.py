@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark separator detection in splice_odyssey_sprites
+Compares the original getpixel row/column scan with the NumPy reductions on
+the full sprite sheet (sprites_part1 + sprites_part2 stacked back into the
+384x20608 sprites.png) and on a synthetic sheet with black grid lines, and
+checks that both produce the same separators and sprite rectangles.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from splice_odyssey_sprites import find_sprite_boundaries
+from sprite_splicing import group_consecutive
+
+def legacy_find_sprite_boundaries(image, black_threshold=10):
+    """Original implementation, kept here as the reference."""
+    width, height = image.size
+    sprites = []
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    horizontal_separators = []
+    for y in range(height):
+        is_separator = True
+        for x in range(width):
+            r, g, b = image.getpixel((x, y))
+            if r > black_threshold or g > black_threshold or b > black_threshold:
+                is_separator = False
+                break
+        if is_separator:
+            horizontal_separators.append(y)
+
+    vertical_separators = []
+    for x in range(width):
+        is_separator = True
+        for y in range(height):
+            r, g, b = image.getpixel((x, y))
+            if r > black_threshold or g > black_threshold or b > black_threshold:
+                is_separator = False
+                break
+        if is_separator:
+            vertical_separators.append(x)
+
+    h_groups = group_consecutive(horizontal_separators)
+    v_groups = group_consecutive(vertical_separators)
+
+    sprite_id = 0
+    for i in range(len(h_groups) - 1):
+        for j in range(len(v_groups) - 1):
+            x1 = v_groups[j][-1] + 1
+            y1 = h_groups[i][-1] + 1
+            x2 = v_groups[j + 1][0] - 1
+            y2 = h_groups[i + 1][0] - 1
+
+            if x2 > x1 and y2 > y1:
+                sprites.append({
+                    'id': sprite_id,
+                    'rect': (x1, y1, x2 - x1, y2 - y1),
+                    'grid_pos': (j, i)
+                })
+                sprite_id += 1
+
+    return sprites
+
+def full_sprite_sheet(parts):
+    """Stack the split sprite parts back into the original full sheet."""
+    images = [Image.open(path).convert("RGB") for path in parts]
+    sheet = Image.new("RGB", (images[0].width, sum(image.height for image in images)))
+    y = 0
+    for image in images:
+        sheet.paste(image, (0, y))
+        y += image.height
+    return sheet
+
+def grid_sheet(width=384, height=4096, cell=32, seed=0):
+    """Random sprites on a black background with 1-3 px black separator lines."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(11, 256, size=(height, width, 3), dtype=np.uint8)
+    for start in range(0, height, cell):
+        pixels[start:start + rng.integers(1, 4)] = rng.integers(0, 11)
+    for start in range(0, width, cell):
+        pixels[:, start:start + rng.integers(1, 4)] = rng.integers(0, 11)
+    return Image.fromarray(pixels, "RGB")
+
+def timed(func, image):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(image)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark splice_odyssey_sprites separator detection')
+    parser.add_argument('--sprites-dir', default='assets-odyssey', help='Directory with sprites_part*.png')
+    parser.add_argument('--input', help='Use this sheet instead of the stacked sprite parts')
+    args = parser.parse_args()
+
+    sheets = {"synthetic grid": grid_sheet()}
+    if args.input:
+        sheets[os.path.basename(args.input)] = Image.open(args.input)
+    else:
+        parts = [os.path.join(args.sprites_dir, f"sprites_part{i}.png") for i in (1, 2)]
+        if all(os.path.exists(path) for path in parts):
+            sheets["sprites.png"] = full_sprite_sheet(parts)
+
+    print("=== SEPARATOR DETECTION BENCHMARK ===")
+    print(f"{'sheet':<16} {'size':>10} {'sprites':>8} {'legacy':>9} {'numpy':>9} {'speedup':>8}  match")
+    all_match = True
+    for name, image in sheets.items():
+        image.load()
+        expected, legacy_time = timed(legacy_find_sprite_boundaries, image)
+        actual, new_time = timed(find_sprite_boundaries, image)
+        match = expected == actual
+        all_match &= match
+        size = f"{image.width}x{image.height}"
+        print(f"{name:<16} {size:>10} {len(actual):>8} {legacy_time:8.2f}s {new_time:8.3f}s "
+              f"{legacy_time / new_time:7.0f}x  {'PASS' if match else 'FAIL'}")
+    return 0 if all_match else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark loose-PNG sprite cutting against the packed sprite bundle
+Runs both modes of odyssey_sprite_cutter in a scratch copy of the sprite
+parts and reports cut time, random-read time and files (inodes) created.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+import odyssey_sprite_cutter
+from sprite_bundle import SpriteBundle
+
+def count_files(path):
+    """Number of files (inodes) under path, or 1 for a single file."""
+    if os.path.isfile(path):
+        return 1
+    return sum(len(files) for _, _, files in os.walk(path))
+
+def timed_quiet(func, *args):
+    """Run func with its progress output suppressed. Returns (result, seconds)."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loose PNG sprites against the sprite bundle')
+    parser.add_argument('--sprites-dir', default='assets-odyssey', help='Directory with sprites_part*.png')
+    parser.add_argument('--reads', type=int, default=2000, help='Random sprite reads to time')
+    args = parser.parse_args()
+
+    sources = [os.path.abspath(os.path.join(args.sprites_dir, os.path.basename(p)))
+               for p in odyssey_sprite_cutter.SPRITE_FILES]
+    previous_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "assets-odyssey"))
+        for source in sources:
+            if os.path.exists(source):
+                shutil.copy(source, os.path.join(workdir, "assets-odyssey"))
+        os.chdir(workdir)
+        try:
+            print("=== SPRITE BUNDLE BENCHMARK ===")
+            _, png_cut = timed_quiet(odyssey_sprite_cutter.cut_odyssey_sprites, "png")
+            png_files = count_files("cut_sprites")
+            shutil.rmtree("character_sprites")
+
+            _, bundle_cut = timed_quiet(odyssey_sprite_cutter.cut_to_bundle)
+            bundle = SpriteBundle("cut_sprites")
+            bundle_files = count_files("cut_sprites.bin") + count_files("cut_sprites.json")
+            bundle_bytes = os.path.getsize("cut_sprites.bin") + os.path.getsize("cut_sprites.json")
+            png_bytes = sum(os.path.getsize(os.path.join("cut_sprites", f)) for f in os.listdir("cut_sprites"))
+
+            keys = random.Random(0).choices(list(bundle.keys()), k=args.reads)
+            png_names = {key: f"cut_sprites/sprite_{bundle.slot(*key):04d}_r{key[0]:03d}_c{key[1]:02d}.png"
+                         for key in keys}
+
+            start = time.perf_counter()
+            png_cells = [np.array(Image.open(png_names[key])) for key in keys]
+            png_read = time.perf_counter() - start
+
+            start = time.perf_counter()
+            reopened = SpriteBundle("cut_sprites")
+            bundle_cells = [np.array(reopened[key]) for key in keys]
+            bundle_read = time.perf_counter() - start
+
+            match = all(np.array_equal(a, b) for a, b in zip(png_cells, bundle_cells))
+        finally:
+            os.chdir(previous_cwd)
+
+    print(f"Sprites: {len(bundle)}")
+    print(f"\n{'':<14} {'cut':>8} {f'{args.reads} reads':>12} {'files':>7} {'bytes':>13}")
+    print(f"{'loose PNGs':<14} {png_cut:7.2f}s {png_read:11.3f}s {png_files:>7} {png_bytes:>13,}")
+    print(f"{'bundle':<14} {bundle_cut:7.2f}s {bundle_read:11.3f}s {bundle_files:>7} {bundle_bytes:>13,}")
+    print("(bundle cut time includes exporting the character_sprites/ PNGs)")
+    print(f"\nRandom reads identical: {'PASS' if match else 'FAIL'}")
+    return 0 if match else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Sprite splicing harness
+Runs every detector of sprite_splicing on the real Odyssey sheets and reports
+time, traced peak memory and how well its rectangles agree with the 32px grid
+(a rectangle agrees when it overlaps a grid cell with IoU >= 0.5).
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from sprite_splicing import DETECTORS, SheetImage
+
+SHEETS = [
+    "assets-odyssey/sprites_part1.png",
+    "assets-odyssey/sprites_part2.png",
+    "assets-odyssey/tiles_part1.png",
+    "assets-odyssey/tiles_part2.png",
+]
+DETECTOR_OPTIONS = {
+    "separator": {},
+    "sampled": {"sample_rate": 4},
+    "flood": {"min_size": 8, "connectivity": 4},
+    "grid": {"tile_width": 32, "tile_height": 32},
+}
+IOU_MATCH = 0.5
+
+def run_detector(detector, image):
+    """Detect on a fresh SheetImage (no disk cache). Returns (rects, seconds, traced peak MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sprites = detector.detect(SheetImage(image))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.array([sprite['rect'] for sprite in sprites], dtype=np.int64).reshape(-1, 4), elapsed, peak / 2**20
+
+def matched(rects, reference, batch=1024):
+    """Boolean per rect: overlaps some reference rect with IoU >= IOU_MATCH."""
+    found = np.zeros(len(rects), dtype=bool)
+    if not len(rects) or not len(reference):
+        return found
+    rx1, ry1 = reference[:, 0], reference[:, 1]
+    rx2, ry2 = rx1 + reference[:, 2], ry1 + reference[:, 3]
+    reference_area = reference[:, 2] * reference[:, 3]
+    for start in range(0, len(rects), batch):
+        part = rects[start:start + batch, None]
+        x1, y1 = part[..., 0], part[..., 1]
+        x2, y2 = x1 + part[..., 2], y1 + part[..., 3]
+        overlap = (np.clip(np.minimum(x2, rx2) - np.maximum(x1, rx1), 0, None) *
+                   np.clip(np.minimum(y2, ry2) - np.maximum(y1, ry1), 0, None))
+        union = part[..., 2] * part[..., 3] + reference_area - overlap
+        found[start:start + batch] = (overlap >= IOU_MATCH * union).any(axis=1)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description='Run every splicing detector on the Odyssey sheets')
+    parser.add_argument('sheets', nargs='*', default=SHEETS, help='Sheets to analyze')
+    args = parser.parse_args()
+
+    print("=== SPRITE SPLICING HARNESS ===")
+    print("agree: share of a detector's rectangles matching a 32px grid cell; "
+          "cover: share of grid cells it matches")
+    for path in args.sheets:
+        if not os.path.exists(path):
+            print(f"\nSkipping missing sheet: {path}")
+            continue
+        image = Image.open(path)
+        image.load()
+        print(f"\n{path} ({image.width}x{image.height})")
+        print(f"  {'detector':<10} {'rects':>6} {'time':>9} {'peak mem':>9} {'agree':>7} {'cover':>7}")
+
+        results = {name: run_detector(DETECTORS[name](**DETECTOR_OPTIONS[name]), image) for name in DETECTORS}
+        grid = results["grid"][0]
+        for name, (rects, elapsed, peak) in results.items():
+            agree = matched(rects, grid).mean() * 100 if len(rects) else 0.0
+            cover = matched(grid, rects).mean() * 100 if len(grid) else 0.0
+            print(f"  {name:<10} {len(rects):>6} {elapsed:8.3f}s {peak:7.1f}MB {agree:6.1f}% {cover:6.1f}%")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
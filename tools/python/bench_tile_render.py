@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batched tile-grid renderer
+Renders the same random grass grid, with and without a sparse decoration
+layer, through the original get_tile crop/paste loop of
+create_battle_background and through TileAtlas.render, at 1280x720 and
+8192x8192, and checks the outputs are pixel-identical.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from create_battle_background import DECORATION_TILES, GRASS_TILES, TILES_PATH
+from tile_render import EMPTY, TileAtlas
+
+SIZES = [(1280, 720), (8192, 8192)]
+DECORATION_SHARE = 0.1
+
+def legacy_render(tileset, layers, columns, size, tile_size=32):
+    """Original loop: crop every tile out of the sheet and paste it (masked for overlay layers)."""
+    background = Image.new("RGBA", size, (0, 0, 0, 0))
+    for depth, grid in enumerate(layers):
+        for y, x in zip(*np.nonzero(grid != EMPTY)):
+            row, col = divmod(int(grid[y, x]), columns)
+            tile = tileset.crop((col * tile_size, row * tile_size, (col + 1) * tile_size, (row + 1) * tile_size))
+            if depth == 0:
+                background.paste(tile, (x * tile_size, y * tile_size))
+            else:
+                background.paste(tile, (x * tile_size, y * tile_size), tile)
+    return background
+
+def random_layers(atlas, size, rng):
+    rows, cols = size[1] // atlas.tile_size, size[0] // atlas.tile_size
+    grass = np.array([atlas.index(*coord) for coord in GRASS_TILES])
+    decorations = np.array([atlas.index(*coord) for coord in DECORATION_TILES])
+    base = rng.choice(grass, (rows, cols))
+    overlay = np.where(rng.random((rows, cols)) < DECORATION_SHARE, rng.choice(decorations, (rows, cols)), EMPTY)
+    return base, overlay
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the batched tile-grid renderer')
+    parser.add_argument('--tileset', default=TILES_PATH, help='Tileset sheet')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tileset = Image.open(args.tileset).convert("RGBA")
+    atlas = TileAtlas(np.asarray(tileset).reshape(-1, 32, tileset.width // 32, 32, 4)
+                      .transpose(0, 2, 1, 3, 4).reshape(-1, 32, 32, 4), tileset.width // 32)
+    print(f"Atlas: {atlas.count} tiles loaded in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'output':<11} {'layers':<14} {'crop/paste':>11} {'atlas':>9} {'speedup':>8}  match")
+    ok = True
+    for size in SIZES:
+        base, overlay = random_layers(atlas, size, rng)
+        for name, layers in (("base", [base]), ("base+overlay", [base, overlay])):
+            start = time.perf_counter()
+            expected = legacy_render(tileset, layers, atlas.columns, size)
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = atlas.render_image(layers, size=size)
+            atlas_time = time.perf_counter() - start
+
+            match = np.array_equal(np.asarray(expected), np.asarray(actual))
+            ok &= match
+            print(f"{f'{size[0]}x{size[1]}':<11} {name:<14} {legacy_time * 1000:9.1f}ms {atlas_time * 1000:7.1f}ms "
+                  f"{legacy_time / atlas_time:7.1f}x  {'PASS' if match else 'FAIL'}")
+            del expected, actual
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    exit(main())
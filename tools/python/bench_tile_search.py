@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark the similar-tile index
+Times index queries at several nprobe settings against a full scan of the
+index and a brute-force scan of the raw (un-reduced) tile vectors, and
+reports recall@k: the share of the exact top-k each setting returns.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from sheet_strips import load_cells
+from tile_features import COLUMNS, TILE_SHEETS
+from tile_search import TileIndex, tile_vectors
+
+def brute_force(vectors, query, k):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    return np.argsort(distances, kind="stable")[1:k + 1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the similar-tile index')
+    parser.add_argument('--queries', type=int, default=500, help='Random query gids')
+    parser.add_argument('-k', type=int, default=10, help='Results per query')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, _ = TileIndex.load(use_cache=False)
+    print(f"Built index over {len(index)} tiles in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(0)
+    queries = rng.choice(index.gids, min(args.queries, len(index)), replace=False)
+    exact = {gid: {result for result, _ in index.similar(int(gid), args.k, None)} for gid in queries}
+
+    print(f"\n{'search':<22} {'per query':>10} {'recall@' + str(args.k):>10}")
+    for nprobe in (1, 4, 8, 16, None):
+        start = time.perf_counter()
+        results = {gid: {result for result, _ in index.similar(int(gid), args.k, nprobe)} for gid in queries}
+        elapsed = (time.perf_counter() - start) / len(queries)
+        recall = np.mean([len(results[gid] & exact[gid]) / args.k for gid in queries])
+        name = "full index scan" if nprobe is None else f"nprobe {nprobe}"
+        print(f"{name:<22} {elapsed * 1000:8.3f}ms {recall * 100:9.1f}%")
+
+    # Raw vectors without PCA: the cost the index avoids, and what PCA keeps
+    cells, _ = load_cells(TILE_SHEETS, COLUMNS)
+    gids = np.sort(index.gids)
+    raw = tile_vectors(cells[gids - 1])
+    position = {int(gid): i for i, gid in enumerate(gids)}
+    start = time.perf_counter()
+    raw_results = {gid: set(gids[brute_force(raw, raw[position[int(gid)]], args.k)].tolist()) for gid in queries}
+    elapsed = (time.perf_counter() - start) / len(queries)
+    recall = np.mean([len(raw_results[gid] & exact[gid]) / args.k for gid in queries])
+    print(f"{'raw vectors, brute':<22} {elapsed * 1000:8.3f}ms {recall * 100:9.1f}%  (overlap with PCA exact)")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Cell Occupancy Mask
+Exact per-cell "has content" mask for a whole sheet in one vectorized pass:
+a cell is occupied if any pixel is non-black (some RGB channel above the
+threshold) and not fully transparent. Masks are cached by sheet hash.
+"""
+
+import argparse
+
+import numpy as np
+from PIL import Image
+
+from asset_cache import cache_key, cached_arrays, file_hash
+
+BLACK_THRESHOLD = 30  # Same cut-off as the splicers' old per-pixel is_black_pixel() check
+BAND_CELL_ROWS = 64  # Cell rows reduced per step (bounds temporaries)
+
+def sheet_pixels(image):
+    """(H, W, 3 or 4) uint8 array of a PIL image; palette and grey modes expand to RGB(A)."""
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    return np.asarray(image.convert("RGBA" if has_alpha else "RGB"))
+
+def content_mask(pixels, threshold=BLACK_THRESHOLD):
+    """Boolean (H, W) mask of pixels that are neither black nor fully transparent."""
+    mask = np.maximum(np.maximum(pixels[..., 0], pixels[..., 1]), pixels[..., 2]) > threshold
+    if pixels.shape[-1] == 4:
+        mask &= pixels[..., 3] > 0
+    return mask
+
+def cell_occupancy(pixels, cell_width, cell_height, threshold=BLACK_THRESHOLD):
+    """(rows, cols) boolean mask of cells containing any content pixel; partial edge cells are dropped."""
+    rows, cols = pixels.shape[0] // cell_height, pixels.shape[1] // cell_width
+    occupied = np.zeros((rows, cols), dtype=bool)
+    for row in range(0, rows, BAND_CELL_ROWS):
+        stop = min(row + BAND_CELL_ROWS, rows)
+        band = pixels[row * cell_height:stop * cell_height, :cols * cell_width]
+        mask = content_mask(band, threshold)
+        occupied[row:stop] = mask.reshape(stop - row, cell_height, cols, cell_width).any(axis=(1, 3))
+    return occupied
+
+def sheet_occupancy(path, cell_width, cell_height, threshold=BLACK_THRESHOLD, image=None, use_cache=True):
+    """
+    Occupancy mask of the sheet at path, served from the asset cache when the
+    file is unchanged. image may be passed to skip re-opening it on a miss.
+    Returns (occupied, cache_hit).
+    """
+    def compute():
+        if image is not None:
+            return {"occupied": cell_occupancy(sheet_pixels(image), cell_width, cell_height, threshold)}
+        with Image.open(path) as source:
+            return {"occupied": cell_occupancy(sheet_pixels(source), cell_width, cell_height, threshold)}
+
+    if not use_cache:
+        return compute()["occupied"], False
+    key = cache_key(file_hash(path), cell_width=cell_width, cell_height=cell_height, threshold=threshold)
+    arrays, hit = cached_arrays("occupancy", key, compute)
+    return arrays["occupied"], hit
+
+def main():
+    parser = argparse.ArgumentParser(description='Report occupied cells of a sprite/tile sheet')
+    parser.add_argument('input', help='Sheet image')
+    parser.add_argument('--cell-size', type=int, default=32, help='Cell width and height')
+    parser.add_argument('--threshold', type=int, default=BLACK_THRESHOLD, help='Black threshold for RGB')
+    parser.add_argument('--no-cache', action='store_true', help='Always recompute')
+    args = parser.parse_args()
+
+    occupied, hit = sheet_occupancy(args.input, args.cell_size, args.cell_size, args.threshold,
+                                    use_cache=not args.no_cache)
+    rows, cols = occupied.shape
+    print(f"{args.input}: {cols}x{rows} cells, {int(occupied.sum())} occupied "
+          f"({'cached' if hit else 'computed'})")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Connected-Component Labeling
+Exact bounding boxes of every connected region of a boolean bitmap, computed
+on horizontal runs instead of pixels. Pass one extracts the runs of each row
+and links overlapping runs of neighbouring rows; pass two resolves those
+links with array union-find (min-label propagation plus pointer jumping).
+"""
+
+import argparse
+
+import numpy as np
+from PIL import Image
+
+from cell_occupancy import BLACK_THRESHOLD, content_mask
+
+BAND_ROWS = 2048  # Rows scanned for runs per step
+
+def find_runs(mask, band_rows=BAND_ROWS):
+    """
+    Horizontal runs of True pixels in row-major order.
+    Returns (rows, starts, ends) int64 arrays; ends are exclusive.
+    """
+    rows, starts, ends = [], [], []
+    for y in range(0, mask.shape[0], band_rows):
+        band = mask[y:y + band_rows]
+        padded = np.zeros((band.shape[0], band.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = band
+        edges = np.diff(padded, axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+        rows.append(start_rows + y)
+        starts.append(start_cols)
+        ends.append(end_cols)
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    return (np.concatenate(rows).astype(np.int64), np.concatenate(starts).astype(np.int64),
+            np.concatenate(ends).astype(np.int64))
+
+def link_runs(rows, starts, ends, width, connectivity=4):
+    """
+    Pairs (a, b) of runs in adjacent rows that touch. Runs sorted row-major
+    make the touching runs of the previous row one contiguous index range,
+    found with two binary searches per run.
+    """
+    stride = width + 2
+    reach = 1 if connectivity == 8 else 0
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+
+    previous = (rows - 1) * stride
+    first = np.searchsorted(end_keys, previous + starts - reach, side="right")
+    stop = np.searchsorted(start_keys, previous + ends + reach, side="left")
+    counts = np.where(rows > 0, np.maximum(stop - first, 0), 0)
+
+    current = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return current, np.repeat(first, counts) + offsets
+
+def resolve_labels(count, a, b):
+    """Union-find on arrays: every run ends up labelled with the smallest run index of its component."""
+    labels = np.arange(count)
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, low)
+        np.minimum.at(updated, b, low)
+        # Pointer jumping flattens the chains the minimum created
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def label_components(mask, connectivity=4):
+    """
+    Bounding boxes of the connected components of a boolean (H, W) mask,
+    ordered by each component's first pixel in row-major order.
+    Returns a dict of int64 arrays: x, y, width, height, pixels.
+    """
+    if connectivity not in (4, 8):
+        raise ValueError(f"connectivity must be 4 or 8, got {connectivity}")
+    rows, starts, ends = find_runs(mask)
+    a, b = link_runs(rows, starts, ends, mask.shape[1], connectivity)
+    labels = resolve_labels(len(rows), a, b)
+
+    # Labels are the first run of each component, so sorting them keeps scan order
+    roots, component = np.unique(labels, return_inverse=True)
+    count = len(roots)
+    min_x = np.full(count, mask.shape[1], dtype=np.int64)
+    max_x = np.full(count, -1, dtype=np.int64)
+    max_y = np.full(count, -1, dtype=np.int64)
+    np.minimum.at(min_x, component, starts)
+    np.maximum.at(max_x, component, ends - 1)
+    np.maximum.at(max_y, component, rows)
+    min_y = rows[roots]
+    return {
+        "x": min_x,
+        "y": min_y,
+        "width": max_x - min_x + 1,
+        "height": max_y - min_y + 1,
+        "pixels": np.bincount(component, weights=ends - starts, minlength=count).astype(np.int64),
+    }
+
+def component_boxes(mask, connectivity=4, min_size=1, min_pixels=1):
+    """[(x, y, w, h)] of components at least min_size wide and high with at least min_pixels pixels."""
+    components = label_components(mask, connectivity)
+    keep = ((components["width"] >= min_size) & (components["height"] >= min_size) &
+            (components["pixels"] >= min_pixels))
+    return list(zip(*(components[key][keep].tolist() for key in ("x", "y", "width", "height"))))
+
+def image_mask(image, threshold=BLACK_THRESHOLD):
+    """Non-black mask of a PIL image, judged on RGB like the splicers do."""
+    return content_mask(np.asarray(image.convert("RGB")), threshold)
+
+def main():
+    parser = argparse.ArgumentParser(description='List connected non-black regions of an image')
+    parser.add_argument('input', help='Image path')
+    parser.add_argument('--connectivity', type=int, choices=[4, 8], default=4, help='Pixel neighbourhood')
+    parser.add_argument('--min-size', type=int, default=8, help='Minimum width and height')
+    parser.add_argument('--threshold', type=int, default=BLACK_THRESHOLD, help='Black threshold for RGB')
+    args = parser.parse_args()
+
+    boxes = component_boxes(image_mask(Image.open(args.input), args.threshold), args.connectivity, args.min_size)
+    for x, y, w, h in boxes:
+        print(f"{w}x{h} at ({x}, {y})")
+    print(f"{len(boxes)} components")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,21 +1,31 @@
 from PIL import Image
+import argparse
 import os
 
-def convert_bmp_to_png(bmp_path, png_path):
-    """Convert BMP file to PNG"""
+import numpy as np
+
+from indexed_png import save_png
+
+def convert_bmp_to_png(bmp_path, png_path, indexed=False):
+    """Convert BMP file to PNG (palette PNG when indexed and it has <= 256 colors)"""
     try:
         with Image.open(bmp_path) as img:
             # Convert to RGB if necessary (removes any alpha issues)
             if img.mode != 'RGB':
                 img = img.convert('RGB')
-            img.save(png_path, 'PNG', optimize=True)
+            if indexed:
+                info = save_png(np.asarray(img), png_path, indexed=True)
+                if info["mode"] != "exact":
+                    print(f"  {bmp_path} has more than 256 colors, kept as RGB")
+            else:
+                img.save(png_path, 'PNG', optimize=True)
         print(f"Converted {bmp_path} -> {png_path}")
         return True
     except Exception as e:
         print(f"Error converting {bmp_path}: {e}")
         return False
 
-def main():
+def main(indexed=False):
     """Convert Odyssey BMP assets to PNG"""
     assets_dir = "assets-odyssey"
 
@@ -31,9 +41,11 @@ def main():
         png_path = os.path.join(assets_dir, png_file)
 
         if os.path.exists(bmp_path):
-            convert_bmp_to_png(bmp_path, png_path)
+            convert_bmp_to_png(bmp_path, png_path, indexed)
         else:
             print(f"File not found: {bmp_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Convert Odyssey BMP assets to PNG')
+    parser.add_argument('--indexed', action='store_true', help='Write sheets with <= 256 colors as palette PNGs')
+    main(parser.parse_args().indexed)
\ No newline at end of file
@@ -3,9 +3,12 @@ Create a battle background by compositing Odyssey tiles
 Generates a grassy field with decorative elements
 """
 
-from PIL import Image
 import random
 
+import numpy as np
+
+from tile_render import EMPTY, TileAtlas
+
 # Tile configuration
 TILE_SIZE = 32
 TILES_PATH = "assets-odyssey/tiles_part1.png"
@@ -34,42 +37,33 @@ DECORATION_TILES = [
     (61, 1),
 ]
 
-def get_tile(tileset_img, row, col):
-    """Extract a single tile from the tileset"""
-    x = col * TILE_SIZE
-    y = row * TILE_SIZE
-    return tileset_img.crop((x, y, x + TILE_SIZE, y + TILE_SIZE))
-
 def create_battle_background():
     """Create a grassy field battle background"""
     print("Loading tileset...")
-    tileset = Image.open(TILES_PATH)
+    atlas = TileAtlas.open(TILES_PATH)
 
     print(f"Creating {BG_WIDTH}x{BG_HEIGHT} background...")
-    background = Image.new("RGBA", (BG_WIDTH, BG_HEIGHT), (0, 0, 0, 0))
 
     # Layer 1: Fill with grass tiles
     print("Laying grass tiles...")
-    for y in range(TILES_HIGH):
-        for x in range(TILES_WIDE):
-            # Pick a random grass tile
-            grass_coord = random.choice(GRASS_TILES)
-            tile = get_tile(tileset, grass_coord[0], grass_coord[1])
-            background.paste(tile, (x * TILE_SIZE, y * TILE_SIZE))
+    grass = [[random.choice(GRASS_TILES) for x in range(TILES_WIDE)] for y in range(TILES_HIGH)]
+    layers = [atlas.grid_from_coords(grass)]
 
     # Layer 2: Add random decorations (plants, flowers, rocks)
     print("Adding decorations...")
     num_decorations = 0  # DISABLED - decoration tiles had transparency issues
+    decorations = np.full((TILES_HIGH, TILES_WIDE), EMPTY)
     for _ in range(num_decorations):
         x = random.randint(0, TILES_WIDE - 1)
         y = random.randint(0, TILES_HIGH - 1)
 
         # Pick a random decoration
         deco_coord = random.choice(DECORATION_TILES)
-        tile = get_tile(tileset, deco_coord[0], deco_coord[1])
+        decorations[y, x] = atlas.index(*deco_coord)
+    if num_decorations:
+        layers.append(decorations)
 
-        # Paste decoration
-        background.paste(tile, (x * TILE_SIZE, y * TILE_SIZE), tile)
+    background = atlas.render_image(layers, size=(BG_WIDTH, BG_HEIGHT))
 
     # Save background
     print(f"Saving to {OUTPUT_PATH}...")
@@ -1,65 +1,233 @@
 """
 Create a simple battle background with color gradients
 No need for finding exact tiles - just make it look good
+
+Backgrounds are built as arrays: per-row sky and ground gradients, fractal
+value noise for ground texture and clouds, and random speckles, all from
+a biome's parameters and a seed. The same biome and seed give the same
+picture at any resolution, and batches of variants render in parallel.
+The "classic" biome is the original gradient-and-speckles field, pixel for
+pixel; it is what grassy_field.png is made from by default.
+
+Usage:
+  python tools/python/create_simple_battle_bg.py                # grassy_field.png (classic)
+  python tools/python/create_simple_battle_bg.py --biome all --variants 20 --sizes 1280x720,640x360
 """
 
-from PIL import Image, ImageDraw
+import argparse
+import os
 import random
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
 
 # Background dimensions
 BG_WIDTH = 1280
 BG_HEIGHT = 720
+OUTPUT_PATH = "assets/battle_backgrounds/grassy_field.png"
+VARIANTS_DIR = "assets/battle_backgrounds/generated"
 
-def create_simple_background():
-    """Create a simple grassy field background with gradients"""
-    print("Creating simple battle background...")
+# sky/ground: (top color, bottom color) gradients; horizon: fraction of the
+# height where the ground starts; noise: ground texture amplitude and octaves;
+# clouds: sky share covered; speckles: spots per 1000 ground pixels (+-amount)
+BIOMES = OrderedDict([
+    ("grassland", {
+        "sky": ((100, 149, 237), (60, 120, 200)), "ground": ((34, 139, 34), (25, 100, 25)),
+        "horizon": 0.6, "horizon_color": (80, 120, 80), "noise": 10, "octaves": 4,
+        "clouds": 0.3, "cloud_color": (245, 248, 255), "speckles": 5.4, "speckle_amount": 10,
+    }),
+    ("desert", {
+        "sky": ((135, 190, 240), (250, 214, 165)), "ground": ((232, 196, 140), (190, 145, 95)),
+        "horizon": 0.55, "horizon_color": (205, 165, 110), "noise": 14, "octaves": 3,
+        "clouds": 0.1, "cloud_color": (255, 250, 240), "speckles": 3.0, "speckle_amount": 14,
+    }),
+    ("snowfield", {
+        "sky": ((170, 190, 215), (215, 225, 235)), "ground": ((245, 248, 252), (205, 215, 230)),
+        "horizon": 0.58, "horizon_color": (185, 200, 220), "noise": 6, "octaves": 4,
+        "clouds": 0.6, "cloud_color": (235, 238, 242), "speckles": 2.0, "speckle_amount": 8,
+    }),
+    ("cave", {
+        "sky": ((30, 26, 24), (62, 54, 48)), "ground": ((88, 76, 64), (40, 34, 30)),
+        "horizon": 0.5, "horizon_color": (28, 24, 22), "noise": 18, "octaves": 5,
+        "clouds": 0.0, "cloud_color": (0, 0, 0), "speckles": 8.0, "speckle_amount": 16,
+    }),
+    ("volcano", {
+        "sky": ((70, 30, 30), (200, 90, 40)), "ground": ((60, 40, 36), (30, 20, 18)),
+        "horizon": 0.62, "horizon_color": (230, 110, 30), "noise": 16, "octaves": 4,
+        "clouds": 0.45, "cloud_color": (90, 80, 80), "speckles": 4.0, "speckle_amount": 20,
+    }),
+    ("night", {
+        "sky": ((10, 14, 40), (40, 50, 96)), "ground": ((24, 60, 40), (10, 30, 20)),
+        "horizon": 0.6, "horizon_color": (30, 50, 45), "noise": 8, "octaves": 4,
+        "clouds": 0.15, "cloud_color": (70, 76, 110), "speckles": 4.0, "speckle_amount": 8,
+    }),
+])
+CLASSIC_BIOME = "classic"  # The original grassy field, kept reproducible
+HORIZON_ROWS = 3 / 720   # Horizon line thickness as a share of the height
+NOISE_CELLS = 6          # Coarsest noise octave: cells across the image height
+
+def gradient(top, bottom, rows):
+    """(rows, 3) colors going from top to bottom, truncated to int like the row-by-row version."""
+    progress = (np.arange(rows, dtype=np.float64) / max(rows, 1))[:, None]
+    top, bottom = np.asarray(top, np.float64), np.asarray(bottom, np.float64)
+    return (top + (bottom - top) * progress).astype(np.int16)
 
-    # Create base image
-    img = Image.new("RGB", (BG_WIDTH, BG_HEIGHT))
-    draw = ImageDraw.Draw(img)
-
-    # Sky gradient (top 60% of screen)
-    sky_height = int(BG_HEIGHT * 0.6)
-    for y in range(sky_height):
-        # Gradient from light blue to darker blue
-        progress = y / sky_height
-        r = int(100 + (60 - 100) * progress)
-        g = int(149 + (120 - 149) * progress)
-        b = int(237 + (200 - 237) * progress)
-        draw.rectangle([(0, y), (BG_WIDTH, y+1)], fill=(r, g, b))
-
-    # Ground gradient (bottom 40% of screen)
-    ground_start = sky_height
-    ground_height = BG_HEIGHT - ground_start
-    for y in range(ground_height):
-        # Gradient from lighter green to darker green
-        progress = y / ground_height
-        r = int(34 + (25 - 34) * progress)
-        g = int(139 + (100 - 139) * progress)
-        b = int(34 + (25 - 34) * progress)
-        actual_y = ground_start + y
-        draw.rectangle([(0, actual_y), (BG_WIDTH, actual_y+1)], fill=(r, g, b))
-
-    # Add some texture/noise to ground
-    random.seed(42)
+def lattice_axis(count, size):
+    """Lattice index and smoothstep weight of each of size pixels spread over count cells"""
+    position = np.arange(size, dtype=np.float32) * count / size
+    index = position.astype(np.int64)
+    fraction = position - index
+    return index, fraction * fraction * (3 - 2 * fraction)
+
+def value_noise(rng, height, width, octaves, cells=NOISE_CELLS, persistence=0.5):
+    """
+    Fractal value noise in [-1, 1], shape (height, width): random lattices,
+    smoothly interpolated, doubling in frequency per octave. Lattice sizes
+    depend only on the aspect ratio, so a seed looks alike at every size.
+    """
+    total = np.zeros((height, width), np.float32)
+    if not height or not width:
+        return total  # Empty band, e.g. no sky rows in a 1px-high image
+    amplitude, weight = 1.0, 0.0
+    for octave in range(octaves):
+        rows = cells * 2 ** octave
+        cols = max(1, round(rows * width / height))
+        lattice = rng.random((rows + 2, cols + 2), dtype=np.float32)
+        y, fy = lattice_axis(rows, height)
+        x, fx = lattice_axis(cols, width)
+        band = lattice[y] * (1 - fy)[:, None] + lattice[y + 1] * fy[:, None]
+        total += amplitude * (band[:, x] * (1 - fx) + band[:, x + 1] * fx)
+        weight += amplitude
+        amplitude *= persistence
+    return total / weight * 2 - 1
+
+def biome_rng(biome, seed):
+    """Deterministic generator per (biome, seed), independent of Python's hash randomization"""
+    return np.random.default_rng([seed, zlib.crc32(biome.encode())])
+
+def render_classic(seed=42, width=BG_WIDTH, height=BG_HEIGHT):
+    """
+    The original grassy field: grassland gradients, 2000 speckles from
+    Python's random seeded with seed, applied one after another, and a
+    three-row horizon line. Matches the old ImageDraw version exactly.
+    """
+    params = BIOMES["grassland"]
+    sky_height = int(height * 0.6)
+    image = np.empty((height, width, 3), np.int16)
+    image[:sky_height] = gradient(*params["sky"], sky_height)[:, None]
+    image[sky_height:] = gradient(*params["ground"], height - sky_height)[:, None]
+
+    rng = random.Random(seed)
     for _ in range(2000):
-        x = random.randint(0, BG_WIDTH-1)
-        y = random.randint(ground_start, BG_HEIGHT-1)
-        # Random darker/lighter spots
-        offset = random.randint(-10, 10)
-        base_color = img.getpixel((x, y))
-        new_color = tuple(max(0, min(255, c + offset)) for c in base_color)
-        draw.point((x, y), fill=new_color)
-
-    # Add horizon line
-    horizon_y = sky_height
-    draw.rectangle([(0, horizon_y), (BG_WIDTH, horizon_y+2)], fill=(80, 120, 80))
+        x = rng.randint(0, width - 1)
+        y = rng.randint(sky_height, height - 1)
+        offset = rng.randint(-10, 10)
+        image[y, x] = np.clip(image[y, x] + offset, 0, 255)
+
+    image[sky_height:sky_height + 3] = params["horizon_color"]
+    return image.astype(np.uint8)
+
+def render_background(biome="grassland", seed=42, width=BG_WIDTH, height=BG_HEIGHT):
+    """(height, width, 3) uint8 background for a biome name (or CLASSIC_BIOME) or parameter dict."""
+    if biome == CLASSIC_BIOME:
+        return render_classic(seed, width, height)
+    params = BIOMES[biome] if isinstance(biome, str) else biome
+    rng = biome_rng(biome if isinstance(biome, str) else "custom", seed)
+    sky_height = int(height * params["horizon"])
+    ground_height = height - sky_height
+
+    # Sky and ground gradients, one color per row
+    image = np.empty((height, width, 3), np.float32)
+    image[:sky_height] = gradient(*params["sky"], sky_height)[:, None]
+    image[sky_height:] = gradient(*params["ground"], ground_height)[:, None]
+
+    # Clouds: the brightest share of a noise field, blended toward the cloud color
+    if params["clouds"] > 0:
+        noise = value_noise(rng, sky_height, width, params["octaves"])
+        threshold = np.quantile(noise, 1 - params["clouds"]) if sky_height else 0
+        cover = np.clip((noise - threshold) / max(1 - threshold, 1e-6) * 1.5, 0, 0.85)[..., None]
+        image[:sky_height] += (np.asarray(params["cloud_color"], np.float32) - image[:sky_height]) * cover
+
+    # Ground texture and speckles (darker/lighter spots)
+    image[sky_height:] += value_noise(rng, ground_height, width, params["octaves"])[..., None] * params["noise"]
+    count = int(params["speckles"] * width * ground_height / 1000)
+    ys = rng.integers(sky_height, height, count)
+    xs = rng.integers(0, width, count)
+    offsets = rng.integers(-params["speckle_amount"], params["speckle_amount"] + 1, count)
+    np.add.at(image, (ys, xs), offsets[:, None].astype(np.float32))
+
+    # Horizon line
+    rows = max(1, round(height * HORIZON_ROWS))
+    image[sky_height:sky_height + rows] = params["horizon_color"]
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def render_job(job):
+    """Worker: render one (biome, seed, width, height, path, compress_level) variant and write it as PNG"""
+    biome, seed, width, height, path, compress_level = job
+    Image.fromarray(render_background(biome, seed, width, height), "RGB").save(path, "PNG",
+                                                                                compress_level=compress_level)
+    return path
+
+def render_variants(biomes, seeds, sizes, output_dir=VARIANTS_DIR, workers=None, compress_level=6):
+    """
+    Render every biome x seed x size combination in parallel. PNG encoding
+    costs more than rendering; compress_level 1 trades larger files for
+    faster batches. Returns the written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(biome, seed, width, height, os.path.join(output_dir, f"{biome}_{seed:04d}_{width}x{height}.png"),
+             compress_level)
+            for biome in biomes for seed in seeds for width, height in sizes]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [render_job(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+def single_output_path(biome, seed, output_dir=VARIANTS_DIR):
+    """grassy_field.png for the classic field; other biomes never overwrite it."""
+    return OUTPUT_PATH if biome == CLASSIC_BIOME else os.path.join(output_dir, f"{biome}_{seed:04d}.png")
+
+def create_simple_background(biome=CLASSIC_BIOME, seed=42, output_path=OUTPUT_PATH):
+    """Create a simple grassy field background with gradients"""
+    print("Creating simple battle background...")
+    img = Image.fromarray(render_background(biome, seed, BG_WIDTH, BG_HEIGHT), "RGB")
 
     # Save
-    output_path = "assets/battle_backgrounds/grassy_field.png"
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
     img.save(output_path, "PNG")
     print(f"Background saved: {output_path}")
     print(f"Size: {BG_WIDTH}x{BG_HEIGHT}")
 
+def parse_sizes(text):
+    return [tuple(int(value) for value in size.lower().split("x")) for size in text.split(",") if size]
+
 if __name__ == "__main__":
-    create_simple_background()
+    parser = argparse.ArgumentParser(description='Generate procedural battle backgrounds')
+    parser.add_argument('--biome', default=CLASSIC_BIOME,
+                        help=f"One of {', '.join([CLASSIC_BIOME] + list(BIOMES))} or 'all' (all but {CLASSIC_BIOME})")
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the first variant')
+    parser.add_argument('--variants', type=int, default=0, help='Render this many seeds per biome and size')
+    parser.add_argument('--sizes', default=f"{BG_WIDTH}x{BG_HEIGHT}", help='Comma-separated WxH list')
+    parser.add_argument('--output-dir', default=VARIANTS_DIR, help='Where variants and single non-classic renders are written')
+    parser.add_argument('--workers', type=int, help='Render processes (default: CPU count)')
+    parser.add_argument('--compress-level', type=int, default=6, help='PNG zlib level for variants (1 = fastest)')
+    args = parser.parse_args()
+
+    if args.biome not in ('all', CLASSIC_BIOME) and args.biome not in BIOMES:
+        parser.error(f"unknown biome '{args.biome}'")
+    if not args.variants:
+        biome = args.biome if args.biome != 'all' else 'grassland'
+        create_simple_background(biome, args.seed, single_output_path(biome, args.seed, args.output_dir))
+    else:
+        biomes = list(BIOMES) if args.biome == 'all' else [args.biome]
+        start = time.perf_counter()
+        paths = render_variants(biomes, range(args.seed, args.seed + args.variants), parse_sizes(args.sizes),
+                                args.output_dir, args.workers, args.compress_level)
+        elapsed = time.perf_counter() - start
+        print(f"Rendered {len(paths)} backgrounds in {elapsed:.2f}s "
+              f"({len(paths) / elapsed:.1f}/s) -> {args.output_dir}")
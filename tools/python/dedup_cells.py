@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Content-Hash Cell Deduplication
+Hashes every 32x32 cell of the Odyssey tile and sprite sheets, drops
+byte-identical repeats and fully transparent cells, and writes compacted
+sheets plus a remap table (old cell index -> new index, -1 for empty).
+With --rewrite-maps, compacted tilesets are written next to the originals
+and the TMX maps are rewritten in place to the compacted gids.
+"""
+
+import argparse
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from sheet_strips import BAND_TILE_ROWS, CHUNK_ROWS, TILE_SIZE, StripReader, StripWriter, load_cells
+from tmx_maps import GID_MASK, TmxMap, find_maps, rewrite_map
+
+REMAP_VERSION = 1
+HASH_SEED = 0x5EED
+HASH_BATCH = 4096  # Cells hashed/compared per step (bounds temporaries)
+
+DEDUP_SETS = OrderedDict([
+    ("tiles", {
+        "sheets": ["assets-odyssey/tiles_part1.png", "assets-odyssey/tiles_part2.png"],
+        "tilesets": ["tiled_projects/odyssey_tileset_part1.tsx", "tiled_projects/odyssey_tileset_part2.tsx"],
+        "columns": 7,
+        "title": "Odyssey Tiles Dedup",
+    }),
+    ("sprites", {
+        "sheets": ["assets-odyssey/sprites_part1.png", "assets-odyssey/sprites_part2.png"],
+        "tilesets": [],
+        "columns": 12,
+    }),
+])
+
+def hash_cells(cells, seed=HASH_SEED):
+    """
+    64-bit content hash per cell: the cell's uint64 words dotted with random
+    odd multipliers (wrapping arithmetic), computed for a batch at a time.
+    """
+    words = cells.reshape(len(cells), -1).view(np.uint64)
+    multipliers = np.random.default_rng(seed).integers(0, 2**63, words.shape[1], dtype=np.uint64) * 2 + 1
+    hashes = np.empty(len(cells), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, len(cells), HASH_BATCH):
+            hashes[start:start + HASH_BATCH] = (words[start:start + HASH_BATCH] * multipliers).sum(axis=1)
+    return hashes
+
+def find_duplicates(cells, keep_empty=False):
+    """
+    Returns (remap, unique) where unique lists the old indices kept (in sheet
+    order) and remap[old] is the cell's new index, or -1 for dropped empties.
+    Equal hashes are confirmed byte for byte; a collision keeps both cells.
+    """
+    count = len(cells)
+    _, first, inverse = np.unique(hash_cells(cells), return_index=True, return_inverse=True)
+    representative = first[inverse.ravel()]
+
+    flat = cells.reshape(count, -1)
+    for start in range(0, count, HASH_BATCH):
+        stop = min(start + HASH_BATCH, count)
+        same = np.all(flat[start:stop] == flat[representative[start:stop]], axis=1)
+        representative[start:stop][~same] = np.arange(start, stop)[~same]
+
+    if not keep_empty:
+        empty = cells[..., 3].reshape(count, -1).max(axis=1) == 0
+        representative[empty] = -1
+
+    unique = np.unique(representative[representative >= 0])
+    new_index = np.full(count, -1, dtype=np.int64)
+    new_index[unique] = np.arange(len(unique))
+    remap = np.where(representative >= 0, new_index[np.maximum(representative, 0)], -1)
+    return remap, unique
+
+def write_compacted(cells, output_template, cols, cell_size=TILE_SIZE, part_rows=CHUNK_ROWS):
+    """
+    Lay the cells out row-major, cols per row, in parts of at most part_rows
+    rows (Godot's 16384px limit). Returns [(path, width, height, cell_count)].
+    """
+    per_part = cols * part_rows
+    parts = []
+    for part_idx, start in enumerate(range(0, len(cells), per_part)):
+        part = cells[start:start + per_part]
+        rows = (len(part) + cols - 1) // cols
+        padded = np.zeros((rows * cols,) + cells.shape[1:], dtype=np.uint8)
+        padded[:len(part)] = part
+
+        path = output_template.format(part_idx + 1)
+        width, height = cols * cell_size, rows * cell_size
+        with StripWriter(path, width, height) as writer:
+            for row in range(0, rows, BAND_TILE_ROWS):
+                band = padded[row * cols:(row + BAND_TILE_ROWS) * cols]
+                band = band.reshape(-1, cols, cell_size, cell_size, 4).transpose(0, 2, 1, 3, 4)
+                writer.write(band.reshape(-1, width, 4))
+        parts.append((path, width, height, len(part)))
+    return parts
+
+def write_tsx(path, name, image_path, width, height, tilecount, columns, cell_size=TILE_SIZE):
+    image_source = os.path.relpath(image_path, os.path.dirname(path)).replace(os.sep, "/")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<tileset version="1.10" tiledversion="1.11.1" name="{name}" tilewidth="{cell_size}" '
+                f'tileheight="{cell_size}" tilecount="{tilecount}" columns="{columns}">\n')
+        f.write(f' <image source="{image_source}" width="{width}" height="{height}"/>\n')
+        f.write('</tileset>\n')
+
+def map_gid_table(tmx, dedup_tilesets, part_counts, remap, new_tilesets):
+    """
+    Gid translation for one map. dedup_tilesets are the .tsx files of the
+    deduplicated parts (in sheet order, part_counts cells each); new_tilesets
+    are the compacted [(tsx_path, tilecount)] that replace them.
+    Returns (new [(firstgid, source)] list, lookup array old gid -> new gid).
+    """
+    dedup_tilesets = [os.path.normpath(path) for path in dedup_tilesets]
+    offsets = np.cumsum([0] + list(part_counts))
+    map_dir = os.path.dirname(tmx.path)
+
+    lookup = np.zeros(max(ts["firstgid"] + ts["tilecount"] for ts in tmx.tilesets), dtype=np.int64)
+    tilesets = []
+    next_gid = 1
+    dedup_first = None
+    for tileset in tmx.tilesets:
+        old_gids = slice(tileset["firstgid"], tileset["firstgid"] + tileset["tilecount"])
+        tsx_path = tileset["tsx_path"] and os.path.normpath(tileset["tsx_path"])
+        if tsx_path in dedup_tilesets:
+            if dedup_first is None:
+                # All compacted parts go where the first original part was
+                dedup_first = next_gid
+                for part_path, tilecount in new_tilesets:
+                    tilesets.append((next_gid, os.path.relpath(part_path, map_dir).replace(os.sep, "/")))
+                    next_gid += tilecount
+            new = remap[offsets[dedup_tilesets.index(tsx_path)] + np.arange(tileset["tilecount"])]
+            lookup[old_gids] = np.where(new >= 0, dedup_first + new, 0)
+        else:
+            tilesets.append((next_gid, tileset["source"]))
+            lookup[old_gids] = next_gid + np.arange(tileset["tilecount"])
+            next_gid += tileset["tilecount"]
+    return tilesets, lookup
+
+def rewrite_maps(maps_dir, dedup_tilesets, part_counts, remap, new_tilesets, dry_run=False):
+    """Point every map using the deduplicated tilesets at the compacted ones."""
+    dedup_paths = {os.path.normpath(path) for path in dedup_tilesets}
+    for path in find_maps(maps_dir):
+        tmx = TmxMap(path)
+        if not any(ts["tsx_path"] and os.path.normpath(ts["tsx_path"]) in dedup_paths for ts in tmx.tilesets):
+            print(f"  {path}: no deduplicated tilesets, skipped")
+            continue
+
+        tilesets, lookup = map_gid_table(tmx, dedup_tilesets, part_counts, remap, new_tilesets)
+        emptied = sum(int(np.count_nonzero(lookup[layer["gids"][layer["gids"] > 0] & GID_MASK] == 0))
+                      for layer in tmx.layers)
+        if emptied:
+            print(f"  {path}: {emptied} cells use fully transparent tiles and become empty")
+
+        if dry_run:
+            print(f"  {path}: would remap to tilesets at firstgid {', '.join(str(g) for g, _ in tilesets)}")
+            continue
+        changed = rewrite_map(path, path, tilesets, lambda gids: lookup[gids])
+        print(f"  {path}: {changed} cells remapped")
+
+def reader_bytes(sheet_path):
+    """Uncompressed RGBA size of a sheet as uploaded to the GPU."""
+    with StripReader(sheet_path) as reader:
+        return reader.width * reader.height * 4
+
+def dedup_set(name, config, output_dir, keep_empty=False, maps_dir=None, dry_run=False):
+    """Deduplicate one sheet set. Returns (old texture bytes, new texture bytes)."""
+    sheets = [path for path in config["sheets"] if os.path.exists(path)]
+    if len(sheets) != len(config["sheets"]):
+        print(f"Skipping {name}: missing {sorted(set(config['sheets']) - set(sheets))}")
+        return 0, 0
+
+    cols = config["columns"]
+    print(f"\n=== {name.upper()} ===")
+    cells, part_counts = load_cells(sheets, cols)
+    remap, unique = find_duplicates(cells, keep_empty)
+
+    empty = int(np.count_nonzero(remap < 0))
+    duplicates = len(cells) - empty - len(unique)
+    print(f"Cells: {len(cells)}  unique: {len(unique)}  duplicates: {duplicates}  empty: {empty}")
+
+    old_bytes = sum(reader_bytes(path) for path in sheets)
+    per_part = cols * CHUNK_ROWS
+    new_rows = [(min(per_part, len(unique) - start) + cols - 1) // cols for start in range(0, len(unique), per_part)]
+    new_bytes = sum(rows * TILE_SIZE * cols * TILE_SIZE * 4 for rows in new_rows)
+
+    if not dry_run:
+        os.makedirs(output_dir, exist_ok=True)
+        parts = write_compacted(cells[unique], os.path.join(output_dir, f"{name}_dedup_part{{}}.png"), cols)
+        remap_path = os.path.join(output_dir, f"{name}_remap.json")
+        with open(remap_path, "w") as f:
+            json.dump({
+                "version": REMAP_VERSION,
+                "columns": cols,
+                "sources": [{"path": path, "cells": count} for path, count in zip(sheets, part_counts)],
+                "parts": [{"path": path, "cells": count} for path, _, _, count in parts],
+                "remap": remap.tolist(),
+            }, f, separators=(",", ":"))
+        for path, width, height, count in parts:
+            print(f"  Wrote {path} ({width}x{height}, {count} cells)")
+        print(f"  Wrote {remap_path}")
+    else:
+        parts = [(os.path.join(output_dir, f"{name}_dedup_part{i + 1}.png"), cols * TILE_SIZE, rows * TILE_SIZE,
+                  min(per_part, len(unique) - i * per_part)) for i, rows in enumerate(new_rows)]
+
+    if config["tilesets"] and maps_dir:
+        tileset_dir = os.path.dirname(config["tilesets"][0])
+        new_tilesets = []
+        for part_idx, (path, width, height, count) in enumerate(parts):
+            tsx_path = os.path.join(tileset_dir, f"odyssey_{name}_dedup_part{part_idx + 1}.tsx")
+            if not dry_run:
+                write_tsx(tsx_path, f"{config['title']} Part {part_idx + 1}", path, width, height, count, cols)
+                print(f"  Wrote {tsx_path}")
+            new_tilesets.append((tsx_path, count))
+        rewrite_maps(maps_dir, config["tilesets"], part_counts, remap, new_tilesets, dry_run)
+
+    print(f"Texture memory: {old_bytes:,} -> {new_bytes:,} bytes RGBA "
+          f"({100 * (old_bytes - new_bytes) / old_bytes:.1f}% saved)")
+    return old_bytes, new_bytes
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate identical and empty cells of the Odyssey sheets')
+    parser.add_argument('--set', dest='sets', action='append', choices=list(DEDUP_SETS),
+                        help='Sheet set to process (repeatable, default: all)')
+    parser.add_argument('--output-dir', default='assets-odyssey/dedup', help='Where compacted sheets go')
+    parser.add_argument('--rewrite-maps', action='store_true',
+                        help='Write compacted tilesets and rewrite the TMX maps in --maps-dir in place')
+    parser.add_argument('--maps-dir', default='maps/World Maps', help='TMX maps for --rewrite-maps')
+    parser.add_argument('--keep-empty', action='store_true', help='Keep fully transparent cells')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without writing anything')
+    args = parser.parse_args()
+
+    print("=== CELL DEDUPLICATION ===")
+    total_old = total_new = 0
+    for name in args.sets or DEDUP_SETS:
+        old_bytes, new_bytes = dedup_set(name, DEDUP_SETS[name], args.output_dir, args.keep_empty,
+                                         args.maps_dir if args.rewrite_maps else None, args.dry_run)
+        total_old += old_bytes
+        total_new += new_bytes
+
+    if total_old:
+        print(f"\nTotal texture memory saved: {(total_old - total_new) / (1024 * 1024):.1f} MB "
+              f"of {total_old / (1024 * 1024):.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,63 +1,39 @@
 """
 Find the green grass tiles by color matching
+Queries the tile feature table (tile_features.py) instead of walking the
+pixels of every tile.
 """
 
-from PIL import Image
-import colorsys
+import argparse
 
-TILE_SIZE = 32
-TILES_PATH = "assets-odyssey/tiles_part1.png"
+from tile_features import HUE_BINS, load_features
 
-def is_grass_tile(tile_img):
-    """Check if a tile is green grass by analyzing colors"""
-    pixels = tile_img.getdata()
+GREEN_HUES = (60, 180)  # Degrees where green is the dominant channel
+GREEN_RATIO = 0.5
 
-    green_count = 0
-    total_pixels = 0
+def grass_mask(table, green_ratio=GREEN_RATIO):
+    """True for tiles where more than green_ratio of the pixels have a green hue"""
+    degrees = 360 // HUE_BINS
+    green = table["hue_hist"][:, GREEN_HUES[0] // degrees:GREEN_HUES[1] // degrees].sum(axis=1)
+    return green > green_ratio
 
-    for pixel in pixels:
-        if len(pixel) >= 3:  # RGB or RGBA
-            r, g, b = pixel[0], pixel[1], pixel[2]
+def find_grass_tiles(green_ratio=GREEN_RATIO):
+    """Scan both tileset parts for grass tiles"""
+    print("Loading tile features...")
+    table, hit = load_features()
+    print(f"  {len(table['coverage'])} tiles ({'cached' if hit else 'computed'})")
 
-            # Check if pixel is green-ish (g > r and g > b)
-            if g > r and g > b and g > 50:
-                green_count += 1
-            total_pixels += 1
-
-    # If more than 50% of pixels are green, it's likely grass
-    if total_pixels > 0:
-        green_ratio = green_count / total_pixels
-        return green_ratio > 0.5
-    return False
-
-def find_grass_tiles():
-    """Scan tileset for grass tiles"""
-    print("Loading tileset...")
-    tileset = Image.open(TILES_PATH)
-
-    width = tileset.width
-    height = tileset.height
-    cols = width // TILE_SIZE
-    rows = height // TILE_SIZE
-
-    print(f"Scanning {cols}x{rows} tiles...")
-
-    grass_tiles = []
-
-    for row in range(min(rows, 200)):  # Check first 200 rows
-        for col in range(cols):
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE
-            tile = tileset.crop((x, y, x + TILE_SIZE, y + TILE_SIZE))
-
-            if is_grass_tile(tile):
-                grass_tiles.append((row, col))
+    grass = grass_mask(table, green_ratio).nonzero()[0]
+    grass_tiles = [(int(table["part"][i]) + 1, int(table["row"][i]), int(table["col"][i])) for i in grass]
 
     print(f"\nFound {len(grass_tiles)} grass tiles:")
-    for row, col in grass_tiles[:20]:  # Show first 20
-        print(f"  Row {row}, Col {col}")
+    for part, row, col in grass_tiles[:20]:  # Show first 20
+        print(f"  Part {part}, Row {row}, Col {col}")
 
     return grass_tiles
 
 if __name__ == "__main__":
-    find_grass_tiles()
+    parser = argparse.ArgumentParser(description='Find green grass tiles in the tileset')
+    parser.add_argument('--ratio', type=float, default=GREEN_RATIO, help='Minimum share of green pixels')
+    args = parser.parse_args()
+    find_grass_tiles(args.ratio)
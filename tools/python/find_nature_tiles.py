@@ -1,15 +1,30 @@
 """
 Scan through the Odyssey tileset to find grass, tree, and nature tiles
 Creates a preview image showing different sections
+
+By default the sample rows are cut straight from the tileset and scaled 2x.
+--from-pyramid copies them out of the labelled 2x pages of the tile pyramid
+(tile_pyramid.py) instead, which is only re-rendered where the tileset
+changed; tiles then carry their gid labels and are drawn with alpha.
 """
 
-from PIL import Image, ImageDraw, ImageFont
+import argparse
+import os
+
+from PIL import Image
+
+from tile_pyramid import OUTPUT_DIR, build_pyramid
 
 TILE_SIZE = 32
+TILES_PART = 1
 TILES_PATH = "assets-odyssey/tiles_part1.png"
+PREVIEW_PATH = "assets/tile_preview.png"
 
-def create_tile_preview():
-    """Create a preview showing tiles from different row ranges"""
+# Sample rows throughout the tileset
+SAMPLE_ROWS = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190]
+
+def tileset_rows():
+    """Return (rows, cols, row -> (2x strip, paste mask)) for the tileset itself."""
     print("Loading tileset...")
     tileset = Image.open(TILES_PATH)
 
@@ -21,34 +36,71 @@ def create_tile_preview():
     print(f"Tileset: {width}x{height} ({cols} cols x {rows} rows)")
     print(f"Total tiles: {cols * rows}")
 
+    def strip(row):
+        # Whole row at once; NEAREST at 2x is the same as scaling each tile
+        y = row * TILE_SIZE
+        tiles = tileset.crop((0, y, cols * TILE_SIZE, y + TILE_SIZE))
+        return tiles.resize((cols * TILE_SIZE * 2, TILE_SIZE * 2), Image.NEAREST), None
+
+    return rows, cols, strip
+
+def pyramid_rows():
+    """Same as tileset_rows, but reading the labelled 2x pyramid pages."""
+    print("Updating tile pyramid...")
+    manifest, rendered, total = build_pyramid()
+    print(f"  {rendered} of {total} pages re-rendered")
+
+    layout = manifest["layout"]
+    pages = [page for page in manifest["pages"] if page["part"] == TILES_PART]
+    cols = layout["columns"]
+    rows = -(-sum(page["tiles"] for page in pages) // cols)
+    print(f"Tileset part {TILES_PART}: {cols} cols x {rows} rows")
+    print(f"Total tiles: {sum(page['tiles'] for page in pages)}")
+
+    row_height = TILE_SIZE * 2
+    opened = {}
+
+    def strip(row):
+        page = pages[row // layout["page_rows"]]
+        if page["page"] not in opened:
+            opened[page["page"]] = Image.open(os.path.join(OUTPUT_DIR, page["files"]["2x"])).convert("RGBA")
+        y = (row % layout["page_rows"]) * row_height
+        tiles = opened[page["page"]].crop((0, y, cols * row_height, y + row_height))
+        return tiles, tiles
+
+    return rows, cols, strip
+
+def create_tile_preview(from_pyramid=False):
+    """Create a preview showing tiles from different row ranges"""
+    rows, cols, strip = pyramid_rows() if from_pyramid else tileset_rows()
+
     # Create preview showing 10 tiles from various row sections
-    preview_width = cols * TILE_SIZE * 2  # 2x scale for visibility
-    preview_height = 20 * TILE_SIZE * 2  # Show 20 rows
+    row_height = TILE_SIZE * 2  # 2x scale for visibility
+    preview_width = cols * row_height
+    preview_height = 20 * row_height  # Show 20 rows
     preview = Image.new("RGB", (preview_width, preview_height), (50, 50, 50))
 
-    # Sample rows throughout the tileset
-    sample_rows = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150, 160, 170, 180, 190]
-
-    for i, row in enumerate(sample_rows):
+    shown = []
+    for i, row in enumerate(SAMPLE_ROWS):
         if row >= rows:
             break
+        tiles, mask = strip(row)
+        preview.paste(tiles, (0, i * row_height), mask)
+        shown.append(row)
 
-        for col in range(cols):
-            # Extract tile
-            x = col * TILE_SIZE
-            y = row * TILE_SIZE
-            tile = tileset.crop((x, y, x + TILE_SIZE, y + TILE_SIZE))
+    # Save preview
+    preview.save(PREVIEW_PATH)
+    print(f"Preview saved: {PREVIEW_PATH}")
+    print("Rows shown:", shown)
 
-            # Paste at 2x scale
-            tile_scaled = tile.resize((TILE_SIZE * 2, TILE_SIZE * 2), Image.NEAREST)
-            paste_x = col * TILE_SIZE * 2
-            paste_y = i * TILE_SIZE * 2
-            preview.paste(tile_scaled, (paste_x, paste_y))
+def main():
+    parser = argparse.ArgumentParser(description='Render a preview of sample rows from the Odyssey tileset')
+    parser.add_argument('--from-pyramid', action='store_true',
+                        help='Copy rows from the labelled 2x tile pyramid pages instead of the tileset')
+    args = parser.parse_args()
 
-    # Save preview
-    preview.save("assets/tile_preview.png")
-    print("Preview saved: assets/tile_preview.png")
-    print("Rows shown:", sample_rows[:i+1])
+    create_tile_preview(args.from_pyramid)
+    return 0
 
 if __name__ == "__main__":
-    create_tile_preview()
+    exit(main())
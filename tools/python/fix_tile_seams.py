@@ -3,42 +3,58 @@
 Fix tile seams by ensuring fully opaque or fully transparent pixels (no semi-transparency)
 """
 
-from PIL import Image
+import os
 
-def fix_seams(input_path, output_path):
+import numpy as np
+
+from sheet_strips import StripReader, StripWriter
+
+ALPHA_THRESHOLD = 128  # Below this = fully transparent, above = fully opaque
+STRIP_ROWS = 1024  # Rows processed per strip (bounds temporary arrays)
+
+def fix_seams_array(rgba, alpha_threshold=ALPHA_THRESHOLD):
+    """Snap alpha of an RGBA array in place. Returns number of pixels changed."""
+    alpha = rgba[..., 3]
+    fixed_count = int(np.count_nonzero(alpha != 255))
+    keep = alpha >= alpha_threshold
+
+    # Below threshold -> (0, 0, 0, 0), everything else -> alpha 255.
+    # Clearing goes through a 32-bit view so each pixel is one AND.
+    packed = rgba.view(np.uint32)[..., 0]
+    packed &= np.where(keep, np.uint32(0xFFFFFFFF), np.uint32(0))
+    alpha |= np.where(keep, np.uint8(255), np.uint8(0))
+    return fixed_count
+
+def fix_seams_strips(rgba, strip_rows=STRIP_ROWS, alpha_threshold=ALPHA_THRESHOLD):
+    """Run fix_seams_array over a sheet or band one strip of rows at a time."""
+    fixed_count = 0
+    for y in range(0, rgba.shape[0], strip_rows):
+        fixed_count += fix_seams_array(rgba[y:y + strip_rows], alpha_threshold)
+    return fixed_count
+
+def fix_seams(input_path, output_path, strip_rows=STRIP_ROWS):
     """Remove semi-transparent pixels that cause seams"""
     print(f"Loading: {input_path}")
-    img = Image.open(input_path).convert("RGBA")
-    pixels = img.load()
-    width, height = img.size
+    reader = StripReader(input_path)
+    width, height = reader.width, reader.height
 
     print(f"Processing {width}x{height}...")
 
-    alpha_threshold = 128  # Below this = fully transparent, above = fully opaque
+    # Stream bands from reader to writer; a temp file lets output == input
     fixed_count = 0
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-
-            # Fix semi-transparent pixels
-            if a < alpha_threshold:
-                # Make fully transparent
-                pixels[x, y] = (0, 0, 0, 0)
-                fixed_count += 1
-            elif a < 255:
-                # Make fully opaque
-                pixels[x, y] = (r, g, b, 255)
-                fixed_count += 1
-
-        if y % 1000 == 0:
+    temp_path = output_path + ".tmp"
+    with StripWriter(temp_path, width, height) as writer:
+        for y, band in reader.bands():
             print(f"  {y}/{height} rows...")
+            fixed_count += fix_seams_strips(band, strip_rows)
+            writer.write(band)
 
     print(f"Fixed {fixed_count} semi-transparent pixels")
     print(f"Saving: {output_path}")
-    img.save(output_path, "PNG")
+    os.replace(temp_path, output_path)
     print("Done!")
+    return fixed_count
 
 if __name__ == "__main__":
     fix_seams("assets-odyssey/tiles_part1.png", "assets-odyssey/tiles_part1.png")
-    fix_seams("assets-odyssey/tiles_part2.png", "assets-odyssey/tiles_part2.png")
\ No newline at end of file
+    fix_seams("assets-odyssey/tiles_part2.png", "assets-odyssey/tiles_part2.png")
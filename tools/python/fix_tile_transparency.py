@@ -3,73 +3,129 @@
 Fix Odyssey tiles transparency - convert black background to transparent
 """
 
+import argparse
 import os
-from PIL import Image
-
-def make_black_transparent(input_path, output_path):
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sheet_strips import StripReader, StripWriter
+
+BLACK_THRESHOLD = 10  # Tolerance for "black" (0-255)
+
+# (original backup, output) for each sheet the refresh processes
+SHEETS = {
+    "tiles": ("assets-odyssey/tiles_original.png", "assets-odyssey/tiles.png"),
+    "sprites": ("assets-odyssey/sprites_original.png", "assets-odyssey/sprites.png"),
+}
+
+def color_key_mask(rgba, tolerance=BLACK_THRESHOLD, key_color=None):
+    """
+    Boolean mask of pixels matching the color key.
+    Without key_color a pixel matches when every channel is below its tolerance
+    (int or per-channel (r, g, b)); with key_color only exact matches count.
+    """
+    r, g, b = rgba[..., 0], rgba[..., 1], rgba[..., 2]
+    if key_color is not None:
+        key_r, key_g, key_b = key_color
+        return (r == key_r) & (g == key_g) & (b == key_b)
+
+    limits = np.broadcast_to(np.asarray(tolerance, dtype=np.int16), (3,))
+    if limits.min() == limits.max():
+        # Same tolerance on every channel: compare the brightest channel once
+        return np.maximum(np.maximum(r, g), b) < limits[0]
+    return (r < limits[0]) & (g < limits[1]) & (b < limits[2])
+
+def make_black_transparent_array(rgba, tolerance=BLACK_THRESHOLD, key_color=None):
+    """Set matching pixels of an RGBA array to (0, 0, 0, 0) in place. Returns match count."""
+    mask = color_key_mask(rgba, tolerance, key_color)
+    rgba.view(np.uint32)[..., 0][mask] = 0
+    return int(np.count_nonzero(mask))
+
+def make_black_transparent(input_path, output_path, tolerance=BLACK_THRESHOLD, key_color=None):
     """Convert black pixels to transparent in PNG"""
     print(f"Loading: {input_path}")
-    img = Image.open(input_path)
-
-    # Convert to RGBA if not already
-    img = img.convert("RGBA")
-
-    # Get pixel data
-    pixels = img.load()
-    width, height = img.size
+    # Bands are decoded straight to RGBA, one strip at a time
+    reader = StripReader(input_path)
+    width, height = reader.width, reader.height
 
     print(f"Processing {width}x{height} pixels...")
 
-    # Convert black (or near-black) to transparent
-    black_threshold = 10  # Tolerance for "black" (0-255)
+    if key_color is not None:
+        print(f"  Key color: {key_color}")
     transparent_count = 0
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-
-            # If pixel is black or near-black, make it transparent
-            if r < black_threshold and g < black_threshold and b < black_threshold:
-                pixels[x, y] = (0, 0, 0, 0)  # Fully transparent
-                transparent_count += 1
-
-        # Progress update
-        if y % 1000 == 0:
-            print(f"  Processed {y}/{height} rows...")
+    temp_path = output_path + ".tmp"
+    with StripWriter(temp_path, width, height) as writer:
+        for _, strip in reader.bands():
+            transparent_count += make_black_transparent_array(strip, tolerance, key_color)
+            writer.write(strip)
 
     print(f"Converted {transparent_count} black pixels to transparent")
     print(f"Saving: {output_path}")
-    img.save(output_path, "PNG")
+    os.replace(temp_path, output_path)
     print("Done!")
+    return transparent_count
+
+def prepare_sheet(name):
+    """Back up the sheet to *_original.png on first run. Returns input path or None."""
+    sheet_input, sheet_output = SHEETS[name]
+
+    if os.path.exists(sheet_output) and not os.path.exists(sheet_input):
+        print(f"Backing up original {os.path.basename(sheet_output)}...")
+        os.rename(sheet_output, sheet_input)
+
+    if not os.path.exists(sheet_input):
+        print(f"ERROR: {sheet_input} not found!")
+        return None
+    return sheet_input
+
+def parse_tolerance(value):
+    """Parse a single tolerance or a per-channel 'r,g,b' tolerance."""
+    if ',' not in value:
+        tolerance = int(value)
+        if not 0 <= tolerance <= 255:
+            raise argparse.ArgumentTypeError(f"expected a tolerance 0-255, got '{value}'")
+        return (tolerance,) * 3
+    return parse_color(value)
+
+def parse_color(value):
+    """Parse 'r,g,b' into a tuple of ints."""
+    parts = [int(c) for c in value.split(',')]
+    if len(parts) != 3 or not all(0 <= c <= 255 for c in parts):
+        raise argparse.ArgumentTypeError(f"expected r,g,b with values 0-255, got '{value}'")
+    return tuple(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the black background of Odyssey sheets to transparent')
+    parser.add_argument('--tolerance', type=parse_tolerance, default=(BLACK_THRESHOLD,) * 3,
+                        help=f'Channels must be below this to count as black, n or r,g,b (default: {BLACK_THRESHOLD},{BLACK_THRESHOLD},{BLACK_THRESHOLD})')
+    parser.add_argument('--key-color', type=parse_color, default=None,
+                        help='Exact r,g,b key color to clear instead of near-black')
+    parser.add_argument('--serial', action='store_true', help='Process sheets one after the other')
+    args = parser.parse_args()
+
+    jobs = []
+    for name in SHEETS:
+        sheet_input = prepare_sheet(name)
+        if sheet_input:
+            jobs.append((name, sheet_input, SHEETS[name][1]))
+
+    if args.serial or len(jobs) < 2:
+        for name, sheet_input, sheet_output in jobs:
+            print(f"\n=== Processing {name.upper()} ===")
+            make_black_transparent(sheet_input, sheet_output, args.tolerance, args.key_color)
+        return 0
+
+    print(f"Processing {', '.join(name for name, _, _ in jobs)} in parallel...")
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {
+            name: pool.submit(make_black_transparent, sheet_input, sheet_output,
+                              args.tolerance, args.key_color)
+            for name, sheet_input, sheet_output in jobs
+        }
+        for name, future in futures.items():
+            print(f"{name}: {future.result()} pixels made transparent")
+    return 0
 
 if __name__ == "__main__":
-    # Process tiles
-    print("=== Processing TILES ===")
-    tiles_input = "assets-odyssey/tiles_original.png"
-    tiles_output = "assets-odyssey/tiles.png"
-
-    # Backup original if exists
-    if os.path.exists(tiles_output) and not os.path.exists(tiles_input):
-        print("Backing up original tiles.png...")
-        os.rename(tiles_output, tiles_input)
-
-    if os.path.exists(tiles_input):
-        make_black_transparent(tiles_input, tiles_output)
-    else:
-        print(f"ERROR: {tiles_input} not found!")
-
-    # Process sprites
-    print("\n=== Processing SPRITES ===")
-    sprites_input = "assets-odyssey/sprites_original.png"
-    sprites_output = "assets-odyssey/sprites.png"
-
-    # Backup original if exists
-    if os.path.exists(sprites_output) and not os.path.exists(sprites_input):
-        print("Backing up original sprites.png...")
-        os.rename(sprites_output, sprites_input)
-
-    if os.path.exists(sprites_input):
-        make_black_transparent(sprites_input, sprites_output)
-    else:
-        print(f"ERROR: {sprites_input} not found!")
-        print("Sprites already processed or not found")
\ No newline at end of file
+    exit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Indexed PNG Output
+The original Odyssey art is 8-bit paletted, but the pipeline writes RGB/RGBA
+PNGs. Sheets that still use at most 256 distinct colors can be stored as
+palette PNGs (with a tRNS alpha entry per palette color) without losing a
+pixel: smaller files and less data to inflate on load.
+
+The exact check is vectorized: pixels are viewed as one uint32 per RGBA
+value and counted with np.unique. Fully transparent pixels count as one
+color, (0, 0, 0, 0), since their RGB is never visible. Sheets with more
+colors can be quantized to 256 instead; that is lossy, so it only happens
+on request and within an error limit, and the error is always reported.
+
+Usage:
+  python tools/python/indexed_png.py                       # report for assets-odyssey/*.png
+  python tools/python/indexed_png.py --write               # rewrite the exact ones in place
+  python tools/python/indexed_png.py --write --quantize --max-error 1.0 --output-dir indexed/
+"""
+
+import argparse
+import glob
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+MAX_COLORS = 256
+SAMPLE_STEP = 97        # Stride of the quick early-out sample before counting every pixel
+MAX_MEAN_ERROR = 1.0    # Default limit for quantized output: mean abs error per visible channel
+
+def rgba_array(image):
+    """Image or array as a contiguous (h, w, 4) uint8 array"""
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert("RGBA") if image.mode != "RGBA" else image)
+    pixels = np.asarray(image, dtype=np.uint8)
+    if pixels.ndim == 3 and pixels.shape[2] == 3:
+        pixels = np.dstack([pixels, np.full(pixels.shape[:2], 255, np.uint8)])
+    return np.ascontiguousarray(pixels)
+
+def color_keys(pixels, fold_transparent=True):
+    """One uint32 per pixel; fold_transparent maps every fully transparent pixel to 0."""
+    keys = pixels.reshape(-1, 4).view(np.uint32).ravel().copy()
+    if fold_transparent:
+        keys[pixels.reshape(-1, 4)[:, 3] == 0] = 0
+    return keys
+
+def exact_palette(pixels, max_colors=MAX_COLORS, fold_transparent=True):
+    """
+    (palette (n, 4) uint8, indices (h, w) uint8) when pixels use at most
+    max_colors RGBA values, else None. Translucent entries come first so
+    the tRNS chunk only lists those.
+    """
+    pixels = rgba_array(pixels)
+    keys = color_keys(pixels, fold_transparent)
+    if len(np.unique(keys[::SAMPLE_STEP])) > max_colors:
+        return None
+    colors, inverse = np.unique(keys, return_inverse=True)
+    if len(colors) > max_colors:
+        return None
+    palette = colors.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(palette[:, 3] == 255, kind="stable")
+    remap = np.empty(len(order), dtype=np.uint8)
+    remap[order] = np.arange(len(order))
+    return palette[order], remap[inverse].reshape(pixels.shape[:2])
+
+def palette_image(palette, indices):
+    """(P-mode image, save kwargs) for a palette and its index array."""
+    image = Image.fromarray(indices, "P")
+    image.putpalette(palette[:, :3].tobytes(), "RGB")
+    translucent = int((palette[:, 3] < 255).sum())
+    return image, ({"transparency": palette[:translucent, 3].tobytes()} if translucent else {})
+
+def quantize(pixels, max_colors=MAX_COLORS):
+    """
+    Lossy fallback: (palette, indices, error) from Pillow's fast octree
+    quantizer without dithering. error holds the mean and max absolute
+    channel error over visible pixels, PSNR, and the share of pixels changed.
+    """
+    pixels = rgba_array(pixels)
+    quantized = Image.fromarray(pixels, "RGBA").quantize(max_colors, method=Image.Quantize.FASTOCTREE,
+                                                         dither=Image.Dither.NONE)
+    approx = np.array(quantized.convert("RGBA"))
+    approx[approx[..., 3] == 0] = 0
+    palette, indices = exact_palette(approx, max_colors)
+    return palette, indices, quantize_error(pixels, approx)
+
+def quantize_error(original, approx):
+    visible = (original[..., 3] > 0) | (approx[..., 3] > 0)
+    diff = np.abs(original[visible].astype(np.int16) - approx[visible].astype(np.int16))
+    if not diff.size:
+        return {"mean": 0.0, "max": 0, "psnr": float("inf"), "changed": 0.0}
+    mse = float((diff.astype(np.float64) ** 2).mean())
+    return {
+        "mean": float(diff.mean()),
+        "max": int(diff.max()),
+        "psnr": 10 * np.log10(255 ** 2 / mse) if mse else float("inf"),
+        "changed": float(diff.any(axis=1).mean()),
+    }
+
+def encode_indexed(pixels, quantize_ok=False, max_error=MAX_MEAN_ERROR, measure_error=False):
+    """
+    (png bytes or None, info). Exact palettes always encode; otherwise the
+    sheet is quantized when quantize_ok and the mean error stays within
+    max_error. info has "colors" (None when over 256), "error" (quantized
+    or measure_error only) and "mode".
+    """
+    pixels = rgba_array(pixels)
+    found = exact_palette(pixels)
+    info = {"colors": len(found[0]) if found else None, "error": None, "mode": "exact" if found else "rgba"}
+    if found is None:
+        if not (quantize_ok or measure_error):
+            return None, info
+        palette, indices, info["error"] = quantize(pixels)
+        info["mode"] = "quantized"
+        if not quantize_ok or info["error"]["mean"] > max_error:
+            return None, info
+        found = palette, indices
+    image, kwargs = palette_image(*found)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True, **kwargs)
+    return buffer.getvalue(), info
+
+def save_png(pixels, path, indexed=False, quantize_ok=False, max_error=MAX_MEAN_ERROR, measure_error=False):
+    """
+    Write pixels to path, as an indexed PNG when indexed and encode_indexed
+    (given quantize_ok, max_error and measure_error) accepts the sheet,
+    as-is (RGB or RGBA) otherwise; both are saved with optimize=True.
+    Returns encode_indexed's info (None when indexed is off).
+    """
+    info = None
+    if indexed:
+        data, info = encode_indexed(pixels, quantize_ok, max_error, measure_error)
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+            return info
+    Image.fromarray(np.asarray(pixels, dtype=np.uint8)).save(path, "PNG", optimize=True)
+    return info
+
+def load_time(data, repeat=3):
+    """Best seconds to decode PNG bytes and expand them to RGBA, as the tools do."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with Image.open(io.BytesIO(data)) as image:
+            image.convert("RGBA").load()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def describe(info):
+    if info["mode"] == "exact":
+        return f"exact, {info['colors']} colors"
+    error = info["error"]
+    return (f"quantized, mean error {error['mean']:.2f}, max {error['max']}, "
+            f"PSNR {error['psnr']:.1f}dB, {error['changed'] * 100:.1f}% pixels changed")
+
+def main():
+    parser = argparse.ArgumentParser(description='Store sheets with <= 256 colors as indexed PNGs')
+    parser.add_argument('paths', nargs='*', help='PNG files (default: assets-odyssey/*.png)')
+    parser.add_argument('--write', action='store_true', help='Write the indexed PNGs (default: report only)')
+    parser.add_argument('--output-dir', help='Write here instead of replacing the inputs')
+    parser.add_argument('--quantize', action='store_true', help='Also write quantized (lossy) sheets')
+    parser.add_argument('--max-error', type=float, default=MAX_MEAN_ERROR,
+                        help='Largest mean abs channel error accepted when quantizing')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob("assets-odyssey/*.png"))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    total_before = total_after = 0
+    load_before = load_after = 0.0
+    for path in paths:
+        with open(path, "rb") as f:
+            original = f.read()
+        with Image.open(io.BytesIO(original)) as image:
+            pixels = rgba_array(image)
+        data, info = encode_indexed(pixels, args.quantize, args.max_error, measure_error=True)
+        print(f"{path}: {describe(info)}")
+        if data is None:
+            print("  Kept as is")
+            continue
+
+        before, after = load_time(original), load_time(data)
+        total_before += len(original)
+        total_after += len(data)
+        load_before += before
+        load_after += after
+        print(f"  {len(original):,} -> {len(data):,} bytes, load {before * 1000:.1f} -> {after * 1000:.1f}ms")
+        if args.write:
+            target = os.path.join(args.output_dir, os.path.basename(path)) if args.output_dir else path
+            with open(target, "wb") as f:
+                f.write(data)
+            print(f"  Saved: {target}")
+
+    if total_before:
+        print(f"\nIndexed sheets: {total_before:,} -> {total_after:,} bytes "
+              f"({(total_before - total_after) * 100 / total_before:.0f}% smaller), "
+              f"load {load_before * 1000:.0f} -> {load_after * 1000:.0f}ms")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,110 +4,113 @@ Perfect Odyssey Sprite Cutter
 Cuts sprites using the exact dimensions found: 384x20608 = 12 columns x 32px sprites
 """
 
+import argparse
 import os
-from PIL import Image
-
-def cut_odyssey_sprites():
-    # Use split sprite files
-    sprite_files = [
-        "assets-odyssey/sprites_part1.png",
-        "assets-odyssey/sprites_part2.png"
-    ]
-    output_dir = "cut_sprites"
-
-    # Create output directory
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
 
-    print(f"=== ODYSSEY SPRITE CUTTER ===")
+from sprite_bundle import CellWriterPool, iter_sheet_cells, write_bundle
+
+# Use split sprite files
+SPRITE_FILES = [
+    "assets-odyssey/sprites_part1.png",
+    "assets-odyssey/sprites_part2.png"
+]
+CHARACTER_ROWS = 200  # Only first 200 rows are characters
+CHAR_DIR = "character_sprites"
+
+class CharacterSubset:
+    """
+    Collects character-row cells as bands are cut, so character_sprites/ comes
+    from the in-memory sheet instead of re-reading cut_sprites/.
+    """
+
+    def __init__(self, char_dir=CHAR_DIR):
+        self.char_dir = char_dir
+        self.count = 0
+
+    def path(self, global_row, col):
+        """Destination for the next character cell, numbered in cut order."""
+        path = f"{self.char_dir}/char_{self.count:04d}_r{global_row:03d}_c{col:02d}.png"
+        self.count += 1
+        return path
+
+def print_summary(total_count, character_sprites, output, pool):
+    print(f"\n=== CUTTING COMPLETE ===")
+    print(f"Total sprites cut: {total_count}")
+    print(f"Character sprites (first {CHARACTER_ROWS} rows): {character_sprites}")
+    print(f"Map tiles/other: {total_count - character_sprites}")
+    print(f"Output: {output}")
+    action = "Would write" if pool.dry_run else "Wrote"
+    print(f"{action} {pool.files} PNG files, {pool.bytes:,} bytes")
+
+def cut_to_bundle(sprite_files=SPRITE_FILES, bundle_path="cut_sprites", char_dir=CHAR_DIR,
+                  workers=None, dry_run=False):
+    """Cut every sprite into one packed bundle; only the character subset is written as PNGs."""
+    print(f"=== ODYSSEY SPRITE CUTTER (bundle) ===")
     print(f"Processing {len(sprite_files)} sprite sheet parts")
 
-    # Process each sprite sheet part
-    total_count = 0
-    character_sprites = 0
-
-    for part_idx, sprite_path in enumerate(sprite_files):
-        if not os.path.exists(sprite_path):
-            print(f"WARNING: Sprite file not found: {sprite_path}")
-            continue
-
-        # Load the image
-        img = Image.open(sprite_path)
-        width, height = img.size
-
-        print(f"\nPart {part_idx + 1}: {width} x {height}")
-
-        # PERFECT FIT: 12 columns of 32px sprites
-        sprite_width = 32
-        sprite_height = 32
-        cols = 12
-
-        # Verify this matches our image
-        expected_width = cols * sprite_width
-        if width != expected_width:
-            print(f"WARNING: Width mismatch. Expected {expected_width}, got {width}")
-            print(f"Adjusting sprite width to {width/cols:.1f}px")
-            sprite_width = width // cols
-
-        rows = height // sprite_height
-        # Calculate global row offset based on part index
-        row_offset = part_idx * 512  # Each part has max 512 rows
+    if not dry_run:
+        os.makedirs(char_dir, exist_ok=True)
+    subset = CharacterSubset(char_dir)
 
-        print(f"Grid: {cols} columns x {rows} rows (starting at global row {row_offset})")
-        print(f"Sprite size: {sprite_width} x {sprite_height}")
+    with CellWriterPool(workers, dry_run) as pool:
+        def write_characters(first_row, cells):
+            # The game loads character sprites as loose PNGs
+            rows = max(0, min(cells.shape[0], CHARACTER_ROWS - first_row))
+            destinations = [[subset.path(first_row + row, col)]
+                            for row in range(rows) for col in range(cells.shape[1])]
+            pool.submit(cells[:rows].reshape((-1,) + cells.shape[2:]), destinations)
 
-        # Cut each sprite
-        for row in range(rows):
-            global_row = row_offset + row  # Global row number across all parts
+        index = write_bundle(sprite_files, bundle_path, band_callback=write_characters, dry_run=dry_run)
 
-            for col in range(cols):
-                x = col * sprite_width
-                y = row * sprite_height
+    total_count = len(index["cells"])
+    bundle_bytes = sum(source["cells"] * source["cell_width"] * source["cell_height"] * index["channels"]
+                       for source in index["sources"])
+    print_summary(total_count, subset.count, f"{bundle_path}.bin + {bundle_path}.json", pool)
+    print(f"Bundle blob: {bundle_bytes:,} bytes")
+    print(f"Character subset: {subset.count} sprites in {char_dir}/")
+    return index
 
-                # Extract sprite
-                sprite_box = (x, y, x + sprite_width, y + sprite_height)
-                sprite = img.crop(sprite_box)
+def cut_odyssey_sprites(output_format="bundle", workers=None, dry_run=False):
+    if output_format == "bundle":
+        return cut_to_bundle(workers=workers, dry_run=dry_run)
 
-                # Save sprite with global row number
-                filename = f"{output_dir}/sprite_{total_count:04d}_r{global_row:03d}_c{col:02d}.png"
-                sprite.save(filename)
-
-                total_count += 1
-
-                # First 200 rows are characters
-                if global_row < 200:
-                    character_sprites += 1
-
-                # Progress update
-                if total_count % 500 == 0:
-                    print(f"  Cut {total_count} sprites...")
-
-    print(f"\n=== CUTTING COMPLETE ===")
-    print(f"Total sprites cut: {total_count}")
-    print(f"Character sprites (first 200 rows): {character_sprites}")
-    print(f"Map tiles/other: {total_count - character_sprites}")
-    print(f"Output directory: {output_dir}/")
-
-    # Create character-only subset (first 200 rows only)
-    char_dir = "character_sprites"
-    if not os.path.exists(char_dir):
-        os.makedirs(char_dir)
-
-    char_count = 0
-    CHARACTER_ROWS = 200  # Only first 200 rows are characters
-    cols = 12  # Define cols for character subset loop
+    output_dir = "cut_sprites"
 
-    for row in range(CHARACTER_ROWS):  # Only character rows
-        for col in range(cols):
-            source = f"{output_dir}/sprite_{row * cols + col:04d}_r{row:03d}_c{col:02d}.png"
-            dest = f"{char_dir}/char_{char_count:04d}_r{row:03d}_c{col:02d}.png"
+    # Create output directories
+    if not dry_run:
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(CHAR_DIR, exist_ok=True)
 
-            if os.path.exists(source):
-                sprite = Image.open(source)
-                sprite.save(dest)
-                char_count += 1
+    print(f"=== ODYSSEY SPRITE CUTTER ===")
+    print(f"Processing {len(SPRITE_FILES)} sprite sheet parts")
 
-    print(f"Character subset: {char_count} sprites in {char_dir}/")
+    total_count = 0
+    subset = CharacterSubset()
+
+    # One pass: each sprite is encoded once; character rows also go to the subset
+    with CellWriterPool(workers, dry_run) as pool:
+        for first_row, cells in iter_sheet_cells(SPRITE_FILES):
+            destinations = []
+            for row in range(cells.shape[0]):
+                global_row = first_row + row  # Global row number across all parts
+                for col in range(cells.shape[1]):
+                    paths = [f"{output_dir}/sprite_{total_count:04d}_r{global_row:03d}_c{col:02d}.png"]
+                    if global_row < CHARACTER_ROWS:
+                        paths.append(subset.path(global_row, col))
+                    destinations.append(paths)
+                    total_count += 1
+
+            pool.submit(cells.reshape((-1,) + cells.shape[2:]), destinations)
+            print(f"  Cut {total_count} sprites...")
+
+    print_summary(total_count, subset.count, f"{output_dir}/", pool)
+    print(f"Character subset: {subset.count} sprites in {CHAR_DIR}/")
 
 if __name__ == "__main__":
-    cut_odyssey_sprites()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Cut the Odyssey sprite sheets into 32x32 sprites')
+    parser.add_argument('--format', choices=['bundle', 'png'], default='bundle',
+                        help='bundle: one packed file (default); png: one file per sprite in cut_sprites/')
+    parser.add_argument('--workers', type=int, default=None, help='Writer processes (default: one per CPU)')
+    parser.add_argument('--dry-run', action='store_true', help='Report files and bytes without writing')
+    args = parser.parse_args()
+    cut_odyssey_sprites(args.format, args.workers, args.dry_run)
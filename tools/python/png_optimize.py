@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Lossless PNG Optimizer
+Re-encodes the PNGs under assets/ and assets-odyssey/ as small as this
+search can make them, without changing a single decoded pixel. Per file it
+tries:
+  color type  a palette (1/2/4/8-bit) when <= 256 colors, and the narrowest
+              of gray, gray+alpha, RGB and RGBA that holds the pixels
+  filter      each PNG filter (none, sub, up, average, paeth) for the whole
+              image, plus a per-row adaptive choice (least sum of |bytes|)
+  zlib        every candidate at a trial level, then the best one or two at
+              level 9 with the default, filtered and RLE strategies
+Only critical chunks and tRNS are written. A result is kept when it decodes
+to the same RGBA pixels and is smaller than the file.
+
+Files are processed in a process pool. Results are cached by input hash in
+the asset cache: unchanged files are skipped, and a reverted file gets its
+cached optimized bytes back without another search.
+
+Usage:
+  python tools/python/png_optimize.py                    # optimize assets/ and assets-odyssey/
+  python tools/python/png_optimize.py --dry-run assets/ui
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from asset_cache import CACHE_DIR, cache_key, cache_path, file_hash
+from indexed_png import exact_palette, rgba_array
+
+ROOTS = ["assets", "assets-odyssey"]
+OPTIMIZE_VERSION = 1
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+TRIAL_LEVEL = 6
+FINALISTS = 2       # Best (color type, filter) trials compressed again at level 9...
+FINALIST_MARGIN = 0.02  # ...when within 2% of the best trial (level 9 is slow on smooth images)
+STRATEGIES = {"default": zlib.Z_DEFAULT_STRATEGY, "filtered": zlib.Z_FILTERED, "rle": zlib.Z_RLE}
+FILTERS = ["none", "sub", "up", "average", "paeth", "adaptive"]
+SUPPORTED_MODES = {"1", "L", "LA", "P", "PA", "RGB", "RGBA"}
+
+def chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def pack_bits(indices, depth):
+    """(h, w) palette indices packed depth bits per pixel into (h, ceil(w * depth / 8)) bytes."""
+    if depth == 8:
+        return indices
+    per_byte = 8 // depth
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices
+    shifts = (8 - depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+    return np.bitwise_or.reduce(padded.reshape(height, -1, per_byte) << shifts, axis=2).astype(np.uint8)
+
+def color_candidates(pixels):
+    """
+    [(name, header fields, rows (h, stride) uint8, bytes per pixel, extra
+    chunks)] for every exact color type of an (h, w, 4) RGBA array.
+    """
+    height, width = pixels.shape[:2]
+    alpha = pixels[..., 3]
+    opaque = bool((alpha == 255).all())
+    gray = bool(((pixels[..., 0] == pixels[..., 1]) & (pixels[..., 1] == pixels[..., 2])).all())
+    candidates = []
+
+    found = exact_palette(pixels, fold_transparent=False)
+    if found is not None:
+        palette, indices = found
+        depth = next(bits for bits in (1, 2, 4, 8) if len(palette) <= 1 << bits)
+        extra = [chunk(b"PLTE", palette[:, :3].tobytes())]
+        translucent = int((palette[:, 3] < 255).sum())
+        if translucent:
+            extra.append(chunk(b"tRNS", palette[:translucent, 3].tobytes()))
+        candidates.append((f"palette{depth}", (depth, 3), pack_bits(indices, depth), 1, extra))
+    if gray and opaque:
+        candidates.append(("gray", (8, 0), pixels[..., 0], 1, []))
+    elif gray:
+        candidates.append(("gray+alpha", (8, 4), pixels[..., [0, 3]].reshape(height, width * 2), 2, []))
+    elif opaque:
+        candidates.append(("rgb", (8, 2), pixels[..., :3].reshape(height, width * 3), 3, []))
+    else:
+        candidates.append(("rgba", (8, 6), pixels.reshape(height, width * 4), 4, []))
+    return candidates
+
+def filter_rows(rows, bpp):
+    """{filter name: (h, stride + 1) uint8 filtered scanlines with their filter type byte}"""
+    rows = np.ascontiguousarray(rows)
+    current = rows.astype(np.int16)
+    left = np.zeros_like(current)
+    left[:, bpp:] = current[:, :-bpp]
+    up = np.zeros_like(current)
+    up[1:] = current[:-1]
+    up_left = np.zeros_like(current)
+    up_left[:, bpp:] = up[:, :-bpp]
+
+    # Paeth predictor: whichever of left, up, up-left is nearest to left + up - up-left
+    pa, pb, pc = np.abs(up - up_left), np.abs(left - up_left), np.abs(left + up - 2 * up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+    filtered = [
+        rows,
+        (current - left).astype(np.uint8),
+        (current - up).astype(np.uint8),
+        (current - ((left + up) >> 1)).astype(np.uint8),
+        (current - paeth).astype(np.uint8),
+    ]
+    results = {}
+    for kind, data in enumerate(filtered):
+        results[FILTERS[kind]] = np.hstack([np.full((len(rows), 1), kind, np.uint8), data])
+
+    # Adaptive: per row, the filter whose bytes (as signed values) sum to the least
+    scores = np.stack([np.minimum(data, 256 - data.astype(np.int16)).sum(axis=1) for data in filtered])
+    choice = scores.argmin(axis=0)
+    stacked = np.stack([results[name] for name in FILTERS[:5]])
+    results["adaptive"] = stacked[choice, np.arange(len(rows))]
+    return results
+
+def deflate(data, level, strategy=zlib.Z_DEFAULT_STRATEGY):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+def encode(width, height, header, extra, idat):
+    depth, color_type = header
+    ihdr = struct.pack(">IIBBBBB", width, height, depth, color_type, 0, 0, 0)
+    return PNG_SIGNATURE + chunk(b"IHDR", ihdr) + b"".join(extra) + chunk(b"IDAT", idat) + chunk(b"IEND", b"")
+
+def optimize_pixels(pixels):
+    """Smallest (png bytes, settings) found for an (h, w, 4) RGBA array."""
+    height, width = pixels.shape[:2]
+    trials = []
+    for name, header, rows, bpp, extra in color_candidates(pixels):
+        for filter_name, data in filter_rows(rows, bpp).items():
+            raw = data.tobytes()
+            trials.append((len(deflate(raw, TRIAL_LEVEL)), name, filter_name, header, extra, raw))
+    trials.sort(key=lambda trial: trial[0])
+    finalists = [trial for trial in trials[:FINALISTS] if trial[0] <= trials[0][0] * (1 + FINALIST_MARGIN)]
+
+    best = None
+    for _, name, filter_name, header, extra, raw in finalists:
+        for strategy_name, strategy in STRATEGIES.items():
+            idat = deflate(raw, 9, strategy)
+            if best is None or len(idat) < len(best[0]):
+                settings = {"color": name, "filter": filter_name, "level": 9, "strategy": strategy_name}
+                best = (idat, header, extra, settings)
+    idat, header, extra, settings = best
+    return encode(width, height, header, extra, idat), settings
+
+def decode_rgba(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return rgba_array(image)
+
+def optimize_file(path):
+    """
+    Worker: optimize one PNG in memory. Returns (path, input bytes, png
+    bytes or None when the file is already smaller or not supported,
+    settings, seconds).
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        original = f.read()
+    with Image.open(path) as image:
+        if image.mode not in SUPPORTED_MODES or getattr(image, "n_frames", 1) > 1:
+            return path, len(original), None, {"skipped": image.mode}, time.perf_counter() - start
+        pixels = rgba_array(image)
+    data, settings = optimize_pixels(pixels)
+    if len(data) >= len(original):
+        data = None
+    elif not np.array_equal(decode_rgba(data), pixels):
+        raise ValueError(f"{path}: optimized PNG decodes to different pixels")
+    return path, len(original), data, settings, time.perf_counter() - start
+
+def entry_paths(digest, cache_dir):
+    key = cache_key(digest, version=OPTIMIZE_VERSION)
+    return cache_path("png_optimize", key, ".json", cache_dir), cache_path("png_optimize", key, ".png", cache_dir)
+
+def load_entry(digest, cache_dir):
+    json_path, png_path = entry_paths(digest, cache_dir)
+    if not os.path.exists(json_path):
+        return None
+    with open(json_path, encoding="utf-8") as f:
+        entry = json.load(f)
+    if entry["output_hash"] != digest and not os.path.exists(png_path):
+        return None
+    return entry
+
+def save_entry(digest, entry, data, cache_dir):
+    """Record a result for an input hash; data (optimized bytes) is kept so a reverted file can be restored."""
+    json_path, png_path = entry_paths(digest, cache_dir)
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    if data is not None:
+        with open(png_path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(png_path + ".tmp", png_path)
+    with open(json_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(json_path + ".tmp", json_path)
+
+def find_pngs(roots):
+    paths = []
+    for root in roots:
+        if os.path.isfile(root):
+            paths.append(root)
+            continue
+        for folder, _, files in os.walk(root):
+            paths.extend(os.path.join(folder, name) for name in files if name.lower().endswith(".png"))
+    return sorted(paths)
+
+def optimize_pngs(paths, workers=None, dry_run=False, cache_dir=CACHE_DIR):
+    """
+    Optimize paths in place (unless dry_run). Returns a list of
+    (path, bytes before, bytes after, status) with status "optimized",
+    "cached" (result taken from the cache), "optimal" or "skipped".
+    """
+    results = []
+    pending = []
+    for path in paths:
+        digest = file_hash(path)
+        entry = load_entry(digest, cache_dir)
+        if entry is None:
+            pending.append((path, digest))
+        elif entry["output_hash"] == digest:
+            results.append((path, entry["bytes"], entry["bytes"], "optimal"))
+        else:
+            if not dry_run:
+                shutil.copyfile(entry_paths(digest, cache_dir)[1], path)
+            results.append((path, entry["bytes"], entry["optimized_bytes"], "cached"))
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [path for path, _ in pending]
+    if workers == 1:
+        outputs = map(optimize_file, jobs)
+    else:
+        pool = ProcessPoolExecutor(workers)
+        outputs = pool.map(optimize_file, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+    try:
+        for (path, digest), (_, before, data, settings, seconds) in zip(pending, outputs):
+            if "skipped" in settings:
+                results.append((path, before, before, "skipped"))
+                continue
+            if data is None:
+                save_entry(digest, {"output_hash": digest, "bytes": before, "settings": settings}, None, cache_dir)
+                results.append((path, before, before, "optimal"))
+                continue
+            output_hash = hashlib.sha256(data).hexdigest()  # Same as file_hash() of the written file
+            save_entry(digest, {"output_hash": output_hash, "bytes": before, "optimized_bytes": len(data),
+                                "settings": settings, "seconds": round(seconds, 3)}, data, cache_dir)
+            # The optimized file is its own fixed point: the next run skips it
+            save_entry(output_hash, {"output_hash": output_hash, "bytes": len(data), "settings": settings},
+                       None, cache_dir)
+            if not dry_run:
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            results.append((path, before, len(data), "optimized"))
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Losslessly recompress PNGs with a per-file settings search')
+    parser.add_argument('roots', nargs='*', default=ROOTS, help='Files or directories (default: assets/, assets-odyssey/)')
+    parser.add_argument('--workers', type=int, help='Optimizer processes (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without replacing files')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Asset cache directory')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = optimize_pngs(find_pngs(args.roots), args.workers, args.dry_run, args.cache_dir)
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for _, _, _, status in results:
+        counts[status] = counts.get(status, 0) + 1
+    before = sum(result[1] for result in results)
+    after = sum(result[2] for result in results)
+    largest = sorted(results, key=lambda result: result[2] - result[1])[:5]
+
+    print(f"{len(results)} PNGs in {elapsed:.1f}s: " +
+          ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    for path, size_before, size_after, status in largest:
+        if size_after < size_before:
+            print(f"  {path}: {size_before:,} -> {size_after:,} bytes")
+    saved = before - after
+    print(f"Total: {before:,} -> {after:,} bytes ({saved:,} saved, {saved * 100 / max(before, 1):.1f}%)"
+          f"{' (dry run, files unchanged)' if args.dry_run else ''}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Strip-streamed sheet I/O
+Reads and writes PNG sheets one band of rows at a time so peak memory depends
+on the band height, not the sheet height. Bands are RGBA uint8 arrays, or the
+sheet's own color type (native=True) when a sheet is copied without changes,
+so RGB, gray and palette sheets keep their format. load_cells cuts whole
+sheets into cells for the tools that work on every tile at once.
+"""
+
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from PIL import Image
+
+TILE_SIZE = 32
+MAX_HEIGHT = 16384  # Godot max texture height
+CHUNK_ROWS = MAX_HEIGHT // TILE_SIZE  # 512 tile rows per texture
+BAND_TILE_ROWS = 64  # Tile rows decoded per band (2048px)
+FILTER_ROWS = 256  # Rows PNG-filtered at once when writing
+
+# Speed/size tradeoff for StripWriter: zlib level, zlib memLevel, adaptive row filters
+COMPRESSION_PRESETS = {
+    "fast": {"compress_level": 1, "mem_level": 8, "adaptive": False},  # Iteration builds
+    "default": {"compress_level": 6, "mem_level": 8, "adaptive": True},
+    "max": {"compress_level": 9, "mem_level": 9, "adaptive": True},  # Release builds
+}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG color type -> (PIL raw mode, bytes per pixel) for 8-bit images
+COLOR_TYPES = {
+    0: ("L", 1),
+    2: ("RGB", 3),
+    3: ("P", 1),
+    4: ("LA", 2),
+    6: ("RGBA", 4),
+}
+
+def chunk_ranges(height, tile_size=TILE_SIZE, max_height=MAX_HEIGHT):
+    """Yield (start_y, end_y) pixel ranges of whole tile rows that fit one texture."""
+    max_rows = max_height // tile_size
+    total_rows = height // tile_size
+    for start_row in range(0, total_rows, max_rows):
+        end_row = min(start_row + max_rows, total_rows)
+        yield start_row * tile_size, end_row * tile_size
+
+def cells_from_band(band, cell_width, cell_height, cols):
+    """Reshape an RGBA band into (rows, cols, cell_height, cell_width, 4) cells."""
+    rows = band.shape[0] // cell_height
+    band = band[:rows * cell_height, :cols * cell_width]
+    return band.reshape(rows, cell_height, cols, cell_width, 4).transpose(0, 2, 1, 3, 4)
+
+def load_cells(sheet_paths, cols, cell_size=TILE_SIZE):
+    """
+    All cells of the sheet parts in index order as an (n, h, w, 4) array.
+    Returns (cells, cells_per_part).
+    """
+    parts = []
+    part_counts = []
+    for sheet_path in sheet_paths:
+        count = 0
+        with StripReader(sheet_path) as reader:
+            for _, band in reader.bands(BAND_TILE_ROWS * cell_size):
+                cells = cells_from_band(band, cell_size, cell_size, cols)
+                parts.append(cells.reshape((-1,) + cells.shape[2:]))
+                count += len(parts[-1])
+        part_counts.append(count)
+    return np.concatenate(parts), part_counts
+
+def to_rgba(pixels, color_type, palette=None, transparency=None):
+    """Expand a decoded band in its PNG color type to RGBA (same result as PIL convert)."""
+    if color_type == 6:
+        return pixels
+    if color_type == 3:
+        return palette[pixels]
+
+    height, width = pixels.shape[:2]
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    if color_type == 2:
+        rgba[..., :3] = pixels
+        rgba[..., 3] = 255
+        if transparency is not None:
+            key = (pixels[..., 0] == transparency[0]) & (pixels[..., 1] == transparency[1]) \
+                & (pixels[..., 2] == transparency[2])
+            rgba[..., 3][key] = 0
+    elif color_type == 0:
+        rgba[..., :3] = pixels[..., None]
+        rgba[..., 3] = 255
+        if transparency is not None:
+            rgba[..., 3][pixels == transparency[0]] = 0
+    else:
+        rgba[..., :3] = pixels[..., 0:1]
+        rgba[..., 3] = pixels[..., 1]
+    return rgba
+
+class StripReader:
+    """
+    Decode a sheet in bands of rows.
+    8-bit non-interlaced PNGs are inflated incrementally; anything else (BMP,
+    16-bit, interlaced) falls back to one full decode that is then sliced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.streaming = False
+        self.color_type = None
+        self.plte = None  # Raw PLTE / tRNS chunk data, for writing the same color type back
+        self.trns = None
+        self._file = open(path, "rb")
+        if self._file.read(8) == PNG_SIGNATURE:
+            self._read_png_header()
+        if not self.streaming:
+            self._file.close()
+            with Image.open(path) as img:
+                self.width, self.height = img.size
+
+    def _read_chunk(self):
+        header = self._file.read(8)
+        if len(header) < 8:
+            raise ValueError(f"{self.path}: PNG is truncated (file ends before IEND)")
+        length, chunk_type = struct.unpack(">I4s", header)
+        data = self._file.read(length)
+        if len(data) < length:
+            raise ValueError(f"{self.path}: PNG is truncated (inside a {chunk_type.decode('latin-1')} chunk)")
+        self._file.read(4)  # CRC
+        return chunk_type, data
+
+    def _read_png_header(self):
+        chunk_type, data = self._read_chunk()
+        width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", data)
+        self.width, self.height = width, height
+        if bit_depth != 8 or interlace or color_type not in COLOR_TYPES:
+            return
+
+        self.color_type = color_type
+        self.palette = None
+        self.transparency = None
+        while True:
+            chunk_type, data = self._read_chunk()
+            if chunk_type == b"PLTE":
+                self.plte = data
+                colors = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+                self.palette = np.full((256, 4), 255, dtype=np.uint8)
+                self.palette[:, :3] = 0
+                self.palette[:len(colors), :3] = colors
+            elif chunk_type == b"tRNS":
+                self.trns = data
+                if color_type == 3:
+                    alpha = np.frombuffer(data, dtype=np.uint8)
+                    self.palette[:len(alpha), 3] = alpha
+                else:
+                    # Gray or RGB key color, stored as 16-bit samples
+                    self.transparency = struct.unpack(f">{len(data) // 2}H", data)
+            elif chunk_type == b"IDAT":
+                self._pending = data
+                break
+            elif chunk_type == b"IEND":
+                return
+        self.streaming = True
+
+    def _idat_payloads(self):
+        yield self._pending
+        while True:
+            chunk_type, data = self._read_chunk()
+            if chunk_type == b"IDAT":
+                yield data
+            elif chunk_type == b"IEND":
+                return
+
+    def bands(self, band_height=BAND_TILE_ROWS * TILE_SIZE, start_y=0, end_y=None, native=False):
+        """
+        Yield (y, band) covering rows [start_y, end_y) of the sheet, top to
+        bottom. Bands are RGBA unless native, which keeps the PNG's color
+        type (palette indices for color type 3); native needs a streaming sheet.
+        """
+        end_y = self.height if end_y is None else min(end_y, self.height)
+        if not self.streaming:
+            if native:
+                raise ValueError(f"{self.path}: native bands need an 8-bit non-interlaced PNG")
+            yield from self._sliced_bands(band_height, start_y, end_y)
+            return
+
+        rawmode, bpp = COLOR_TYPES[self.color_type]
+        stride = self.width * bpp + 1
+        inflater = zlib.decompressobj()
+        buffer = bytearray()
+        previous_row = None
+        payloads = self._idat_payloads()
+        pending = b""  # Compressed input not inflated yet
+        y = 0
+
+        while y < end_y:
+            rows = min(band_height, self.height - y)
+            needed = rows * stride
+            while len(buffer) < needed:
+                if not pending:
+                    try:
+                        pending = next(payloads)
+                    except StopIteration:
+                        raise ValueError(f"{self.path}: image data ends before row {y + len(buffer) // stride} "
+                                         f"of {self.height} (truncated IDAT)") from None
+                # Inflate no further than this band: a small chunk of blank rows can expand a lot
+                buffer += inflater.decompress(pending, needed - len(buffer))
+                pending = inflater.unconsumed_tail
+
+            # Let PIL's C decoder undo the row filters. The previous band's last
+            # row goes first with filter type 0 so Up/Average/Paeth have context.
+            scanlines = bytes(buffer[:needed])
+            del buffer[:needed]
+            if previous_row is not None:
+                scanlines = b"\x00" + previous_row + scanlines
+            decoded_rows = rows + (previous_row is not None)
+            band = Image.frombytes(rawmode, (self.width, decoded_rows),
+                                   zlib.compress(scanlines, 0), "zip", rawmode)
+            pixels = np.array(band)
+            if previous_row is not None:
+                pixels = pixels[1:]
+            previous_row = pixels[-1].tobytes()
+
+            # Rows above start_y still have to be unfiltered, but not expanded
+            if y + rows > start_y:
+                low, high = max(y, start_y) - y, min(y + rows, end_y) - y
+                band = pixels[low:high]
+                yield y + low, band if native else to_rgba(band, self.color_type, self.palette, self.transparency)
+            y += rows
+
+        self._file.close()
+
+    def _sliced_bands(self, band_height, start_y, end_y):
+        with Image.open(self.path) as img:
+            pixels = np.array(img.convert("RGBA"))
+        for y in range(start_y, end_y, band_height):
+            yield y, pixels[y:min(y + band_height, end_y)]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_bands(path, band_height=BAND_TILE_ROWS * TILE_SIZE):
+    """Convenience generator over StripReader(path).bands()."""
+    with StripReader(path) as reader:
+        yield from reader.bands(band_height)
+
+def filter_band(pixels, previous_row, adaptive=True, bpp=4):
+    """
+    PNG-filter a band (bpp bytes per pixel) with per-row adaptive filter
+    choice (minimum sum of absolute differences, the libpng heuristic).
+    Returns filtered scanlines. With adaptive=False every row uses the Up
+    filter, which is much cheaper.
+    """
+    height = pixels.shape[0]
+    raw = pixels.reshape(height, -1)
+    stride = raw.shape[1]
+    above = np.empty_like(raw)
+    above[0] = previous_row
+    above[1:] = raw[:-1]
+
+    if not adaptive:
+        filtered = np.empty((height, stride + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(raw, above, out=filtered[:, 1:])
+        return filtered
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    upper_left = np.zeros_like(raw)
+    upper_left[:, bpp:] = above[:, :-bpp]
+
+    a = left.astype(np.int16)
+    b = above.astype(np.int16)
+    c = upper_left.astype(np.int16)
+    pa = np.abs(b - c)
+    pb = np.abs(a - c)
+    pc = np.abs(a + b - 2 * c)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, above, upper_left))
+
+    candidates = np.stack([
+        raw,
+        raw - left,
+        raw - above,
+        raw - ((a + b) >> 1).astype(np.uint8),
+        raw - paeth,
+    ])
+    scores = np.minimum(candidates, 0 - candidates).sum(axis=2, dtype=np.uint32)
+    choice = scores.argmin(axis=0)
+
+    filtered = np.empty((height, stride + 1), dtype=np.uint8)
+    filtered[:, 0] = choice
+    filtered[:, 1:] = candidates[choice, np.arange(height)]
+    return filtered
+
+class StripWriter:
+    """
+    Encode a PNG one band at a time. The full height must be known up front.
+    Bands are RGBA by default; color_type (with plte/trns chunk data where
+    the type needs them) writes another 8-bit color type, e.g. to copy a
+    StripReader's native bands.
+    """
+
+    def __init__(self, path, width, height, compress_level=-1, mem_level=8, adaptive=True,
+                 color_type=6, plte=None, trns=None):
+        if color_type not in COLOR_TYPES:
+            raise ValueError(f"Unsupported PNG color type {color_type}")
+        if color_type == 3 and plte is None:
+            raise ValueError("Palette PNGs need PLTE data")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.adaptive = adaptive
+        self.bpp = COLOR_TYPES[color_type][1]
+        self._previous_row = np.zeros(width * self.bpp, dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS, mem_level)
+        self._file = open(path, "wb")
+        self._file.write(PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        if plte is not None:
+            self._write_chunk(b"PLTE", plte)
+        if trns is not None:
+            self._write_chunk(b"tRNS", trns)
+
+    def _write_chunk(self, chunk_type, data):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def write(self, pixels):
+        """Append a band (rows, width, channels), or (rows, width) for gray and palette sheets."""
+        if pixels.shape[1] != self.width:
+            raise ValueError(f"Band width {pixels.shape[1]} does not match sheet width {self.width}")
+        if pixels[:1].size != self.width * self.bpp:
+            raise ValueError(f"Band has {pixels[:1].size // self.width} bytes per pixel, expected {self.bpp}")
+        if self.rows_written + pixels.shape[0] > self.height:
+            raise ValueError(f"Band overruns sheet height {self.height}")
+
+        # Filter in slices so the candidate arrays stay small for tall bands
+        for y in range(0, pixels.shape[0], FILTER_ROWS):
+            rows = np.ascontiguousarray(pixels[y:y + FILTER_ROWS])
+            filtered = filter_band(rows, self._previous_row, self.adaptive, self.bpp)
+            self._previous_row = rows[-1].reshape(-1).copy()
+            data = self._compressor.compress(filtered.tobytes())
+            if data:
+                self._write_chunk(b"IDAT", data)
+        self.rows_written += pixels.shape[0]
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Wrote {self.rows_written} of {self.height} rows to {self.path}")
+            self._write_chunk(b"IDAT", self._compressor.flush())
+            self._write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+def encode_chunk(pixels, output_path, header=(6, None, None), compression="default"):
+    """
+    Encode one chunk's rows, in the sheet's color type, as its own PNG.
+    header is (color_type, plte, trns) of the source. Runs in a worker
+    process. Returns (output_path, encode seconds, bytes written).
+    """
+    color_type, plte, trns = header
+    start = time.perf_counter()
+    with StripWriter(output_path, pixels.shape[1], pixels.shape[0], color_type=color_type,
+                     plte=plte, trns=trns, **COMPRESSION_PRESETS[compression]) as writer:
+        writer.write(pixels)
+    return output_path, time.perf_counter() - start, os.path.getsize(output_path)
+
+def chunk_pieces(reader, ranges, band_height=BAND_TILE_ROWS * TILE_SIZE):
+    """
+    Decode the sheet once, top to bottom, and yield (chunk index, rows,
+    last) pieces in its color type; bands that straddle a chunk boundary
+    are cut in two. last marks the piece that completes its chunk.
+    """
+    index = 0
+    for y, band in reader.bands(band_height, ranges[0][0], ranges[-1][1], native=True):
+        while len(band):
+            end_y = ranges[index][1]
+            take = min(len(band), end_y - y)
+            yield index, band[:take], y + take == end_y
+            band, y = band[take:], y + take
+            if y == end_y:
+                index += 1
+
+def split_streamed(reader, ranges, output_paths, compression, workers):
+    """
+    Chunks of a streamable PNG from a single decode pass. Serially each
+    chunk is written band by band; with a pool the parent hands each worker
+    its chunk's pixels, keeping at most one chunk per worker in flight.
+    """
+    header = (reader.color_type, reader.plte, reader.trns)
+    if workers == 1 or len(ranges) < 2:
+        results, writer, encode_seconds = [], None, 0.0
+        for index, rows, last in chunk_pieces(reader, ranges):
+            if writer is None:
+                start_y, end_y = ranges[index]
+                writer = StripWriter(output_paths[index], reader.width, end_y - start_y, color_type=header[0],
+                                     plte=header[1], trns=header[2], **COMPRESSION_PRESETS[compression])
+            start = time.perf_counter()
+            writer.write(rows)
+            if last:
+                writer.close()
+                writer = None
+            encode_seconds += time.perf_counter() - start
+            if last:
+                results.append((output_paths[index], encode_seconds, os.path.getsize(output_paths[index])))
+                encode_seconds = 0.0
+        return results
+
+    workers = workers or os.cpu_count() or 1
+    futures, pending, pieces = [], set(), []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, rows, last in chunk_pieces(reader, ranges):
+            pieces.append(rows)
+            if not last:
+                continue
+            if len(pending) >= workers:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = pool.submit(encode_chunk, np.concatenate(pieces), output_paths[index], header, compression)
+            futures.append(future)
+            pending.add(future)
+            pieces = []
+    return [future.result() for future in futures]
+
+def split_sheet(input_path, output_template, label="tile", tile_size=TILE_SIZE, max_height=MAX_HEIGHT,
+                compression="default", workers=None):
+    """
+    Split a tall sheet into Godot-sized chunks in the sheet's own color
+    type. The sheet is decoded once; chunks are encoded in a process pool
+    (workers=1 encodes in this process). Sheets the reader cannot stream
+    (BMP, 16-bit, interlaced) are cropped and saved through Pillow.
+    output_template is formatted with the 1-based chunk number. Returns the
+    list of chunk paths.
+    """
+    print(f"Loading: {input_path}")
+    with StripReader(input_path) as reader:
+        width, height = reader.width, reader.height
+        streaming = reader.streaming
+    print(f"Original size: {width}x{height}")
+
+    ranges = list(chunk_ranges(height, tile_size, max_height))
+    print(f"Total {label} rows: {height // tile_size}")
+    print(f"Max rows per chunk: {max_height // tile_size}")
+    print(f"Chunks needed: {len(ranges)}")
+    print(f"Compression: {compression}")
+
+    output_paths = []
+    for chunk_idx, (start_y, end_y) in enumerate(ranges):
+        print(f"\nChunk {chunk_idx + 1}:")
+        print(f"  Rows: {start_y // tile_size} to {end_y // tile_size}")
+        print(f"  Height: {end_y - start_y}px")
+        output_paths.append(output_template.format(chunk_idx + 1))
+
+    start = time.perf_counter()
+    if not ranges:
+        results = []
+    elif streaming:
+        with StripReader(input_path) as reader:
+            results = split_streamed(reader, ranges, output_paths, compression, workers)
+    else:
+        results = []
+        with Image.open(input_path) as img:
+            for output_path, (start_y, end_y) in zip(output_paths, ranges):
+                chunk_img = img.crop((0, start_y, width, end_y))
+                encode_start = time.perf_counter()
+                chunk_img.save(output_path, "PNG")
+                results.append((output_path, time.perf_counter() - encode_start, os.path.getsize(output_path)))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'chunk':<40} {'encode':>8} {'bytes':>12}")
+    for output_path, encode_seconds, size in results:
+        print(f"{output_path:<40} {encode_seconds:7.2f}s {size:>12,}")
+    total_bytes = sum(size for _, _, size in results)
+    print(f"{'total (wall)':<40} {elapsed:7.2f}s {total_bytes:>12,}")
+    return [output_path for output_path, _, _ in results]
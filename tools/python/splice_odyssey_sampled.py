@@ -2,147 +2,89 @@
 """
 Efficient Odyssey Sprite Sheet Splicer using sampling
 Reduces CPU load by sampling every nth pixel instead of checking all pixels.
+The default exact mode checks every pixel through a summed-area table, which
+is cheaper than sampling and cannot miss one-pixel separators.
 """
 
 import os
-from PIL import Image
 import argparse
 
+from sprite_splicing import SampledDetector, SeparatorDetector, SheetImage, write_sprites
+from sprite_splicing import group_consecutive as group_separators
+
 def find_sprite_boundaries_sampled(image, black_threshold=10, sample_rate=4):
     """
     Find sprite boundaries by detecting black separator lines using sampling.
-    Only checks every nth pixel to reduce CPU load.
+    Only checks every nth pixel (legacy mode).
     """
     width, height = image.size
     print(f"Analyzing image {width}x{height} with sample rate {sample_rate}")
+    return SampledDetector(black_threshold, sample_rate).detect(SheetImage(image))
 
-    # Convert to RGB if needed
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-
-    # Find horizontal separator lines (sample every nth row)
-    horizontal_separators = []
-    for y in range(0, height, sample_rate):
-        is_separator = True
-        # Sample every nth pixel in this row
-        for x in range(0, width, sample_rate):
-            r, g, b = image.getpixel((x, y))
-            if r > black_threshold or g > black_threshold or b > black_threshold:
-                is_separator = False
-                break
-        if is_separator:
-            horizontal_separators.append(y)
-
-    # Find vertical separator lines (sample every nth column)
-    vertical_separators = []
-    for x in range(0, width, sample_rate):
-        is_separator = True
-        # Sample every nth pixel in this column
-        for y in range(0, height, sample_rate):
-            r, g, b = image.getpixel((x, y))
-            if r > black_threshold or g > black_threshold or b > black_threshold:
-                is_separator = False
-                break
-        if is_separator:
-            vertical_separators.append(x)
-
-    print(f"Found {len(horizontal_separators)} horizontal separators")
-    print(f"Found {len(vertical_separators)} vertical separators")
-
-    # Group consecutive separators
-    h_groups = group_consecutive(horizontal_separators, sample_rate)
-    v_groups = group_consecutive(vertical_separators, sample_rate)
-
-    # Create sprite rectangles
-    sprites = []
-    sprite_id = 0
-    for i in range(len(h_groups) - 1):
-        for j in range(len(v_groups) - 1):
-            x1 = v_groups[j][-1] + 1
-            y1 = h_groups[i][-1] + 1
-            x2 = v_groups[j + 1][0] - 1
-            y2 = h_groups[i + 1][0] - 1
-
-            if x2 > x1 and y2 > y1:  # Valid rectangle
-                sprites.append({
-                    'id': sprite_id,
-                    'rect': (x1, y1, x2 - x1, y2 - y1),
-                    'grid_pos': (j, i)
-                })
-                sprite_id += 1
-
-    return sprites
+def find_sprite_boundaries_exact(image, black_threshold=10, skip_empty=False):
+    """
+    Find sprite boundaries from every pixel. Separators are the rows and
+    columns with no content, read from the summed-area table's row and
+    column sums; with skip_empty, cells between separators that contain no
+    content are dropped (one table query per cell).
+    """
+    width, height = image.size
+    print(f"Analyzing image {width}x{height} (exact)")
+    return SeparatorDetector(black_threshold, skip_empty).detect(SheetImage(image))
 
 def group_consecutive(numbers, tolerance=1):
     """Group consecutive numbers together with tolerance for sampling gaps."""
-    if not numbers:
-        return []
-
-    groups = []
-    current_group = [numbers[0]]
-
-    for i in range(1, len(numbers)):
-        # Allow gaps up to tolerance (accounts for sampling)
-        if numbers[i] <= numbers[i-1] + tolerance + 1:
-            current_group.append(numbers[i])
-        else:
-            groups.append(current_group)
-            current_group = [numbers[i]]
+    return group_separators(numbers, tolerance)
 
-    groups.append(current_group)
-    return groups
-
-def extract_sprites_sampled(input_path, output_dir, prefix="sprite", sample_rate=4):
-    """Extract sprites using sampling method."""
+def extract_sprites_sampled(input_path, output_dir, prefix="sprite", sample_rate=4, mode="exact",
+                            black_threshold=10, skip_empty=False, workers=None):
+    """Extract sprites using the exact (summed-area table) or sampling method."""
     print(f"Loading image: {input_path}")
-    image = Image.open(input_path)
-
-    print(f"Image size: {image.size}")
-    print(f"Image mode: {image.mode}")
-
-    # Find sprite boundaries with sampling
-    sprites = find_sprite_boundaries_sampled(image, sample_rate=sample_rate)
-
-    print(f"Found {len(sprites)} sprites")
-
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Extract each sprite
-    for sprite in sprites:
-        sprite_id = sprite['id']
-        x, y, w, h = sprite['rect']
-        grid_x, grid_y = sprite['grid_pos']
-
-        # Extract sprite region
-        sprite_image = image.crop((x, y, x + w, y + h))
+    sheet = SheetImage.open(input_path)
 
-        # Save with descriptive filename
-        filename = f"{prefix}_{grid_x:02d}_{grid_y:02d}_{sprite_id:03d}.png"
-        output_path = os.path.join(output_dir, filename)
-        sprite_image.save(output_path)
+    print(f"Image size: {sheet.size}")
+    print(f"Image mode: {sheet.image.mode}")
 
-        if sprite_id < 10:  # Show first few
-            print(f"Extracted sprite {sprite_id}: {w}x{h} at grid ({grid_x}, {grid_y}) -> {filename}")
+    # Find sprite boundaries
+    if mode == "sampled":
+        print(f"Analyzing image {sheet.width}x{sheet.height} with sample rate {sample_rate}")
+        detector = SampledDetector(black_threshold, sample_rate)
+    else:
+        print(f"Analyzing image {sheet.width}x{sheet.height} (exact)")
+        detector = SeparatorDetector(black_threshold, skip_empty)
 
-    return len(sprites)
+    # Sprites stream straight into the crop/encode/write stages
+    return write_sprites(sheet, detector.iter_sprites(sheet), output_dir,
+                         "{prefix}_{grid_x:02d}_{grid_y:02d}_{id:03d}.png", prefix, workers=workers)
 
 def main():
     parser = argparse.ArgumentParser(description='Extract sprites using efficient sampling method')
     parser.add_argument('input', help='Input BMP file path')
     parser.add_argument('output', help='Output directory path')
     parser.add_argument('--prefix', default='sprite', help='Output filename prefix')
-    parser.add_argument('--sample-rate', type=int, default=4, help='Sample every nth pixel (default: 4)')
+    parser.add_argument('--mode', choices=['exact', 'sampled'], default=None,
+                        help='exact: every pixel via summed-area table (default, or sampled when --sample-rate '
+                             'is given); sampled: legacy sampling')
+    parser.add_argument('--sample-rate', type=int, default=None,
+                        help='Sample every nth pixel (selects sampled mode, default: 4)')
     parser.add_argument('--threshold', type=int, default=10, help='Black threshold (0-255)')
+    parser.add_argument('--skip-empty', action='store_true', help='Drop all-black cells (exact mode)')
+    parser.add_argument('--workers', type=int, default=None, help='PNG encoder threads (default: up to 8)')
 
     args = parser.parse_args()
+    mode = args.mode or ('sampled' if args.sample_rate is not None else 'exact')
+    if mode == 'exact' and args.sample_rate is not None:
+        parser.error("--sample-rate only applies to --mode sampled")
+    if mode == 'sampled' and args.skip_empty:
+        parser.error("--skip-empty only applies to --mode exact")
 
     if not os.path.exists(args.input):
         print(f"Error: Input file '{args.input}' not found")
         return 1
 
     try:
-        count = extract_sprites_sampled(args.input, args.output, args.prefix, args.sample_rate)
+        count = extract_sprites_sampled(args.input, args.output, args.prefix, args.sample_rate or 4, mode,
+                                        args.threshold, args.skip_empty, args.workers)
         print(f"\nSuccess! Extracted {count} sprites to '{args.output}'")
         return 0
     except Exception as e:
@@ -1,58 +1,26 @@
 #!/usr/bin/env python3
 """
 Split large sprite sheet into Godot-compatible chunks (max 16384 height)
+Chunks are streamed from the sheet and encoded in parallel worker processes.
 """
 
-import os
-from PIL import Image
+import argparse
 
-def split_sprites():
-    input_path = "assets-odyssey/sprites.png"
-
-    print(f"Loading: {input_path}")
-    img = Image.open(input_path)
-    width, height = img.size
-
-    print(f"Original size: {width}x{height}")
-
-    # Godot max texture height
-    MAX_HEIGHT = 16384
-    TILE_SIZE = 32
-
-    # Calculate how many rows fit in max height
-    max_rows = MAX_HEIGHT // TILE_SIZE  # 512 rows
-
-    # Calculate number of chunks needed
-    total_rows = height // TILE_SIZE
-    chunks_needed = (total_rows + max_rows - 1) // max_rows
-
-    print(f"Total sprite rows: {total_rows}")
-    print(f"Max rows per chunk: {max_rows}")
-    print(f"Chunks needed: {chunks_needed}")
+from sheet_strips import COMPRESSION_PRESETS, split_sheet
 
-    for chunk_idx in range(chunks_needed):
-        start_row = chunk_idx * max_rows
-        end_row = min((chunk_idx + 1) * max_rows, total_rows)
-
-        start_y = start_row * TILE_SIZE
-        end_y = end_row * TILE_SIZE
-
-        chunk_height = end_y - start_y
-
-        print(f"\nChunk {chunk_idx + 1}:")
-        print(f"  Rows: {start_row} to {end_row}")
-        print(f"  Height: {chunk_height}px")
-
-        # Crop the chunk
-        chunk_img = img.crop((0, start_y, width, end_y))
-
-        # Save chunk
-        output_path = f"assets-odyssey/sprites_part{chunk_idx + 1}.png"
-        chunk_img.save(output_path, "PNG")
-        print(f"  Saved: {output_path}")
+def split_sprites(compression="default", workers=None):
+    input_path = "assets-odyssey/sprites.png"
+    outputs = split_sheet(input_path, "assets-odyssey/sprites_part{}.png", label="sprite",
+                          compression=compression, workers=workers)
 
     print("\n=== SPLIT COMPLETE ===")
-    print(f"Created {chunks_needed} sprite files")
+    print(f"Created {len(outputs)} sprite files")
+    return outputs
 
 if __name__ == "__main__":
-    split_sprites()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Split sprites.png into Godot-sized chunks')
+    parser.add_argument('--compression', choices=list(COMPRESSION_PRESETS), default='default',
+                        help='fast for iteration, max for release builds')
+    parser.add_argument('--workers', type=int, default=None, help='Encoder processes (default: one per CPU)')
+    args = parser.parse_args()
+    split_sprites(args.compression, args.workers)
\ No newline at end of file
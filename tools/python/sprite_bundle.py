@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Packed Sprite Bundle
+One raw RGBA pixel blob (<base>.bin) plus a JSON index (<base>.json) keyed by
+(global_row, col), replacing thousands of loose 32x32 PNGs. Cells are read
+with O(1) random access through a memory map; export_pngs() writes loose
+files for tools that still need them.
+"""
+
+import argparse
+import io
+import json
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from sheet_strips import BAND_TILE_ROWS, CHUNK_ROWS, StripReader, cells_from_band
+
+BUNDLE_VERSION = 2  # 2: cell size per source part
+CELL_SIZE = 32
+COLUMNS = 12
+
+def iter_sheet_cells(sheet_paths, cols=COLUMNS, cell_size=CELL_SIZE, part_rows=CHUNK_ROWS):
+    """
+    Stream the cells of split sheet parts band by band. Part n starts at global
+    row n * part_rows, matching the cut_sprites file names.
+    Yields (first_global_row, cells) with cells shaped (rows, cols, h, w, 4).
+    """
+    for part_idx, sheet_path in enumerate(sheet_paths):
+        if not os.path.exists(sheet_path):
+            print(f"WARNING: Sprite file not found: {sheet_path}")
+            continue
+
+        with StripReader(sheet_path) as reader:
+            cell_width = cell_size
+            if reader.width != cols * cell_size:
+                print(f"WARNING: Width mismatch. Expected {cols * cell_size}, got {reader.width}")
+                cell_width = reader.width // cols
+            row_offset = part_idx * part_rows
+
+            for band_y, band in reader.bands(BAND_TILE_ROWS * cell_size):
+                yield row_offset + band_y // cell_size, cells_from_band(band, cell_width, cell_size, cols)
+
+def write_bundle(sheet_paths, base_path, cols=COLUMNS, cell_size=CELL_SIZE, part_rows=CHUNK_ROWS,
+                 band_callback=None, dry_run=False):
+    """
+    Cut every cell of the sheet parts straight into a bundle. band_callback,
+    if given, is called with each (first_global_row, cells) as it is cut, so
+    callers can derive other outputs from the same pass. With dry_run nothing
+    is written. Returns the bundle index dict; its sources list the parts
+    actually read (missing ones are skipped) with their cell size, since a
+    part whose width does not match cols * cell_size has other cell widths.
+    """
+    cells = []
+    sources = {}
+    with open(os.devnull if dry_run else base_path + ".bin", "wb") as blob:
+        for first_row, band_cells in iter_sheet_cells(sheet_paths, cols, cell_size, part_rows):
+            part_idx = first_row // part_rows
+            if part_idx not in sources:
+                cell_height, cell_width = band_cells.shape[2:4]
+                sources[part_idx] = {"path": sheet_paths[part_idx], "cell_width": cell_width,
+                                     "cell_height": cell_height, "cells": 0}
+            sources[part_idx]["cells"] += band_cells.shape[0] * cols
+            blob.write(np.ascontiguousarray(band_cells).tobytes())
+            for row in range(band_cells.shape[0]):
+                cells.extend([first_row + row, col] for col in range(cols))
+            if band_callback:
+                band_callback(first_row, band_cells)
+
+    index = {
+        "version": BUNDLE_VERSION,
+        "channels": 4,
+        "columns": cols,
+        "sources": list(sources.values()),
+        "cells": cells,
+    }
+    if not dry_run:
+        with open(base_path + ".json", "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+    return index
+
+def encode_cells(cells, destinations, dry_run=False):
+    """
+    Encode each (h, w, 4) cell as PNG once and write the bytes to every path
+    in its destinations list. Returns (files, bytes) written (or that would be).
+    """
+    files = total_bytes = 0
+    for cell, paths in zip(cells, destinations):
+        buffer = io.BytesIO()
+        Image.fromarray(cell, "RGBA").save(buffer, "PNG")
+        data = buffer.getvalue()
+        for path in paths:
+            if not dry_run:
+                with open(path, "wb") as f:
+                    f.write(data)
+            files += 1
+            total_bytes += len(data)
+    return files, total_bytes
+
+class CellWriterPool:
+    """
+    Encode and write cell PNGs in worker processes. At most two batches per
+    worker are in flight, so memory stays bounded while the cutter streams.
+    """
+
+    def __init__(self, workers=None, dry_run=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.files = 0
+        self.bytes = 0
+        self._pending = []
+        self._pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+
+    def _collect(self, result):
+        files, total_bytes = result
+        self.files += files
+        self.bytes += total_bytes
+
+    def submit(self, cells, destinations):
+        """Queue a batch of cells; destinations[i] is the list of paths for cells[i]."""
+        if not len(destinations):
+            return
+        if self._pool is None:
+            self._collect(encode_cells(cells, destinations, self.dry_run))
+            return
+        while len(self._pending) >= 2 * self.workers:
+            self._collect(self._pending.pop(0).result())
+        self._pending.append(self._pool.submit(encode_cells, np.ascontiguousarray(cells),
+                                               destinations, self.dry_run))
+
+    def close(self):
+        for future in self._pending:
+            self._collect(future.result())
+        self._pending = []
+        if self._pool:
+            self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SpriteBundle:
+    """Memory-mapped read access to a bundle written by write_bundle()."""
+
+    def __init__(self, base_path):
+        with open(base_path + ".json") as f:
+            self.index = json.load(f)
+        if self.index["version"] != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version {self.index['version']}")
+
+        self.slots = {(row, col): slot for slot, (row, col) in enumerate(self.index["cells"])}
+        # One memory map per source part, as parts may differ in cell size
+        self.starts, self.parts = [], []
+        first = offset = 0
+        for source in self.index["sources"]:
+            shape = (source["cells"], source["cell_height"], source["cell_width"], self.index["channels"])
+            if source["cells"]:
+                self.starts.append(first)
+                self.parts.append(np.memmap(base_path + ".bin", dtype=np.uint8, mode="r", offset=offset, shape=shape))
+            first += source["cells"]
+            offset += int(np.prod(shape))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __getitem__(self, key):
+        """(global_row, col) -> read-only (h, w, 4) view into the blob."""
+        slot = self.slots[key]
+        part = bisect_right(self.starts, slot) - 1
+        return self.parts[part][slot - self.starts[part]]
+
+    def slot(self, global_row, col):
+        """Position of a cell in the blob (the sprite number used in PNG names)."""
+        return self.slots[(global_row, col)]
+
+    def image(self, global_row, col):
+        return Image.fromarray(np.array(self[global_row, col]), "RGBA")
+
+    def keys(self, min_row=0, max_row=None):
+        """Cells in blob order, optionally limited to global rows [min_row, max_row)."""
+        for row, col in self.index["cells"]:
+            if row >= min_row and (max_row is None or row < max_row):
+                yield row, col
+
+def export_pngs(bundle, output_dir, name_format="sprite_{slot:04d}_r{row:03d}_c{col:02d}.png",
+                min_row=0, max_row=None, workers=None, batch_size=256):
+    """Write cells as loose PNGs (compatibility with cut_sprites/). Returns file count."""
+    os.makedirs(output_dir, exist_ok=True)
+    keys = list(bundle.keys(min_row, max_row))
+    with CellWriterPool(workers) as pool:
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            destinations = [
+                [os.path.join(output_dir, name_format.format(slot=bundle.slot(row, col), index=start + i,
+                                                             row=row, col=col))]
+                for i, (row, col) in enumerate(batch)
+            ]
+            pool.submit(np.stack([bundle[key] for key in batch]), destinations)
+    return pool.files
+
+def main():
+    parser = argparse.ArgumentParser(description='Export cells of a sprite bundle as loose PNGs')
+    parser.add_argument('bundle', help='Bundle base path (without .bin/.json)')
+    parser.add_argument('output', help='Output directory')
+    parser.add_argument('--min-row', type=int, default=0, help='First global row to export')
+    parser.add_argument('--max-row', type=int, default=None, help='Stop before this global row')
+    parser.add_argument('--workers', type=int, default=None, help='Writer processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    bundle = SpriteBundle(args.bundle)
+    count = export_pngs(bundle, args.output, min_row=args.min_row, max_row=args.max_row, workers=args.workers)
+    print(f"Exported {count} of {len(bundle)} sprites to '{args.output}'")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
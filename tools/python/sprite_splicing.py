@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Sprite Splicing Library
+Shared pieces of the Odyssey splicers: a SheetImage that decodes a sheet once
+and caches the planes detectors need, four detectors behind one interface
+(separator, sampled, flood, grid) and the sprite writer.
+Every detector yields sprites as {'id', 'rect': (x, y, w, h), 'grid_pos'};
+write_sprites() streams them through crop, threaded PNG encoding and write.
+"""
+
+import argparse
+import io
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from cell_occupancy import BLACK_THRESHOLD, cell_occupancy, sheet_occupancy, sheet_pixels
+from component_labels import component_boxes
+from summed_area import SummedAreaTable
+
+SEPARATOR_THRESHOLD = 10  # Separator lines are darker than sprite content
+
+class SheetImage:
+    """A sprite sheet decoded once, with derived planes computed on first use."""
+
+    def __init__(self, image, path=None):
+        self.image = image
+        self.path = path
+        self.width, self.height = image.size
+        self._brightness = None
+        self._content = {}
+        self._tables = {}
+
+    @classmethod
+    def open(cls, path):
+        image = Image.open(path)
+        image.load()
+        return cls(image, path)
+
+    @property
+    def size(self):
+        return self.image.size
+
+    def brightness(self, band_rows=1024):
+        """(H, W) uint8 max(R, G, B) per pixel; alpha is ignored like getpixel on RGB."""
+        if self._brightness is None:
+            image = self.image if self.image.mode == 'RGB' else self.image.convert('RGB')
+            pixels = np.asarray(image)
+            self._brightness = np.empty(pixels.shape[:2], dtype=np.uint8)
+            for y in range(0, pixels.shape[0], band_rows):
+                band = pixels[y:y + band_rows]
+                np.maximum(np.maximum(band[..., 0], band[..., 1]), band[..., 2],
+                           out=self._brightness[y:y + band_rows])
+        return self._brightness
+
+    def content(self, threshold):
+        """Boolean mask of pixels with some RGB channel above threshold."""
+        if threshold not in self._content:
+            self._content[threshold] = self.brightness() > threshold
+        return self._content[threshold]
+
+    def table(self, threshold):
+        """Summed-area table of content(threshold) for O(1) rectangle queries."""
+        if threshold not in self._tables:
+            self._tables[threshold] = SummedAreaTable(self.content(threshold))
+        return self._tables[threshold]
+
+    def occupancy(self, cell_width, cell_height, threshold=BLACK_THRESHOLD):
+        """Per-cell occupancy (alpha-aware); cached on disk when the sheet came from a file."""
+        if self.path:
+            return sheet_occupancy(self.path, cell_width, cell_height, threshold, image=self.image)
+        return cell_occupancy(sheet_pixels(self.image), cell_width, cell_height, threshold), False
+
+    def crop(self, rect):
+        x, y, w, h = rect
+        return self.image.crop((x, y, x + w, y + h))
+
+def group_consecutive(numbers, tolerance=0):
+    """Group sorted numbers whose gaps are at most tolerance + 1."""
+    if not len(numbers):
+        return []
+
+    groups = []
+    current_group = [numbers[0]]
+
+    for i in range(1, len(numbers)):
+        if numbers[i] <= numbers[i-1] + tolerance + 1:
+            current_group.append(numbers[i])
+        else:
+            groups.append(current_group)
+            current_group = [numbers[i]]
+
+    groups.append(current_group)
+    return groups
+
+def sprites_between(horizontal_separators, vertical_separators, tolerance=0, keep=None):
+    """
+    Rectangles between consecutive separator groups. keep, if given, is
+    called with each (x, y, w, h) and drops the rectangle when it returns False.
+    """
+    h_groups = group_consecutive(horizontal_separators, tolerance)
+    v_groups = group_consecutive(vertical_separators, tolerance)
+
+    sprites = []
+    for i in range(len(h_groups) - 1):
+        for j in range(len(v_groups) - 1):
+            x1 = v_groups[j][-1] + 1  # After vertical separator
+            y1 = h_groups[i][-1] + 1  # After horizontal separator
+            x2 = v_groups[j + 1][0] - 1  # Before next vertical separator
+            y2 = h_groups[i + 1][0] - 1  # Before next horizontal separator
+
+            if x2 > x1 and y2 > y1:  # Valid rectangle
+                rect = (x1, y1, x2 - x1, y2 - y1)
+                if keep is None or keep(rect):
+                    sprites.append({'id': len(sprites), 'rect': rect, 'grid_pos': (j, i)})
+    return sprites
+
+class Detector:
+    """Base class: iter_sprites(sheet) yields the sprites found on a SheetImage; detect() lists them."""
+
+    name = None
+
+    def detect(self, sheet):
+        return list(self.iter_sprites(sheet))
+
+    def iter_sprites(self, sheet):
+        """Sprites one at a time, so later pipeline stages can start early."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        options = ", ".join(f"{key}={value}" for key, value in vars(self).items())
+        return f"{self.name}({options})"
+
+class SeparatorDetector(Detector):
+    """Sprites between full-length black rows and columns, checked on every pixel."""
+
+    name = "separator"
+
+    def __init__(self, threshold=SEPARATOR_THRESHOLD, skip_empty=False):
+        self.threshold = threshold
+        self.skip_empty = skip_empty
+
+    def separators(self, sheet):
+        table = sheet.table(self.threshold)
+        return table.empty_rows().tolist(), table.empty_columns().tolist()
+
+    def iter_sprites(self, sheet):
+        horizontal, vertical = self.separators(sheet)
+        print(f"Found {len(horizontal)} horizontal separators")
+        print(f"Found {len(vertical)} vertical separators")
+
+        keep = None
+        if self.skip_empty:
+            table = sheet.table(self.threshold)  # Built by separators() already
+            keep = lambda rect: not table.rect_empty(*rect)
+        return iter(sprites_between(horizontal, vertical, keep=keep))
+
+class SampledDetector(Detector):
+    """Legacy sampling: separators judged on every sample_rate-th row, column and pixel."""
+
+    name = "sampled"
+
+    def __init__(self, threshold=SEPARATOR_THRESHOLD, sample_rate=4):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    def iter_sprites(self, sheet):
+        rate = self.sample_rate
+        samples = sheet.brightness()[::rate, ::rate] > self.threshold
+        horizontal = (np.flatnonzero(~samples.any(axis=1)) * rate).tolist()
+        vertical = (np.flatnonzero(~samples.any(axis=0)) * rate).tolist()
+        print(f"Found {len(horizontal)} horizontal separators")
+        print(f"Found {len(vertical)} vertical separators")
+        return iter(sprites_between(horizontal, vertical, tolerance=rate))
+
+class FloodDetector(Detector):
+    """Bounding boxes of connected non-black regions."""
+
+    name = "flood"
+
+    def __init__(self, threshold=BLACK_THRESHOLD, min_size=8, connectivity=4):
+        self.threshold = threshold
+        self.min_size = min_size
+        self.connectivity = connectivity
+
+    def iter_sprites(self, sheet):
+        boxes = component_boxes(sheet.content(self.threshold), self.connectivity, self.min_size)
+        for sprite_id, rect in enumerate(boxes):
+            yield {'id': sprite_id, 'rect': rect, 'grid_pos': (sprite_id % 16, sprite_id // 16)}  # Estimated grid
+
+class GridDetector(Detector):
+    """Fixed-size cells that contain any non-black, non-transparent pixel."""
+
+    name = "grid"
+
+    def __init__(self, tile_width=16, tile_height=16, threshold=BLACK_THRESHOLD):
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.threshold = threshold
+
+    def iter_sprites(self, sheet):
+        occupied, hit = sheet.occupancy(self.tile_width, self.tile_height, self.threshold)
+        rows, cols = occupied.shape
+        print(f"Extracting {cols}x{rows} grid of {self.tile_width}x{self.tile_height} tiles"
+              f"{' (cached occupancy)' if hit else ''}")
+        for sprite_id, (row, col) in enumerate(zip(*np.nonzero(occupied))):
+            yield {'id': sprite_id,
+                   'rect': (int(col) * self.tile_width, int(row) * self.tile_height, self.tile_width, self.tile_height),
+                   'grid_pos': (int(col), int(row))}
+
+DETECTORS = OrderedDict((detector.name, detector) for detector in
+                        (SeparatorDetector, SampledDetector, FloodDetector, GridDetector))
+
+def crop_sprites(sheet, sprites):
+    """Pipeline stage: yield (sprite, cropped image) as sprites arrive."""
+    for sprite in sprites:
+        yield sprite, sheet.crop(sprite['rect'])
+
+def encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+def encode_sprites(crops, workers=None, max_in_flight=None):
+    """
+    Pipeline stage: PNG-encode crops on worker threads (zlib releases the
+    GIL). Yields (sprite, png bytes) in input order; at most max_in_flight
+    crops are pending, so memory stays bounded however large the sheet is.
+    """
+    workers = workers or min(8, os.cpu_count() or 1)
+    max_in_flight = max_in_flight or 4 * workers
+    pending = deque()
+    with ThreadPoolExecutor(workers) as pool:
+        for sprite, image in crops:
+            if len(pending) >= max_in_flight:
+                done_sprite, future = pending.popleft()
+                yield done_sprite, future.result()
+            pending.append((sprite, pool.submit(encode_png, image)))
+        while pending:
+            done_sprite, future = pending.popleft()
+            yield done_sprite, future.result()
+
+def write_sprites(sheet, sprites, output_dir, name_format="{prefix}_{grid_x:02d}_{grid_y:02d}_{id:04d}.png",
+                  prefix="sprite", show=10, workers=None, max_in_flight=None):
+    """
+    Detect -> crop -> encode -> write: sprites may be any iterable (detectors'
+    iter_sprites() generators included), and files are written as soon as
+    each sprite is encoded. The first `show` are listed. Returns the count.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    count = total_bytes = 0
+    for sprite, data in encode_sprites(crop_sprites(sheet, sprites), workers, max_in_flight):
+        sprite_id = sprite['id']
+        grid_x, grid_y = sprite['grid_pos']
+
+        filename = name_format.format(prefix=prefix, grid_x=grid_x, grid_y=grid_y, id=sprite_id)
+        with open(os.path.join(output_dir, filename), "wb") as f:
+            f.write(data)
+        count += 1
+        total_bytes += len(data)
+
+        if show is None or sprite_id < show:
+            _, _, w, h = sprite['rect']
+            print(f"Extracted sprite {sprite_id}: {w}x{h} at grid ({grid_x}, {grid_y}) -> {filename}")
+
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} sprites ({total_bytes:,} bytes) in {elapsed:.2f}s"
+          f" - {count / elapsed if elapsed else 0:.0f} sprites/s")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract sprites from a sheet with any splicing detector')
+    parser.add_argument('input', help='Input image path')
+    parser.add_argument('output', help='Output directory path')
+    parser.add_argument('--detector', choices=list(DETECTORS), default='grid', help='Detection method')
+    parser.add_argument('--prefix', default='sprite', help='Output filename prefix')
+    parser.add_argument('--threshold', type=int, default=None, help='Black threshold (default: per detector)')
+    parser.add_argument('--tile-size', type=int, default=16, help='Tile size for the grid detector')
+    parser.add_argument('--sample-rate', type=int, default=4, help='Sample rate for the sampled detector')
+    parser.add_argument('--connectivity', type=int, choices=[4, 8], default=4, help='Flood detector neighbourhood')
+    parser.add_argument('--workers', type=int, default=None, help='PNG encoder threads (default: up to 8)')
+    args = parser.parse_args()
+
+    options = {
+        "separator": {},
+        "sampled": {"sample_rate": args.sample_rate},
+        "flood": {"connectivity": args.connectivity},
+        "grid": {"tile_width": args.tile_size, "tile_height": args.tile_size},
+    }[args.detector]
+    if args.threshold is not None:
+        options["threshold"] = args.threshold
+    detector = DETECTORS[args.detector](**options)
+
+    sheet = SheetImage.open(args.input)
+    print(f"Image size: {sheet.size}, detector: {detector}")
+    count = write_sprites(sheet, detector.iter_sprites(sheet), args.output, prefix=args.prefix,
+                          workers=args.workers)
+    print(f"\nSuccess! Extracted {count} sprites to '{args.output}'")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Summed-Area Table
+Built once from a boolean content mask; afterwards the number of content
+pixels in any rectangle (and so whether a row, column or region is empty)
+is four table lookups, for one query or a whole array of them.
+"""
+
+import numpy as np
+
+class SummedAreaTable:
+    """table[y, x] = content pixels in mask[:y, :x] (one row/column of zero padding)."""
+
+    def __init__(self, mask):
+        height, width = mask.shape
+        dtype = np.int32 if height * width < 2**31 else np.int64
+        self.height, self.width = height, width
+        self.table = np.zeros((height + 1, width + 1), dtype=dtype)
+        # Along rows first: the cast from bool is much cheaper on contiguous data
+        np.cumsum(mask, axis=1, dtype=dtype, out=self.table[1:, 1:])
+        np.cumsum(self.table[1:, 1:], axis=0, out=self.table[1:, 1:])
+
+    def rect_sum(self, x, y, w, h):
+        """Content pixels in [x, x+w) x [y, y+h); arguments may be arrays."""
+        t = self.table
+        return t[y + h, x + w] - t[y, x + w] - t[y + h, x] + t[y, x]
+
+    def rect_empty(self, x, y, w, h):
+        return self.rect_sum(x, y, w, h) == 0
+
+    def row_sums(self):
+        """Content pixels in every row."""
+        return np.diff(self.table[:, -1])
+
+    def column_sums(self):
+        """Content pixels in every column."""
+        return np.diff(self.table[-1])
+
+    def empty_rows(self):
+        return np.flatnonzero(self.row_sums() == 0)
+
+    def empty_columns(self):
+        return np.flatnonzero(self.column_sums() == 0)
@@ -0,0 +1,74 @@
+"""Atlas packing invariants: no overlaps, power-of-two pages, and every cell restored exactly."""
+
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from atlas_pack import build_atlas, pack, trim_boxes
+
+COLS = 6
+TILE = 32
+
+def is_pow2(value):
+    return value > 0 and value & (value - 1) == 0
+
+@pytest.mark.parametrize("max_page", [64, 256])
+def test_pack_places_every_rect_without_overlap(max_page):
+    rng = np.random.default_rng(1)
+    sizes = [tuple(int(v) for v in size) for size in rng.integers(1, 33, (300, 2))]
+    placements, pages = pack(sizes, max_page=max_page, padding=1)
+
+    assert all(is_pow2(w) and is_pow2(h) and w <= max_page and h <= max_page for w, h in pages)
+    used = [np.zeros((h, w), dtype=bool) for w, h in pages]
+    for (w, h), (page, x, y) in zip(sizes, placements):
+        page_w, page_h = pages[page]
+        assert x + w <= page_w and y + h <= page_h
+        # Each rect reserves its padding too, so padded footprints must not overlap either
+        footprint = used[page][y:y + h + 1, x:x + w + 1]
+        assert not footprint.any()
+        footprint[:] = True
+
+def test_trim_boxes():
+    cells = np.zeros((3, 8, 8, 4), dtype=np.uint8)
+    cells[1, 2:5, 3:7, 3] = 255
+    cells[2, 7, 0, 3] = 1
+    assert trim_boxes(cells).tolist() == [[0, 0, 0, 0], [3, 2, 4, 3], [0, 7, 1, 1]]
+
+def test_atlas_restores_every_cell(tmp_path):
+    rng = np.random.default_rng(2)
+    cells = np.zeros((8 * COLS, TILE, TILE, 4), dtype=np.uint8)
+    for cell in cells[1:]:
+        x, y = rng.integers(0, TILE - 4, 2)
+        w, h = rng.integers(1, TILE - max(x, y), 2)
+        cell[y:y + h, x:x + w] = rng.integers(1, 256, (h, w, 4))
+    cells[7] = cells[3]  # Identical cells share a region
+    sheet = cells.reshape(8, COLS, TILE, TILE, 4).transpose(0, 2, 1, 3, 4).reshape(8 * TILE, COLS * TILE, 4)
+    sheet_path = tmp_path / "sheet.png"
+    Image.fromarray(sheet, "RGBA").save(sheet_path)
+
+    report = build_atlas("test", [str(sheet_path)], COLS, str(tmp_path / "atlas"), max_page=256)
+    with open(tmp_path / "atlas" / "test_atlas.json", encoding="utf-8") as f:
+        atlas = json.load(f)
+    pages = [np.asarray(Image.open(tmp_path / "atlas" / page["file"])) for page in atlas["pages"]]
+    assert all(is_pow2(page["width"]) and is_pow2(page["height"]) for page in atlas["pages"])
+
+    visible = [i for i in range(len(cells)) if cells[i, ..., 3].any()]
+    assert sorted(sprite["index"] for sprite in atlas["sprites"].values()) == visible
+    assert report["regions"] == len(visible) - 1
+
+    for sprite in atlas["sprites"].values():
+        x, y, w, h = sprite["region"]
+        left, top, extra_w, extra_h = sprite["margin"]  # Godot margin: offset, then size added back
+        assert (w + extra_w, h + extra_h) == (TILE, TILE)
+        assert left <= extra_w and top <= extra_h
+        page = pages[sprite["page"]]
+        restored = np.zeros((TILE, TILE, 4), dtype=np.uint8)
+        restored[top:top + h, left:left + w] = page[y:y + h, x:x + w]
+        assert np.array_equal(restored, cells[sprite["index"]])
+        page_h, page_w = page.shape[:2]
+        uv = [x / page_w, y / page_h, (x + w) / page_w, (y + h) / page_h]
+        assert sprite["uv"] == pytest.approx(uv, abs=1e-6)
+
+    assert atlas["sprites"]["test_1_000_03"]["region"] == atlas["sprites"]["test_1_001_01"]["region"]
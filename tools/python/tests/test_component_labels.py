@@ -0,0 +1,47 @@
+"""Component labels against the original flood fill seeded on every pixel (scipy is not a dependency)."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from bench_component_labels import legacy_find_sprite_grid, thin_sprite_sheet
+from component_labels import component_boxes, image_mask, label_components
+
+def random_sheet(seed, width=96, height=80, density=0.45):
+    rng = np.random.default_rng(seed)
+    visible = rng.random((height, width)) < density
+    bright = rng.integers(31, 256, (height, width, 3))
+    dark = rng.integers(0, 31, (height, width, 3))  # At or below the black threshold
+    pixels = np.where(visible[..., None], bright, dark)
+    return Image.fromarray(pixels.astype(np.uint8), "RGB")
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+@pytest.mark.parametrize("seed", range(4))
+def test_boxes_match_full_seed_flood_fill(seed, connectivity):
+    image = random_sheet(seed)
+    reference = legacy_find_sprite_grid(image, min_sprite_size=1, step=1, connectivity=connectivity)
+    assert sorted(component_boxes(image_mask(image), connectivity)) == sorted(reference)
+
+@pytest.mark.parametrize("connectivity", [4, 8])
+def test_thin_sprites_match_with_min_size(connectivity):
+    image = thin_sprite_sheet(160, 160, seed=1)
+    reference = legacy_find_sprite_grid(image, min_sprite_size=8, step=1, connectivity=connectivity)
+    assert sorted(component_boxes(image_mask(image), connectivity, min_size=8)) == sorted(reference)
+
+def test_pixel_counts_and_scan_order():
+    mask = np.zeros((6, 8), dtype=bool)
+    mask[0, 5:8] = True                 # Component first seen at (5, 0)
+    mask[1, 1:3] = mask[2, 2] = True    # First seen at (1, 1)
+    mask[4, 0] = mask[5, 1] = True      # Diagonal pair: one component only with 8 neighbours
+
+    four = label_components(mask, 4)
+    assert list(zip(four["x"], four["y"])) == [(5, 0), (1, 1), (0, 4), (1, 5)]
+    assert four["pixels"].tolist() == [3, 3, 1, 1]
+    eight = label_components(mask, 8)
+    assert eight["pixels"].tolist() == [3, 3, 2]
+    assert (eight["width"][2], eight["height"][2]) == (2, 2)
+
+def test_empty_mask():
+    assert component_boxes(np.zeros((5, 5), dtype=bool)) == []
+    with pytest.raises(ValueError):
+        label_components(np.zeros((5, 5), dtype=bool), 6)
@@ -0,0 +1,61 @@
+"""fix_tile_seams must match the original per-pixel loop bit for bit on generated sheets."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from fix_tile_seams import fix_seams, fix_seams_strips
+
+def legacy_fix_seams(img):
+    """Original pixels[x, y] loop from fix_tile_seams.py (returns fixed count)."""
+    pixels = img.load()
+    width, height = img.size
+    alpha_threshold = 128
+    fixed_count = 0
+
+    for y in range(height):
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            if a < alpha_threshold:
+                pixels[x, y] = (0, 0, 0, 0)
+                fixed_count += 1
+            elif a < 255:
+                pixels[x, y] = (r, g, b, 255)
+                fixed_count += 1
+
+    return fixed_count
+
+def generate_sheet(width, height, seed):
+    """Random RGBA sheet weighted towards the alpha values that matter."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    # Mostly opaque/clear like a real tileset, plus every boundary value
+    choice = rng.random((height, width))
+    pixels[..., 3][choice < 0.45] = 255
+    pixels[..., 3][(choice >= 0.45) & (choice < 0.75)] = 0
+    edges = np.array([1, 126, 127, 128, 129, 254], dtype=np.uint8)
+    edge_mask = choice >= 0.95
+    pixels[..., 3][edge_mask] = rng.choice(edges, size=int(edge_mask.sum()))
+    return Image.fromarray(pixels, "RGBA")
+
+@pytest.mark.parametrize("seed", range(3))
+def test_engine_matches_legacy_loop(seed):
+    sheet = generate_sheet(224, 256, seed)
+    expected = sheet.copy()
+    legacy_count = legacy_fix_seams(expected)
+
+    pixels = np.array(sheet)
+    assert fix_seams_strips(pixels) == legacy_count
+    assert np.array_equal(pixels, np.asarray(expected))
+
+@pytest.mark.parametrize("seed", range(2))
+def test_fix_seams_file_matches_legacy_loop(tmp_path, seed):
+    input_path, output_path = tmp_path / "sheet.png", tmp_path / "fixed.png"
+    sheet = generate_sheet(224, 640, seed)
+    sheet.save(input_path)
+    expected = sheet.copy()
+    legacy_count = legacy_fix_seams(expected)
+
+    assert fix_seams(str(input_path), str(output_path)) == legacy_count
+    with Image.open(output_path) as written:
+        assert np.array_equal(np.asarray(written.convert("RGBA")), np.asarray(expected))
@@ -0,0 +1,117 @@
+"""Strip codec round trips: bands must match Pillow's decode bit for bit in every supported mode."""
+
+import struct
+import tracemalloc
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sheet_strips import StripReader, StripWriter, split_sheet
+
+MODES = ["L", "LA", "RGB", "RGBA", "P"]
+
+def sample_image(mode, width=70, height=300, seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    pixels[::3] = pixels[0]  # Repeated rows exercise the Up filter
+    if mode == "P":
+        image = Image.fromarray(pixels[..., 0] % 200, "L").convert("P")
+        image.putpalette(rng.integers(0, 256, 768, dtype=np.uint8).tobytes())
+        image.info["transparency"] = bytes(range(0, 200, 2))
+        return image
+    return Image.fromarray(pixels, "RGBA").convert(mode)
+
+def save(image, path):
+    image.save(path, transparency=image.info["transparency"]) if "transparency" in image.info else image.save(path)
+
+@pytest.mark.parametrize("mode", MODES)
+def test_bands_match_pillow(tmp_path, mode):
+    path = tmp_path / "sheet.png"
+    save(sample_image(mode), path)
+    with Image.open(path) as image:
+        expected = np.asarray(image.convert("RGBA"))
+
+    with StripReader(str(path)) as reader:
+        assert reader.streaming
+        bands = list(reader.bands(64, 37, 250))
+    assert [y for y, _ in bands] == [37, 64, 128, 192]
+    assert np.array_equal(np.concatenate([band for _, band in bands]), expected[37:250])
+
+@pytest.mark.parametrize("mode", MODES)
+def test_native_round_trip_keeps_mode(tmp_path, mode):
+    source, output = tmp_path / "sheet.png", tmp_path / "copy.png"
+    save(sample_image(mode), source)
+
+    with StripReader(str(source)) as reader:
+        with StripWriter(str(output), reader.width, reader.height, color_type=reader.color_type,
+                         plte=reader.plte, trns=reader.trns) as writer:
+            for _, band in reader.bands(64, native=True):
+                writer.write(band)
+
+    with Image.open(source) as before, Image.open(output) as after:
+        assert after.mode == before.mode
+        assert np.array_equal(np.asarray(after.convert("RGBA")), np.asarray(before.convert("RGBA")))
+
+@pytest.mark.parametrize("adaptive", [True, False])
+def test_rgba_writer_round_trip(tmp_path, adaptive):
+    pixels = np.asarray(sample_image("RGBA", height=600))
+    path = tmp_path / "written.png"
+    with StripWriter(str(path), pixels.shape[1], pixels.shape[0], adaptive=adaptive) as writer:
+        for y in range(0, len(pixels), 250):
+            writer.write(pixels[y:y + 250])
+    with Image.open(path) as image:
+        assert image.mode == "RGBA"
+        assert np.array_equal(np.asarray(image), pixels)
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("workers", [1, 2])
+def test_split_sheet_chunks(tmp_path, mode, workers):
+    source = tmp_path / "sheet.png"
+    save(sample_image(mode, height=1000), source)
+    outputs = split_sheet(str(source), str(tmp_path / "part{}.png"), tile_size=32, max_height=320, workers=workers)
+
+    assert len(outputs) == 4
+    with Image.open(source) as image:
+        expected = np.asarray(image.convert("RGBA"))
+    chunks = []
+    for output in outputs:
+        with Image.open(output) as chunk:
+            assert chunk.mode == mode
+            chunks.append(np.asarray(chunk.convert("RGBA")))
+    assert np.array_equal(np.concatenate(chunks), expected[:992])
+
+def test_truncated_image_data_names_file(tmp_path):
+    source, truncated = tmp_path / "sheet.png", tmp_path / "truncated.png"
+    sample_image("RGBA").save(source)
+    data = source.read_bytes()
+
+    # Keep the chunk structure intact but drop the second half of the image data
+    start = data.index(b"IDAT") - 4
+    length = struct.unpack(">I", data[start:start + 4])[0]
+    part = data[start + 8:start + 8 + length // 2]
+    idat = struct.pack(">I", len(part)) + b"IDAT" + part + struct.pack(">I", zlib.crc32(part, zlib.crc32(b"IDAT")))
+    iend = struct.pack(">I", 0) + b"IEND" + struct.pack(">I", zlib.crc32(b"IEND"))
+    truncated.write_bytes(data[:start] + idat + iend)
+
+    with pytest.raises(ValueError, match="truncated IDAT") as error:
+        with StripReader(str(truncated)) as reader:
+            list(reader.bands(64))
+    assert str(truncated) in str(error.value)
+
+def test_blank_sheet_inflates_band_by_band(tmp_path):
+    # Blank rows compress ~1000:1, so one IDAT chunk holds far more rows than a band
+    path = tmp_path / "blank.png"
+    Image.new("RGBA", (64, 40000)).save(path)
+    raw_bytes = 64 * 40000 * 4
+
+    tracemalloc.start()
+    try:
+        with StripReader(str(path)) as reader:
+            rows = sum(len(band) for _, band in reader.bands(512))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert rows == 40000
+    assert peak < raw_bytes / 8
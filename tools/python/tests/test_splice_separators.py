@@ -0,0 +1,24 @@
+"""Separator detection must match the original getpixel scan."""
+
+import pytest
+
+from bench_splice_separators import grid_sheet, legacy_find_sprite_boundaries
+from splice_odyssey_sprites import find_sprite_boundaries
+
+@pytest.mark.parametrize("seed", range(4))
+def test_grid_sheet_matches_legacy_scan(seed):
+    sheet = grid_sheet(width=384, height=512, seed=seed)
+    expected = legacy_find_sprite_boundaries(sheet)
+    assert expected
+    assert find_sprite_boundaries(sheet) == expected
+
+@pytest.mark.parametrize("mode", ["RGBA", "P"])
+def test_other_modes_match_legacy_scan(mode):
+    sheet = grid_sheet(width=256, height=256, cell=16, seed=7).convert(mode)
+    assert find_sprite_boundaries(sheet) == legacy_find_sprite_boundaries(sheet)
+
+@pytest.mark.parametrize("threshold", [0, 5, 30])
+def test_threshold_matches_legacy_scan(threshold):
+    sheet = grid_sheet(width=256, height=256, seed=3)
+    assert (find_sprite_boundaries(sheet, black_threshold=threshold)
+            == legacy_find_sprite_boundaries(sheet, black_threshold=threshold))
@@ -0,0 +1,89 @@
+"""Tile search invariants on small synthetic sheets."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from tile_search import TileIndex, build_index
+
+COLS = 7
+TILE = 32
+
+@pytest.fixture(scope="module")
+def sheets(tmp_path_factory):
+    """Two sheet parts of random tiles, with some empty tiles and exact duplicates."""
+    rng = np.random.default_rng(0)
+    folder = tmp_path_factory.mktemp("sheets")
+    paths, parts = [], []
+    for part, rows in enumerate((12, 9)):
+        cells = rng.integers(0, 256, (rows * COLS, TILE, TILE, 4), dtype=np.uint8)
+        cells[::5, ..., 3] = 0                                 # Empty tiles
+        cells[1::11] = cells[1]                                # Duplicates of the part's second tile
+        sheet = cells.reshape(rows, COLS, TILE, TILE, 4).transpose(0, 2, 1, 3, 4)
+        sheet = sheet.reshape(rows * TILE, COLS * TILE, 4)
+        path = folder / f"tiles_part{part + 1}.png"
+        Image.fromarray(sheet, "RGBA").save(path)
+        paths.append(str(path))
+        parts.append(cells)
+    return paths, np.concatenate(parts)
+
+@pytest.fixture(scope="module")
+def index(sheets):
+    paths, _ = sheets
+    return TileIndex(build_index(paths, COLS, TILE))
+
+def test_index_holds_every_non_empty_tile(sheets, index):
+    _, cells = sheets
+    expected = np.flatnonzero(cells[..., 3].any(axis=(1, 2))) + 1
+    assert sorted(index.gids.tolist()) == expected.tolist()
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(index)
+    assert np.all(np.diff(index.offsets) >= 0)
+
+def test_location(index):
+    first_part_tiles = 12 * COLS
+    for gid in index.gids[:20].tolist():
+        local = (gid - 1) % first_part_tiles if gid > first_part_tiles else gid - 1
+        part = int(gid > first_part_tiles)
+        assert index.location(gid) == (part, local // COLS, local % COLS)
+
+def test_full_scan_is_exact(index):
+    for gid in index.gids[:10].tolist():
+        vector = index.vectors[index.position[gid]]
+        results = index.search_vector(vector, k=8, nprobe=None)
+        brute = np.sqrt(((index.vectors - vector) ** 2).sum(axis=1))
+        assert [distance for _, distance in results] == pytest.approx(np.sort(brute)[:8], abs=1e-4)
+        assert results[0][1] == pytest.approx(0, abs=1e-4)
+
+def test_probed_results_are_sorted_and_exact(index):
+    vector = index.vectors[0]
+    results = index.search_vector(vector, k=5, nprobe=2)
+    assert 0 < len(results) <= 5
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+    for gid, distance in results:
+        assert distance == pytest.approx(float(np.linalg.norm(index.vectors[index.position[gid]] - vector)), abs=1e-4)
+
+def test_similar_excludes_query_and_finds_duplicates(sheets, index):
+    _, cells = sheets
+    duplicates = [gid for gid in index.gids.tolist()
+                  if gid != 2 and np.array_equal(cells[gid - 1], cells[1])]
+    assert duplicates
+    results = index.similar(2, k=len(duplicates), nprobe=None)
+    assert all(gid != 2 for gid, _ in results)
+    assert sorted(gid for gid, _ in results) == sorted(duplicates)
+    assert all(distance == pytest.approx(0, abs=1e-4) for _, distance in results)
+    with pytest.raises(KeyError):
+        index.similar(1)  # gid 1 is an empty tile
+
+def test_empty_probed_lists_give_no_results():
+    arrays = {
+        "gids": np.array([5, 6, 7]),
+        "vectors": np.array([[20.0, 20], [21, 21], [19, 19]]),
+        "centroids": np.array([[0.0, 0], [10, 10], [20, 20]]),
+        "offsets": np.array([0, 0, 0, 3]),
+    }
+    index = TileIndex(arrays)
+    assert [gid for gid, _ in index.search_vector(np.zeros(2), k=2, nprobe=1)] == [7, 5]
+    empty = TileIndex(dict(arrays, gids=np.zeros(0, int), vectors=np.zeros((0, 2)), offsets=np.zeros(4, int)))
+    assert empty.search_vector(np.zeros(2), k=2, nprobe=1) == []
+    assert empty.search_vector(np.zeros(2), k=2, nprobe=None) == []
@@ -0,0 +1,55 @@
+"""Map rendering: layer tiles are composited once, with the same result as Pillow's alpha_composite."""
+
+import numpy as np
+from PIL import Image
+
+from tmx_render import render_map
+
+TILE = 8
+
+def write_map(folder, layers, tilesets):
+    """Two-by-one map; layers are lists of gids, tilesets (firstgid, xml body) pairs."""
+    sets = "".join(f' <tileset firstgid="{firstgid}" {body}</tileset>\n' for firstgid, body in tilesets)
+    data = "".join(f' <layer id="{i + 1}" name="layer{i}" width="2" height="1"><data encoding="csv">'
+                   f'{",".join(str(gid) for gid in gids)}</data></layer>\n' for i, gids in enumerate(layers))
+    path = folder / "map.tmx"
+    path.write_text('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    f'<map version="1.10" orientation="orthogonal" renderorder="right-down" width="2" height="1" '
+                    f'tilewidth="{TILE}" tileheight="{TILE}" infinite="0">\n{sets}{data}</map>\n')
+    return str(path)
+
+def sheet_tileset(folder, colors):
+    pixels = np.concatenate([np.full((TILE, TILE, 4), color, dtype=np.uint8) for color in colors], axis=1)
+    Image.fromarray(pixels, "RGBA").save(folder / "sheet.png")
+    return (f'name="sheet" tilewidth="{TILE}" tileheight="{TILE}" tilecount="{len(colors)}" columns="{len(colors)}">'
+            f'<image source="sheet.png" width="{TILE * len(colors)}" height="{TILE}"/>')
+
+def expected(colors_per_layer):
+    """Pillow reference: each layer a flat image, alpha-composited in order."""
+    canvas = Image.new("RGBA", (2 * TILE, TILE), (0, 0, 0, 0))
+    for colors in colors_per_layer:
+        layer = np.zeros((TILE, 2 * TILE, 4), dtype=np.uint8)
+        for x, color in enumerate(colors):
+            layer[:, x * TILE:(x + 1) * TILE] = color
+        canvas.alpha_composite(Image.fromarray(layer, "RGBA"))
+    return np.asarray(canvas)
+
+def test_semi_transparent_tile_is_blended_once(tmp_path):
+    ground, glass = (20, 200, 60, 255), (200, 100, 50, 128)
+    path = write_map(tmp_path, [[1, 0], [2, 2]], [(1, sheet_tileset(tmp_path, [ground, glass]))])
+    rendered = np.asarray(render_map(path))
+
+    # Over nothing the tile keeps its own color; over ground it is composited once
+    assert tuple(rendered[0, TILE]) == glass
+    assert np.array_equal(rendered, expected([[ground, (0, 0, 0, 0)], [glass, glass]]))
+
+def test_image_collection_tiles_are_drawn(tmp_path):
+    Image.new("RGBA", (TILE, 2 * TILE), (10, 20, 30, 255)).save(tmp_path / "tall.png")
+    collection = (f'name="objects" tilewidth="{TILE}" tileheight="{2 * TILE}" tilecount="1" columns="0">'
+                  f'<tile id="0"><image source="tall.png" width="{TILE}" height="{2 * TILE}"/></tile>')
+    path = write_map(tmp_path, [[0, 1]], [(1, collection)])
+    rendered = np.asarray(render_map(path))
+
+    # Anchored bottom-left: the visible lower half of the tall tile fills the cell
+    assert np.all(rendered[:, TILE:] == (10, 20, 30, 255))
+    assert np.all(rendered[:, :TILE] == 0)
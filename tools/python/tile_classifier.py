@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tile Classifier
+Labels every tile of tiles_part1/2.png from the tile feature table in one
+vectorized pass, replacing the fixed gid ranges the TSX generator used to
+guess with.
+
+Tiles are first split by layer from their alpha: fully opaque tiles are
+bottom-layer terrain, partly transparent ones are middle-layer objects and
+sparse ones (little coverage) are foreground details. Terrain is then scored
+against prototype colors, objects by how much of them is green. Each label
+comes with a confidence in [0, 1]: the softmax share of the winning category
+within its layer, scaled by how clearly the tile falls into that layer.
+"""
+
+import argparse
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from tile_features import HUE_BINS, TILE_SIZE, load_features
+
+# Prototype median colors per terrain, several per category where the sheet
+# uses more than one palette (e.g. grey and dark stone floors)
+TERRAIN_PROTOTYPES = OrderedDict([
+    ("grass", [(76, 124, 47), (96, 160, 96), (40, 96, 40)]),
+    ("dirt", [(139, 90, 43), (110, 70, 40), (96, 64, 32)]),
+    ("water", [(0, 102, 204), (40, 80, 160), (96, 160, 224)]),
+    ("stone", [(128, 128, 128), (96, 96, 96), (48, 48, 48), (176, 168, 160)]),
+    ("sand", [(232, 200, 140), (200, 176, 112), (176, 160, 96)]),
+    ("snow", [(240, 240, 248), (208, 216, 232)]),
+    ("lava", [(255, 69, 0), (200, 40, 16), (160, 32, 32)]),
+])
+OBJECT_CATEGORIES = ["vegetation", "objects"]
+DETAIL_CATEGORIES = ["details"]
+
+LAYERS = OrderedDict([
+    ("bottom", list(TERRAIN_PROTOTYPES)),
+    ("middle", OBJECT_CATEGORIES),
+    ("foreground", DETAIL_CATEGORIES),
+])
+CATEGORIES = ["empty"] + [category for categories in LAYERS.values() for category in categories]
+CATEGORY_LAYER = {category: layer for layer, categories in LAYERS.items() for category in categories}
+
+OPAQUE_TERRAIN = 0.98     # Share of opaque pixels above which a tile is terrain
+DETAIL_COVERAGE = 0.25    # Coverage below which a partial tile is a detail overlay
+COLOR_WEIGHTS = np.array([0.30, 0.59, 0.11]) ** 0.5  # Luma-weighted RGB distance
+COLOR_TEMPERATURE = 12.0  # Distance (weighted RGB) per e-fold of terrain score
+GREEN_HUES = (60, 180)    # Degrees where green is the dominant channel
+
+def softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    weights = np.exp(scores)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+def terrain_scores(median_rgb):
+    """(n, terrains) scores: minus the distance to the nearest prototype of each terrain, in temperature units."""
+    colors = median_rgb.astype(np.float64) * COLOR_WEIGHTS
+    scores = np.empty((len(colors), len(TERRAIN_PROTOTYPES)))
+    for index, prototypes in enumerate(TERRAIN_PROTOTYPES.values()):
+        points = np.asarray(prototypes, dtype=np.float64) * COLOR_WEIGHTS
+        distance = np.sqrt(((colors[:, None] - points[None]) ** 2).sum(axis=-1)).min(axis=1)
+        scores[:, index] = -distance / COLOR_TEMPERATURE
+    return scores
+
+def green_share(table):
+    """Fraction of each tile's visible pixels with a green hue."""
+    degrees = 360 // HUE_BINS
+    green = table["hue_hist"][:, GREEN_HUES[0] // degrees:GREEN_HUES[1] // degrees].sum(axis=1)
+    return green / np.maximum(table["coverage"], 1e-6)
+
+def classify_tiles(table):
+    """
+    Category index (into CATEGORIES) and confidence for every row of a
+    tile feature table. Returns (labels int16, confidence float32).
+    """
+    n = len(table["coverage"])
+    coverage = table["coverage"].astype(np.float64)
+    opaque = table["opaque"] / float(TILE_SIZE * TILE_SIZE)
+    labels = np.zeros(n, np.int16)
+    confidence = np.ones(n, np.float32)
+
+    # Layer gates, each with how far the tile sits from the gate's threshold.
+    # Terrain keeps gate 1: every terrain tile is at or past OPAQUE_TERRAIN.
+    terrain = opaque >= OPAQUE_TERRAIN
+    detail = ~terrain & (coverage > 0) & (coverage < DETAIL_COVERAGE)
+    objects = ~terrain & ~detail & (coverage > 0)
+    gate = np.ones(n)
+    gate[objects] = np.clip(1 - coverage[objects] ** 4, 0.5, 1)  # Nearly full tiles may be terrain edges
+    gate[detail] = np.clip((DETAIL_COVERAGE - coverage[detail]) / DETAIL_COVERAGE + 0.5, 0.5, 1)
+
+    first = CATEGORIES.index
+    probabilities = softmax(terrain_scores(table["median_rgb"][terrain]))
+    labels[terrain] = first(LAYERS["bottom"][0]) + probabilities.argmax(axis=1)
+    confidence[terrain] = probabilities.max(axis=1) * gate[terrain]
+
+    green = green_share(table)[objects]
+    vegetation = green > 0.5
+    labels[objects] = np.where(vegetation, first("vegetation"), first("objects"))
+    confidence[objects] = np.where(vegetation, green, 1 - green) * gate[objects]
+
+    labels[detail] = first("details")
+    confidence[detail] = gate[detail]
+    return labels, confidence
+
+def load_labels(use_cache=True):
+    """(table, labels, confidence) for all tiles of both parts."""
+    table, _ = load_features(use_cache=use_cache)
+    labels, confidence = classify_tiles(table)
+    return table, labels, confidence
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify every tile of the tileset from its color features')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute the feature table')
+    parser.add_argument('--show', help='List the tiles of this category')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, labels, confidence = load_labels(use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+    print(f"Classified {len(labels)} tiles in {elapsed * 1000:.0f}ms")
+
+    counts = Counter(labels.tolist())
+    for index, category in enumerate(CATEGORIES):
+        chosen = labels == index
+        if chosen.any():
+            layer = CATEGORY_LAYER.get(category, "-")
+            print(f"  {layer:<10} {category:<11} {counts[index]:>5} tiles, "
+                  f"mean confidence {confidence[chosen].mean():.2f}")
+
+    if args.show:
+        for i in np.flatnonzero(labels == CATEGORIES.index(args.show)):
+            print(f"  gid {i + 1:>5} part {table['part'][i] + 1} r{table['row'][i]:03d} "
+                  f"c{table['col'][i]}  confidence {confidence[i]:.2f}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
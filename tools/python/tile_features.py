@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tile Feature Table
+Per-cell color statistics for every tile of tiles_part1/2.png, computed in
+one vectorized pass and stored as a compact .npz in the asset cache, keyed
+by the sheets' hash. Classifiers and searches load the table instead of
+walking pixels.
+
+Columns (one row per tile, index = gid - 1 across both parts):
+  part, row, col        position in the split sheets
+  mean_rgb, median_rgb  color of the visible (alpha > 0) pixels
+  coverage              fraction of visible pixels
+  opaque                count of fully opaque pixels
+  hue_hist              HUE_BINS-bin hue histogram of chromatic visible
+                        pixels, as a fraction of all pixels in the tile
+  edge_energy           mean absolute luma gradient (alpha-weighted)
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from asset_cache import cache_key, cached_arrays, files_hash
+from sheet_strips import load_cells
+
+TILE_SHEETS = ["assets-odyssey/tiles_part1.png", "assets-odyssey/tiles_part2.png"]
+TILE_SIZE = 32
+COLUMNS = 7
+HUE_BINS = 12
+MIN_CHROMA = 16  # max(rgb) - min(rgb) below this counts as grey (no hue)
+FEATURE_VERSION = 1
+BATCH = 1024  # Tiles per vectorized step
+
+def color_stats(rgb, visible):
+    """Mean and median RGB of the visible pixels of each cell; (n, 3) float32 each."""
+    count = visible.sum(axis=1)
+    safe = np.maximum(count, 1)[:, None]
+    mean = (rgb * visible[..., None]).sum(axis=1) / safe
+
+    # Median via sorting: hidden pixels sort last, then pick the middle pair
+    values = np.where(visible[..., None], rgb.astype(np.uint16), np.uint16(256))
+    values.sort(axis=1)
+    low = np.maximum(count - 1, 0) // 2
+    high = np.minimum(count // 2, rgb.shape[1] - 1)
+    median = (np.take_along_axis(values, low[:, None, None], axis=1)[:, 0] +
+              np.take_along_axis(values, high[:, None, None], axis=1)[:, 0]) / 2
+    median[count == 0] = 0
+    return mean.astype(np.float32), median.astype(np.float32)
+
+def hue_histogram(rgb, visible, bins=HUE_BINS, min_chroma=MIN_CHROMA):
+    """(n, bins) fraction of each cell's pixels per hue bin; grey and hidden pixels are left out."""
+    rgb = rgb.astype(np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    high = rgb.max(axis=-1)
+    chroma = high - rgb.min(axis=-1)
+    chromatic = visible & (chroma >= min_chroma)
+
+    safe = np.maximum(chroma, 1).astype(np.float32)
+    hue = np.where(high == r, ((g - b) / safe) % 6,
+                   np.where(high == g, (b - r) / safe + 2, (r - g) / safe + 4))
+    bin_index = np.minimum((hue * bins / 6).astype(np.int64), bins - 1)
+
+    cells = np.broadcast_to(np.arange(len(rgb))[:, None], bin_index.shape)
+    counts = np.bincount((cells * bins + bin_index)[chromatic], minlength=len(rgb) * bins)
+    return (counts.reshape(len(rgb), bins) / rgb.shape[1]).astype(np.float32)
+
+def edge_energy(cells):
+    """Mean absolute horizontal + vertical luma gradient of each cell, luma premultiplied by alpha."""
+    rgba = cells.astype(np.float32)
+    luma = (rgba[..., 0] * 0.299 + rgba[..., 1] * 0.587 + rgba[..., 2] * 0.114) * (rgba[..., 3] / 255)
+    dx = np.abs(np.diff(luma, axis=2)).mean(axis=(1, 2))
+    dy = np.abs(np.diff(luma, axis=1)).mean(axis=(1, 2))
+    return (dx + dy).astype(np.float32)
+
+def compute_features(cells):
+    """Feature columns for (n, h, w, 4) cells, processed BATCH cells at a time."""
+    n = len(cells)
+    features = {
+        "mean_rgb": np.zeros((n, 3), np.float32),
+        "median_rgb": np.zeros((n, 3), np.float32),
+        "coverage": np.zeros(n, np.float32),
+        "opaque": np.zeros(n, np.int32),
+        "hue_hist": np.zeros((n, HUE_BINS), np.float32),
+        "edge_energy": np.zeros(n, np.float32),
+    }
+    for start in range(0, n, BATCH):
+        batch = cells[start:start + BATCH]
+        flat = batch.reshape(len(batch), -1, 4)
+        rgb, alpha = flat[..., :3], flat[..., 3]
+        visible = alpha > 0
+        part = slice(start, start + len(batch))
+
+        features["mean_rgb"][part], features["median_rgb"][part] = color_stats(rgb, visible)
+        features["coverage"][part] = visible.mean(axis=1)
+        features["opaque"][part] = (alpha == 255).sum(axis=1)
+        features["hue_hist"][part] = hue_histogram(rgb, visible)
+        features["edge_energy"][part] = edge_energy(batch)
+    return features
+
+def build_table(sheet_paths=TILE_SHEETS, cols=COLUMNS, cell_size=TILE_SIZE):
+    cells, part_counts = load_cells(sheet_paths, cols, cell_size)
+    table = compute_features(cells)
+    table["part"] = np.repeat(np.arange(len(part_counts)), part_counts).astype(np.int16)
+    local = np.concatenate([np.arange(count) for count in part_counts])
+    table["row"] = (local // cols).astype(np.int32)
+    table["col"] = (local % cols).astype(np.int16)
+    return table
+
+def load_features(sheet_paths=TILE_SHEETS, cols=COLUMNS, cell_size=TILE_SIZE, use_cache=True):
+    """
+    Feature table for the sheet parts as a dict of arrays (one row per tile),
+    from the asset cache when the sheets are unchanged. Returns (table, hit).
+    """
+    if not use_cache:
+        return build_table(sheet_paths, cols, cell_size), False
+    key = cache_key(files_hash(sheet_paths), cols=cols, cell_size=cell_size, version=FEATURE_VERSION,
+                    hue_bins=HUE_BINS, min_chroma=MIN_CHROMA)
+    return cached_arrays("tile_features", key, lambda: build_table(sheet_paths, cols, cell_size))
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect the tile feature table')
+    parser.add_argument('--no-cache', action='store_true', help='Recompute even if a cached table exists')
+    parser.add_argument('--show', type=int, default=0, help='Print the first N rows')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, hit = load_features(use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+    count = len(table["coverage"])
+    size = sum(array.nbytes for array in table.values())
+    print(f"Tile features: {count} tiles, {len(table)} columns, {size:,} bytes "
+          f"({'cache hit' if hit else 'computed'} in {elapsed * 1000:.0f}ms)")
+    print(f"  Empty tiles: {int((table['coverage'] == 0).sum())}, "
+          f"fully opaque: {int((table['opaque'] == TILE_SIZE * TILE_SIZE).sum())}")
+
+    for gid in range(1, min(args.show, count) + 1):
+        i = gid - 1
+        mean = ",".join(f"{v:.0f}" for v in table["mean_rgb"][i])
+        print(f"  gid {gid:>5} part {table['part'][i] + 1} r{table['row'][i]:03d} c{table['col'][i]}  "
+              f"mean ({mean}) coverage {table['coverage'][i]:.2f} edges {table['edge_energy'][i]:.1f} "
+              f"hue peak {int(table['hue_hist'][i].argmax()) * 360 // HUE_BINS}deg")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
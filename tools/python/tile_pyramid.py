@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tileset Preview Pyramid
+Renders tiles_part1/2.png as pages of PAGE_ROWS tile rows at several zoom
+levels: a 2x page with every tile labelled by its gid, 1x, 1/2 and 1/4.
+The pages and a manifest.json describing them are written to
+assets/tile_pyramid/, where the editor tooling reads them.
+
+Updates are incremental. Each page records a digest of its tiles' content
+hashes; on the next run only pages whose digest changed (or whose files are
+missing) are rendered again. When neither sheet file changed at all, the
+sheets are not even decoded.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from asset_cache import file_hash
+from dedup_cells import hash_cells
+from sheet_strips import load_cells
+from sprite_splicing import encode_sprites
+from tile_features import COLUMNS, TILE_SHEETS, TILE_SIZE
+
+OUTPUT_DIR = "assets/tile_pyramid"
+PAGE_ROWS = 64
+LEVELS = ["2x", "1x", "half", "quarter"]
+LABEL_HEIGHT = 11
+LABEL_COLOR = np.array([255, 255, 0], dtype=np.uint16)
+PYRAMID_VERSION = 1
+
+def page_image(cells, cols, cell_size=TILE_SIZE):
+    """Assemble a page's (n, h, w, 4) cells, row-major cols wide, into an RGBA image."""
+    rows = -(-len(cells) // cols)
+    padded = np.zeros((rows * cols,) + cells.shape[1:], dtype=np.uint8)
+    padded[:len(cells)] = cells
+    pixels = padded.reshape(rows, cols, cell_size, cell_size, 4).transpose(0, 2, 1, 3, 4)
+    return Image.fromarray(np.ascontiguousarray(pixels.reshape(rows * cell_size, cols * cell_size, 4)), "RGBA")
+
+@lru_cache(maxsize=None)
+def digit_glyphs(height=LABEL_HEIGHT):
+    """Coverage masks (height, w) uint8 of the digits 0-9 in Pillow's default font, rendered once."""
+    glyphs = []
+    for digit in "0123456789":
+        glyph = Image.new("L", (height, height))
+        ImageDraw.Draw(glyph).text((0, 0), digit, fill=255)
+        columns = np.flatnonzero(np.asarray(glyph).any(axis=0))
+        glyphs.append(np.asarray(glyph)[:, :columns[-1] + 2] if len(columns) else np.asarray(glyph)[:, :4])
+    return glyphs
+
+def labelled_2x(image, first_gid, count, cols, cell_size=TILE_SIZE):
+    """
+    2x nearest-neighbour page with each tile's gid in its top-left corner.
+    Labels are blitted from pre-rendered digit glyphs (drawing thousands of
+    strings through ImageDraw.text costs more than the rest of the page).
+    """
+    pixels = np.asarray(image).repeat(2, axis=0).repeat(2, axis=1).copy()
+    glyphs = digit_glyphs()
+    cell = cell_size * 2
+    for index in range(count):
+        x, y = (index % cols) * cell + 1, (index // cols) * cell
+        label = np.hstack([glyphs[int(digit)] for digit in str(first_gid + index)])
+        width = min(label.shape[1], cell - 1)
+        target = pixels[y:y + LABEL_HEIGHT, x - 1:x + width + 1]
+        target[..., :3] //= 3  # Darkened backing box keeps labels readable on any tile
+        target[..., 3] = np.maximum(target[..., 3], 160)
+        coverage = label[:, :width, None].astype(np.uint16)
+        area = target[:, 1:width + 1]
+        area[..., :3] = (area[..., :3] * (255 - coverage) + LABEL_COLOR * coverage) // 255
+        area[..., 3] = np.maximum(area[..., 3], label[:, :width])
+    return Image.fromarray(pixels, "RGBA")
+
+def render_page(cells, first_gid, cols):
+    """{level: image} for one page"""
+    full = page_image(cells, cols)
+    half = full.reduce(2)
+    return {
+        "2x": labelled_2x(full, first_gid, len(cells), cols),
+        "1x": full,
+        "half": half,
+        "quarter": half.reduce(2),
+    }
+
+def page_digest(hashes):
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest if manifest.get("version") == PYRAMID_VERSION else None
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, "manifest.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def pages_current(output_dir, pages):
+    return all(os.path.exists(os.path.join(output_dir, name)) for page in pages for name in page["files"].values())
+
+def build_pyramid(sheet_paths=TILE_SHEETS, output_dir=OUTPUT_DIR, cols=COLUMNS, page_rows=PAGE_ROWS,
+                  force=False, workers=None):
+    """
+    Bring the pyramid in output_dir up to date with the sheets. Returns
+    (manifest, rendered pages, total pages).
+    """
+    layout = {"columns": cols, "tile_size": TILE_SIZE, "page_rows": page_rows, "levels": LEVELS}
+    sheets = [{"path": path, "hash": file_hash(path)} for path in sheet_paths]
+    previous = None if force else load_manifest(output_dir)
+    if previous and previous["layout"] == layout and previous["sheets"] == sheets and \
+            pages_current(output_dir, previous["pages"]):
+        return previous, 0, len(previous["pages"])
+
+    old_pages = {}
+    if previous and previous["layout"] == layout:
+        old_pages = {(page["part"], page["page"]): page for page in previous["pages"]}
+
+    cells, part_counts = load_cells(sheet_paths, cols)
+    hashes = hash_cells(cells)
+    page_size = page_rows * cols
+    pages = []
+    stale = []
+    first = 0
+    for part, count in enumerate(part_counts, 1):
+        for page_index, start in enumerate(range(first, first + count, page_size)):
+            end = min(start + page_size, first + count)
+            page = {
+                "part": part,
+                "page": page_index,
+                "first_gid": start + 1,
+                "tiles": end - start,
+                "digest": page_digest(hashes[start:end]),
+                "files": {level: f"part{part}_page{page_index:03d}_{level}.png" for level in LEVELS},
+            }
+            pages.append(page)
+            old = old_pages.get((part, page_index))
+            if not (old and old["digest"] == page["digest"] and old["first_gid"] == page["first_gid"] and
+                    pages_current(output_dir, [old])):
+                stale.append((page, start, end))
+        first += count
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    def renders():
+        for page, start, end in stale:
+            for level, image in render_page(cells[start:end], page["first_gid"], cols).items():
+                yield page["files"][level], image
+
+    for name, data in encode_sprites(renders(), workers):
+        with open(os.path.join(output_dir, name), "wb") as f:
+            f.write(data)
+
+    # Pages that no longer exist (the sheet got shorter)
+    current = {name for page in pages for name in page["files"].values()}
+    for page in old_pages.values():
+        for name in page["files"].values():
+            if name not in current and os.path.exists(os.path.join(output_dir, name)):
+                os.remove(os.path.join(output_dir, name))
+
+    manifest = {"version": PYRAMID_VERSION, "layout": layout, "sheets": sheets, "pages": pages}
+    save_manifest(output_dir, manifest)
+    return manifest, len(stale), len(pages)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or update the tileset preview pyramid')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Pyramid directory')
+    parser.add_argument('--page-rows', type=int, default=PAGE_ROWS, help='Tile rows per page')
+    parser.add_argument('--force', action='store_true', help='Render every page again')
+    parser.add_argument('--workers', type=int, help='PNG encoder threads')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest, rendered, total = build_pyramid(output_dir=args.output_dir, page_rows=args.page_rows,
+                                              force=args.force, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Pyramid: {total} pages x {len(LEVELS)} levels in {args.output_dir}")
+    print(f"  Rendered {rendered} pages, {total - rendered} unchanged ({elapsed:.2f}s)")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Similar Tile Search
+Nearest-neighbour index over every non-empty tile of tiles_part1/2.png.
+Each tile becomes a vector of its 8x8 downsampled (alpha-premultiplied)
+pixels plus a 4x4x4 color histogram, reduced to INDEX_DIMS with PCA. The
+vectors are split into k-means lists (a vector-quantized / IVF index): a
+query scans only the nprobe lists whose centroids are closest, which keeps
+"top-k tiles similar to gid N" in the millisecond range. The index is stored
+in the asset cache, keyed by the sheets' hash.
+
+Usage:
+  python tools/python/tile_search.py 120                 # top 10 like gid 120
+  python tools/python/tile_search.py 120 455 -k 16 --sheet similar.png
+  python tools/python/tile_search.py --batch gids.txt --sheet similar.png
+"""
+
+import argparse
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from asset_cache import cache_key, cached_arrays, files_hash
+from sheet_strips import load_cells
+from tile_features import COLUMNS, TILE_SHEETS, TILE_SIZE
+
+DOWNSAMPLE = 8         # Pixels per side of the downsampled tile
+HISTOGRAM_LEVELS = 4   # Levels per channel of the color histogram
+HISTOGRAM_WEIGHT = 0.5  # Share of the vector norm given to the histogram
+ALPHA_WEIGHT = 0.5     # Weight of the alpha channel against premultiplied RGB
+INDEX_DIMS = 48
+INDEX_LISTS = 64
+NPROBE = 8
+KMEANS_ITERATIONS = 20
+INDEX_VERSION = 1
+
+def tile_vectors(cells, downsample=DOWNSAMPLE, levels=HISTOGRAM_LEVELS):
+    """
+    (n, downsample^2 * 4 + levels^3) float32 vectors. The pixel part and the
+    square-rooted histogram (so its norm is at most 1) are each scaled to
+    their share of the distance.
+    """
+    n, size = len(cells), cells.shape[1]
+    rgba = cells.astype(np.float32) / 255
+    rgba[..., :3] *= rgba[..., 3:]
+    rgba[..., 3] *= ALPHA_WEIGHT
+    block = size // downsample
+    pixels = rgba.reshape(n, downsample, block, downsample, block, 4).mean(axis=(2, 4)).reshape(n, -1)
+
+    flat = cells.reshape(n, -1, 4)
+    bins = (flat[..., :3] // (256 // levels)).astype(np.int64)
+    bins = (bins[..., 0] * levels + bins[..., 1]) * levels + bins[..., 2]
+    visible = flat[..., 3] > 0
+    tiles = np.broadcast_to(np.arange(n)[:, None], bins.shape)
+    histogram = np.bincount((tiles * levels ** 3 + bins)[visible], minlength=n * levels ** 3)
+    histogram = histogram.reshape(n, -1) / float(flat.shape[1])
+
+    pixels *= (1 - HISTOGRAM_WEIGHT) / np.sqrt(downsample * downsample * 3)
+    histogram = np.sqrt(histogram) * HISTOGRAM_WEIGHT
+    return np.hstack([pixels, histogram]).astype(np.float32)
+
+def pca(vectors, dims):
+    """(mean, components) of the top dims principal axes."""
+    mean = vectors.mean(axis=0)
+    _, _, axes = np.linalg.svd(vectors - mean, full_matrices=False)
+    return mean, axes[:dims]
+
+def squared_distances(a, b):
+    return np.maximum((a * a).sum(axis=1)[:, None] - 2 * a @ b.T + (b * b).sum(axis=1)[None], 0)
+
+def kmeans(vectors, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """Lloyd's k-means seeded from random vectors. Returns (centroids, assignment)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = squared_distances(vectors, centroids).argmin(axis=1)
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids, squared_distances(vectors, centroids).argmin(axis=1)
+
+def build_index(sheet_paths=TILE_SHEETS, cols=COLUMNS, cell_size=TILE_SIZE):
+    """Index arrays for the non-empty tiles of the sheet parts, lists stored contiguously."""
+    cells, part_counts = load_cells(sheet_paths, cols, cell_size)
+    gids = np.flatnonzero(cells[..., 3].any(axis=(1, 2))) + 1
+    vectors = tile_vectors(cells[gids - 1])
+    mean, components = pca(vectors, INDEX_DIMS)
+    vectors = (vectors - mean) @ components.T
+
+    centroids, assignment = kmeans(vectors, min(INDEX_LISTS, len(vectors)))
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+    local = np.concatenate([np.arange(count) for count in part_counts])
+    return {
+        "gids": gids[order].astype(np.int32),
+        "vectors": vectors[order].astype(np.float32),
+        "centroids": centroids.astype(np.float32),
+        "offsets": offsets.astype(np.int64),
+        "mean": mean.astype(np.float32),
+        "components": components.astype(np.float32),
+        "part_counts": np.asarray(part_counts, dtype=np.int64),
+        "part": np.repeat(np.arange(len(part_counts)), part_counts)[gids[order] - 1].astype(np.int16),
+        "row": (local[gids[order] - 1] // cols).astype(np.int32),
+        "col": (local[gids[order] - 1] % cols).astype(np.int16),
+    }
+
+class TileIndex:
+    """Vector-quantized nearest-neighbour index over tile gids (1-based, across both parts)"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.gids = arrays["gids"]
+        self.vectors = arrays["vectors"]
+        self.centroids = arrays["centroids"]
+        self.offsets = arrays["offsets"]
+        self.position = {int(gid): i for i, gid in enumerate(self.gids)}
+
+    @classmethod
+    def load(cls, sheet_paths=TILE_SHEETS, cols=COLUMNS, cell_size=TILE_SIZE, use_cache=True):
+        """Returns (index, hit); hit is False when the index was (re)built."""
+        if not use_cache:
+            return cls(build_index(sheet_paths, cols, cell_size)), False
+        key = cache_key(files_hash(sheet_paths), cols=cols, cell_size=cell_size, version=INDEX_VERSION,
+                        downsample=DOWNSAMPLE, levels=HISTOGRAM_LEVELS, histogram_weight=HISTOGRAM_WEIGHT,
+                        alpha_weight=ALPHA_WEIGHT, dims=INDEX_DIMS, lists=INDEX_LISTS)
+        arrays, hit = cached_arrays("tile_index", key, lambda: build_index(sheet_paths, cols, cell_size))
+        return cls(arrays), hit
+
+    def __len__(self):
+        return len(self.gids)
+
+    def location(self, gid):
+        """(part, row, col) of an indexed gid"""
+        i = self.position[gid]
+        return int(self.arrays["part"][i]), int(self.arrays["row"][i]), int(self.arrays["col"][i])
+
+    def search_vector(self, vector, k=10, nprobe=NPROBE):
+        """
+        Top-k (gid, distance) for an index-space vector; nprobe=None scans
+        every list. Empty lists are not counted as probed, and the result is
+        empty when nothing is indexed.
+        """
+        if nprobe is None or nprobe >= len(self.centroids):
+            candidates = np.arange(len(self.gids))
+        else:
+            lists = np.argsort(((self.centroids - vector) ** 2).sum(axis=1))
+            lists = lists[self.offsets[lists + 1] > self.offsets[lists]][:max(nprobe, 1)]
+            candidates = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists] +
+                                        [np.arange(0)])
+        k = min(k, len(candidates))
+        if k <= 0:
+            return []
+        distances = ((self.vectors[candidates] - vector) ** 2).sum(axis=1)
+        best = np.argpartition(distances, k - 1)[:k]
+        best = best[np.argsort(distances[best], kind="stable")]
+        return [(int(self.gids[candidates[i]]), float(np.sqrt(distances[i]))) for i in best]
+
+    def similar(self, gid, k=10, nprobe=NPROBE):
+        """Top-k tiles most similar to gid, excluding gid itself."""
+        if gid not in self.position:
+            raise KeyError(f"gid {gid} is empty or outside the tileset")
+        results = self.search_vector(self.vectors[self.position[gid]], k + 1, nprobe)
+        return [result for result in results if result[0] != gid][:k]
+
+def tile_image(sheets, index, gid):
+    part, row, col = index.location(gid)
+    x, y = col * TILE_SIZE, row * TILE_SIZE
+    return sheets[part].crop((x, y, x + TILE_SIZE, y + TILE_SIZE))
+
+def write_contact_sheet(path, index, queries, sheet_paths=TILE_SHEETS, scale=2):
+    """One row per query: the query tile, a gap, then its results, each labelled with its gid."""
+    sheets = [Image.open(sheet_path).convert("RGBA") for sheet_path in sheet_paths]
+    cell = TILE_SIZE * scale
+    label = 12
+    columns = 2 + max(len(results) for _, results in queries)
+    sheet = Image.new("RGBA", (columns * (cell + 4), len(queries) * (cell + label + 4)), (40, 40, 40, 255))
+    draw = ImageDraw.Draw(sheet)
+
+    for row, (gid, results) in enumerate(queries):
+        y = row * (cell + label + 4)
+        for column, (result_gid, distance) in [(0, (gid, 0.0))] + [(i + 2, r) for i, r in enumerate(results)]:
+            x = column * (cell + 4)
+            tile = tile_image(sheets, index, result_gid).resize((cell, cell), Image.NEAREST)
+            sheet.alpha_composite(tile, (x, y))
+            draw.text((x, y + cell), str(result_gid), fill=(255, 255, 0) if column == 0 else (220, 220, 220))
+    sheet.save(path)
+
+def read_gids(path):
+    """Gids from a text file, whitespace or comma separated; '#' starts a comment."""
+    gids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            gids.extend(int(value) for value in line.split("#")[0].replace(",", " ").split())
+    return gids
+
+def main():
+    parser = argparse.ArgumentParser(description='Find tiles similar to the given gids')
+    parser.add_argument('gids', nargs='*', type=int, help='Query gids (1-based, part 2 follows part 1)')
+    parser.add_argument('--batch', help='File with query gids')
+    parser.add_argument('-k', type=int, default=10, help='Results per query')
+    parser.add_argument('--nprobe', type=int, default=NPROBE, help='Index lists scanned per query')
+    parser.add_argument('--exact', action='store_true', help='Scan the whole index')
+    parser.add_argument('--sheet', help='Write a contact sheet of the results to this PNG')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index even if cached')
+    args = parser.parse_args()
+
+    gids = args.gids + (read_gids(args.batch) if args.batch else [])
+    if not gids:
+        parser.error("give at least one gid or --batch")
+
+    start = time.perf_counter()
+    index, hit = TileIndex.load(use_cache=not args.rebuild)
+    print(f"Index: {len(index)} tiles, {len(index.centroids)} lists "
+          f"({'cached' if hit else 'built'} in {(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    nprobe = None if args.exact else args.nprobe
+    queries = []
+    start = time.perf_counter()
+    for gid in gids:
+        try:
+            queries.append((gid, index.similar(gid, args.k, nprobe)))
+        except KeyError as e:
+            print(f"  Skipping: {e.args[0]}")
+    elapsed = time.perf_counter() - start
+
+    for gid, results in queries:
+        part, row, col = index.location(gid)
+        print(f"\ngid {gid} (part {part + 1}, row {row}, col {col}):")
+        for result_gid, distance in results:
+            part, row, col = index.location(result_gid)
+            print(f"  {result_gid:>5}  part {part + 1} r{row:03d} c{col}  distance {distance:.3f}")
+    if queries:
+        print(f"\n{len(queries)} queries in {elapsed * 1000:.1f}ms ({elapsed * 1000 / len(queries):.2f}ms each)")
+
+    if args.sheet and queries:
+        write_contact_sheet(args.sheet, index, queries)
+        print(f"Contact sheet saved: {args.sheet}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
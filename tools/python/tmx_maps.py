@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+TMX Map Helpers
+Read Tiled maps (orthogonal, finite) into gid arrays and rewrite their tile
+layers in place of the original text, so only <tileset> references and
+<data> blocks change and the rest of the file keeps Tiled's formatting.
+"""
+
+import argparse
+import base64
+import gzip
+import os
+import re
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+
+# Tiled stores flip/rotation flags in the top four bits of every gid
+FLIP_FLAGS = 0xF0000000
+GID_MASK = 0x0FFFFFFF
+
+TILESET_PATTERN = re.compile(r'^([ \t]*)<tileset\b[^>]*?/>[ \t]*\n', re.MULTILINE)
+DATA_PATTERN = re.compile(r'<data\b([^>]*)>(.*?)</data>', re.DOTALL)
+
+def decode_data(text, encoding=None, compression=None):
+    """Layer <data> text -> flat uint32 gid array (flags included)."""
+    if encoding == "csv":
+        return np.array([int(value) for value in text.replace("\n", "").split(",") if value.strip()],
+                        dtype=np.uint32)
+    if encoding != "base64":
+        raise ValueError(f"Unsupported layer encoding: {encoding or 'xml'}")
+
+    raw = base64.b64decode(text.strip())
+    if compression == "zlib":
+        raw = zlib.decompress(raw)
+    elif compression == "gzip":
+        raw = gzip.decompress(raw)
+    elif compression:
+        raise ValueError(f"Unsupported layer compression: {compression}")
+    return np.frombuffer(raw, dtype="<u4").astype(np.uint32)
+
+def encode_data(gids, width, encoding="csv", compression=None):
+    """Flat gid array -> <data> text in the same layout Tiled writes."""
+    gids = np.asarray(gids, dtype=np.uint32).ravel()
+    if encoding == "csv":
+        rows = [",".join(str(gid) for gid in gids[y:y + width]) for y in range(0, len(gids), width)]
+        return "\n" + ",\n".join(rows) + "\n"
+
+    raw = gids.astype("<u4").tobytes()
+    if compression == "zlib":
+        raw = zlib.compress(raw)
+    elif compression == "gzip":
+        raw = gzip.compress(raw)
+    elif compression:
+        raise ValueError(f"Unsupported layer compression: {compression}")
+    return "\n   " + base64.b64encode(raw).decode("ascii") + "\n  "
+
+def read_tileset(element, base_dir):
+    """Tileset attributes from an embedded <tileset> or the external .tsx it points to."""
+    source = element.get("source")
+    tsx_path = None
+    if source:
+        tsx_path = os.path.normpath(os.path.join(base_dir, source))
+        base_dir = os.path.dirname(tsx_path)
+        element = ET.parse(tsx_path).getroot()
+
+    image = element.find("image")
+    image_path = os.path.normpath(os.path.join(base_dir, image.get("source"))) if image is not None else None
+    # Image-collection tilesets: one image per tile id
+    tile_images = {int(tile.get("id")): os.path.normpath(os.path.join(base_dir, tile.find("image").get("source")))
+                   for tile in element.findall("tile") if tile.find("image") is not None}
+    return {
+        "name": element.get("name"),
+        "source": source,
+        "tsx_path": tsx_path,
+        "tilewidth": int(element.get("tilewidth")),
+        "tileheight": int(element.get("tileheight")),
+        "tilecount": int(element.get("tilecount", 0)),
+        "columns": int(element.get("columns", 0)),
+        "image": image_path,
+        "image_width": int(image.get("width", 0)) if image is not None else 0,
+        "image_height": int(image.get("height", 0)) if image is not None else 0,
+        "tile_images": tile_images,
+    }
+
+class TmxMap:
+    """Tilesets and tile layers of one finite TMX map."""
+
+    def __init__(self, path):
+        self.path = path
+        root = ET.parse(path).getroot()
+        if root.get("infinite") == "1":
+            raise ValueError(f"Infinite maps are not supported: {path}")
+
+        self.width = int(root.get("width"))
+        self.height = int(root.get("height"))
+        self.tilewidth = int(root.get("tilewidth"))
+        self.tileheight = int(root.get("tileheight"))
+
+        base_dir = os.path.dirname(path)
+        self.tilesets = []
+        for element in root.findall("tileset"):
+            tileset = read_tileset(element, base_dir)
+            tileset["firstgid"] = int(element.get("firstgid"))
+            self.tilesets.append(tileset)
+
+        # Document order, including layers nested in groups
+        self.layers = []
+        for element in root.iter("layer"):
+            data = element.find("data")
+            gids = decode_data(data.text or "", data.get("encoding"), data.get("compression"))
+            width, height = int(element.get("width")), int(element.get("height"))
+            self.layers.append({
+                "name": element.get("name"),
+                "width": width,
+                "height": height,
+                "visible": element.get("visible", "1") != "0",
+                "opacity": float(element.get("opacity", 1)),
+                "offsetx": float(element.get("offsetx", 0)),
+                "offsety": float(element.get("offsety", 0)),
+                "gids": gids.reshape(height, width),
+            })
+
+    def tileset_for(self, gid):
+        """Tileset that owns a gid (flags are ignored), or None for empty cells."""
+        gid &= GID_MASK
+        owner = None
+        for tileset in self.tilesets:
+            if tileset["firstgid"] <= gid:
+                owner = tileset
+        return owner if gid else None
+
+def rewrite_map(path, output_path, tilesets, remap):
+    """
+    Rewrite a map's tile layers and tileset references.
+    tilesets: new [(firstgid, source)] list replacing every external <tileset>.
+    remap: function taking a uint32 array of flag-free gids and returning the
+    new gids; flip flags are carried over unchanged.
+    Returns the number of cells whose gid changed.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    matches = list(TILESET_PATTERN.finditer(text))
+    if text.count("<tileset") != len(matches):
+        raise ValueError(f"Only external tilesets can be rewritten: {path}")
+    if matches:
+        indent = matches[0].group(1)
+        block = "".join(f'{indent}<tileset firstgid="{firstgid}" source="{source}"/>\n'
+                        for firstgid, source in tilesets)
+        text = (text[:matches[0].start()] + block +
+                "".join(text[a.end():b.start()] for a, b in zip(matches, matches[1:])) +
+                text[matches[-1].end():])
+
+    layer_widths = [int(element.get("width")) for element in ET.fromstring(text).iter("layer")]
+    changed = 0
+
+    def replace_data(match):
+        nonlocal changed
+        attributes = dict(re.findall(r'(\w+)="([^"]*)"', match.group(1)))
+        encoding, compression = attributes.get("encoding"), attributes.get("compression")
+        gids = decode_data(match.group(2), encoding, compression)
+        new_gids = (gids & np.uint32(FLIP_FLAGS)) | np.asarray(remap(gids & np.uint32(GID_MASK)), dtype=np.uint32)
+        changed += int(np.count_nonzero(new_gids != gids))
+        width = layer_widths.pop(0)
+        return f"<data{match.group(1)}>{encode_data(new_gids, width, encoding, compression)}</data>"
+
+    text = DATA_PATTERN.sub(replace_data, text)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return changed
+
+def find_maps(maps_dir):
+    """All .tmx files under a directory, sorted."""
+    paths = []
+    for root, _, files in os.walk(maps_dir):
+        paths.extend(os.path.join(root, name) for name in files if name.endswith(".tmx"))
+    return sorted(paths)
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the tilesets and layers of TMX maps')
+    parser.add_argument('maps_dir', nargs='?', default='maps/World Maps', help='Directory with .tmx maps')
+    args = parser.parse_args()
+
+    for path in find_maps(args.maps_dir):
+        tmx = TmxMap(path)
+        print(f"{path}: {tmx.width}x{tmx.height} tiles of {tmx.tilewidth}x{tmx.tileheight}")
+        for tileset in tmx.tilesets:
+            print(f"  tileset firstgid={tileset['firstgid']:<6} {tileset['tilecount']:>5} tiles  {tileset['name']}")
+        for layer in tmx.layers:
+            gids = layer["gids"] & GID_MASK
+            print(f"  layer {layer['name']!r}: {np.count_nonzero(gids)} tiles, "
+                  f"{len(np.unique(gids[gids > 0]))} distinct gids")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
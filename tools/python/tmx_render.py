@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+TMX Map Renderer
+Renders every map under maps/World Maps/ at several scales, plus a stitched
+world overview, for browsing all maps at once.
+
+Tile layers are read with tmx_maps (csv or base64 with zlib/gzip), gids are
+resolved across all tilesets of a map and drawn in batches through a
+tile_render.TileAtlas. Flipped tiles (Tiled's H/V/diagonal flags) become
+extra transformed atlas entries. Tiles of other sizes and the per-tile
+images of image-collection tilesets are drawn anchored at the bottom-left
+of their cell like Tiled does. Hidden layers are skipped; layer opacity and
+pixel offsets are honored.
+
+Maps render in parallel worker processes. Each render is stored in the
+asset cache, keyed by the hashes of the map and of every tileset (.tsx and
+image) it uses, so unchanged maps are copied from the cache instead of
+being drawn again.
+
+World layout comes from a Tiled .world file in the maps directory when one
+exists; otherwise maps are laid out left to right in rows.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from asset_cache import CACHE_DIR, cache_key, cache_path, files_hash
+from sheet_strips import load_cells
+from tile_render import EMPTY, TileAtlas
+from tmx_maps import GID_MASK, TmxMap, find_maps
+
+MAPS_DIR = "maps/World Maps"
+OUTPUT_DIR = "assets/map_renders"
+SCALES = [1, 2, 4, 8]          # Downscale factors rendered per map
+WORLD_SCALES = [2, 4, 8]       # Downscale factors of the world overview
+WORLD_ROW_WIDTH = 4            # Maps per row when there is no .world file
+WORLD_GAP = 32                 # Pixels between maps in the fallback layout (at 1x)
+RENDER_VERSION = 2
+
+FLIP_HORIZONTAL = 0x80000000
+FLIP_VERTICAL = 0x40000000
+FLIP_DIAGONAL = 0x20000000
+
+def scale_name(scale):
+    return "1x" if scale == 1 else f"1-{scale}"
+
+def flip_cells(cells, flags):
+    """Apply Tiled flip flags to (n, h, w, 4) cells: diagonal (transpose) first, then horizontal, vertical."""
+    if flags & FLIP_DIAGONAL:
+        cells = cells.transpose(0, 2, 1, 3)
+    if flags & FLIP_HORIZONTAL:
+        cells = cells[:, :, ::-1]
+    if flags & FLIP_VERTICAL:
+        cells = cells[:, ::-1]
+    return np.ascontiguousarray(cells)
+
+class MapTiles:
+    """Tiles of all tilesets of one map: a batched atlas for grid-sized tiles, PIL crops for the rest"""
+
+    def __init__(self, tmx):
+        self.tmx = tmx
+        self.tile_size = tmx.tilewidth
+        self.cells = []
+        self.ranges = []       # (firstgid, count, atlas offset) of atlas tilesets
+        self.large = []        # Tilesets drawn per tile
+        self.images = {}
+        offset = 0
+        for tileset in tmx.tilesets:
+            if tileset["image"] is None:
+                if tileset["tile_images"]:
+                    self.large.append(tileset)
+                continue
+            if tileset["tilewidth"] == tileset["tileheight"] == tmx.tilewidth == tmx.tileheight:
+                cells, _ = load_cells([tileset["image"]], tileset["columns"], tileset["tilewidth"])
+                cells = cells[:tileset["tilecount"] or len(cells)]
+                self.cells.append(cells)
+                self.ranges.append((tileset["firstgid"], len(cells), offset))
+                offset += len(cells)
+            else:
+                self.large.append(tileset)
+
+    def atlas_for(self, layers):
+        """
+        (atlas, lookup, flipped) covering the gids used by the layers. lookup
+        maps a flag-free gid to an atlas index (EMPTY when not in the atlas);
+        flipped variants are appended to the atlas, and flipped maps each raw
+        gid with flags to its entry.
+        """
+        used = np.concatenate([layer["gids"].ravel() for layer in layers]) if layers else np.zeros(0, np.uint32)
+        max_gid = int((used & GID_MASK).max()) if len(used) else 0
+        lookup = np.full(max_gid + 1, EMPTY, dtype=np.int64)
+        for firstgid, count, offset in self.ranges:
+            end = min(firstgid + count, max_gid + 1)
+            if end > firstgid:
+                lookup[firstgid:end] = offset + np.arange(end - firstgid)
+
+        cells = [np.zeros((0, self.tile_size, self.tile_size, 4), dtype=np.uint8)] + self.cells
+        base = np.concatenate(cells)
+        flipped = {}
+        variants = np.unique(used[(used & ~np.uint32(GID_MASK)) != 0]) if len(used) else []
+        for value in variants:
+            gid, flags = int(value) & GID_MASK, int(value) & ~GID_MASK
+            if gid < len(lookup) and lookup[gid] != EMPTY:
+                flipped[int(value)] = len(base) + len(flipped)
+                cells.append(flip_cells(base[lookup[gid]:lookup[gid] + 1], flags))
+        return TileAtlas(np.concatenate(cells)), lookup, flipped
+
+    def grid(self, gids, lookup, flipped):
+        """Atlas index grid of a layer's raw gids (flags included)."""
+        plain = gids & np.uint32(GID_MASK)
+        grid = lookup[np.minimum(plain, len(lookup) - 1)]
+        grid[plain == 0] = EMPTY
+        for value, index in flipped.items():
+            grid[gids == value] = index
+        return grid
+
+    def image(self, path):
+        if path not in self.images:
+            with Image.open(path) as image:
+                self.images[path] = image.convert("RGBA")
+        return self.images[path]
+
+    def large_tile(self, tileset, local_id):
+        """RGBA image of one tile of a per-tile tileset, or None when the collection has no such id"""
+        if tileset["image"] is None:
+            path = tileset["tile_images"].get(local_id)
+            return self.image(path) if path else None
+        image = self.image(tileset["image"])
+        columns = max(tileset["columns"], 1)
+        x, y = (local_id % columns) * tileset["tilewidth"], (local_id // columns) * tileset["tileheight"]
+        return image.crop((x, y, x + tileset["tilewidth"], y + tileset["tileheight"]))
+
+def render_map(path):
+    """Full-size RGBA image of a map's visible tile layers"""
+    tmx = TmxMap(path)
+    tiles = MapTiles(tmx)
+    layers = [layer for layer in tmx.layers if layer["visible"]]
+    atlas, lookup, flipped = tiles.atlas_for(layers)
+    width, height = tmx.width * tmx.tilewidth, tmx.height * tmx.tileheight
+    canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+
+    for layer in layers:
+        grid = tiles.grid(layer["gids"], lookup, flipped)
+        # Copied, not blended: alpha_composite below is the only blend of a layer's tiles
+        layer_image = Image.fromarray(atlas.render(grid), "RGBA")
+
+        # Tiles that are not grid-sized, anchored bottom-left in their cell
+        for tileset in tiles.large:
+            plain = layer["gids"] & np.uint32(GID_MASK)
+            last = tileset["firstgid"] + max(tileset["tilecount"], max(tileset["tile_images"], default=0) + 1, 1)
+            for y, x in zip(*np.nonzero((plain >= tileset["firstgid"]) & (plain < last))):
+                tile = tiles.large_tile(tileset, int(plain[y, x]) - tileset["firstgid"])
+                if tile is None:
+                    continue
+                tile = Image.fromarray(flip_cells(np.asarray(tile)[None], int(layer["gids"][y, x]) & ~GID_MASK)[0])
+                left, top = int(x) * tmx.tilewidth, (int(y) + 1) * tmx.tileheight - tile.height
+                layer_image.alpha_composite(tile, (left, max(top, 0)), (0, max(-top, 0)))
+
+        if layer["opacity"] < 1:
+            alpha = np.asarray(layer_image)[..., 3] * layer["opacity"]
+            layer_image.putalpha(Image.fromarray(alpha.round().astype(np.uint8), "L"))
+        shifted = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
+        shifted.paste(layer_image, (round(layer["offsetx"]), round(layer["offsety"])))
+        canvas.alpha_composite(shifted)
+    return canvas
+
+def map_key(path, scales):
+    """Cache key from the map file and every tileset file (.tsx and image) it references."""
+    tmx = TmxMap(path)
+    sources = [path] + [name for tileset in tmx.tilesets
+                        for name in [tileset["tsx_path"], tileset["image"]] + sorted(tileset["tile_images"].values())
+                        if name and os.path.exists(name)]
+    return cache_key(files_hash(sources), scales=list(scales), version=RENDER_VERSION)
+
+def render_cached(path, scales=SCALES, cache_dir=CACHE_DIR):
+    """
+    Worker: render one map at every scale into the asset cache unless the
+    cache already holds it. Returns (path, {scale: cached png}, hit, seconds).
+    """
+    start = time.perf_counter()
+    key = map_key(path, scales)
+    files = {scale: cache_path("tmx_render", f"{key}_{scale_name(scale)}", ".png", cache_dir) for scale in scales}
+    if all(os.path.exists(name) for name in files.values()):
+        return path, files, True, time.perf_counter() - start
+
+    image = render_map(path)
+    os.makedirs(os.path.dirname(files[scales[0]]), exist_ok=True)
+    for scale in scales:
+        scaled = image if scale == 1 else image.reduce(scale)
+        temp_path = files[scale] + ".tmp"
+        scaled.save(temp_path, "PNG")
+        os.replace(temp_path, files[scale])
+    return path, files, False, time.perf_counter() - start
+
+def world_positions(maps_dir, paths, sizes):
+    """Top-left pixel position (at 1x) of every map: from a .world file, else a simple row layout."""
+    positions = {}
+    for name in sorted(os.listdir(maps_dir)):
+        if name.endswith(".world"):
+            with open(os.path.join(maps_dir, name), encoding="utf-8") as f:
+                world = json.load(f)
+            for entry in world.get("maps", []):
+                map_path = os.path.normpath(os.path.join(maps_dir, entry["fileName"]))
+                positions[map_path] = (entry.get("x", 0), entry.get("y", 0))
+
+    # Maps the world file does not place go in rows below everything else
+    unplaced = [path for path in paths if os.path.normpath(path) not in positions]
+    y = max((positions[os.path.normpath(p)][1] + sizes[p][1] for p in paths if os.path.normpath(p) in positions),
+            default=0)
+    y += WORLD_GAP if positions and unplaced else 0
+    for row in range(0, len(unplaced), WORLD_ROW_WIDTH):
+        x = 0
+        for path in unplaced[row:row + WORLD_ROW_WIDTH]:
+            positions[os.path.normpath(path)] = (x, y)
+            x += sizes[path][0] + WORLD_GAP
+        y += max(sizes[path][1] for path in unplaced[row:row + WORLD_ROW_WIDTH]) + WORLD_GAP
+    return {path: positions[os.path.normpath(path)] for path in paths}
+
+def render_world(maps_dir, renders, scale, output_path):
+    """Stitch the cached per-map renders at one scale into a world overview."""
+    sizes = {}
+    for path, files in renders.items():
+        with Image.open(files[1] if 1 in files else files[min(files)]) as image:
+            factor = 1 if 1 in files else min(files)
+            sizes[path] = (image.width * factor, image.height * factor)
+    positions = world_positions(maps_dir, list(renders), sizes)
+
+    left = min(x for x, _ in positions.values())
+    top = min(y for _, y in positions.values())
+    right = max(positions[path][0] + sizes[path][0] for path in renders)
+    bottom = max(positions[path][1] + sizes[path][1] for path in renders)
+    world = Image.new("RGBA", (-(-(right - left) // scale), -(-(bottom - top) // scale)), (0, 0, 0, 0))
+    for path, files in renders.items():
+        with Image.open(files[scale]) as image:
+            x, y = positions[path]
+            world.alpha_composite(image.convert("RGBA"), ((x - left) // scale, (y - top) // scale))
+    world.save(output_path, "PNG")
+    return world.size
+
+def main():
+    parser = argparse.ArgumentParser(description='Render TMX maps and a world overview')
+    parser.add_argument('maps_dir', nargs='?', default=MAPS_DIR, help='Directory with .tmx maps')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help='Where map and world images are written')
+    parser.add_argument('--scales', default=",".join(map(str, SCALES)), help='Downscale factors per map')
+    parser.add_argument('--world-scales', default=",".join(map(str, WORLD_SCALES)),
+                        help='Downscale factors of the world overview (empty to skip)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Render processes')
+    args = parser.parse_args()
+
+    scales = sorted({int(value) for value in args.scales.split(",") if value})
+    world_scales = sorted({int(value) for value in args.world_scales.split(",") if value})
+    scales = sorted(set(scales) | set(world_scales))
+    paths = find_maps(args.maps_dir)
+    if not paths:
+        print(f"No maps in '{args.maps_dir}'")
+        return 1
+
+    start = time.perf_counter()
+    if args.workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(render_cached, paths, [scales] * len(paths)))
+    else:
+        results = [render_cached(path, scales) for path in paths]
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    renders = {}
+    for path, files, hit, seconds in results:
+        renders[path] = files
+        name = os.path.splitext(os.path.relpath(path, args.maps_dir))[0].replace(os.sep, "_")
+        for scale, cached in files.items():
+            shutil.copyfile(cached, os.path.join(args.output_dir, f"{name}_{scale_name(scale)}.png"))
+        with Image.open(files[scales[0]]) as image:
+            size = f"{image.width * scales[0]}x{image.height * scales[0]}"
+        print(f"  {name}: {size} ({'cached' if hit else f'rendered in {seconds:.2f}s'})")
+
+    for scale in world_scales:
+        output_path = os.path.join(args.output_dir, f"world_{scale_name(scale)}.png")
+        width, height = render_world(args.maps_dir, renders, scale, output_path)
+        print(f"  World overview {scale_name(scale)}: {width}x{height} -> {output_path}")
+
+    rendered = sum(1 for result in results if not result[2])
+    print(f"{len(paths)} maps ({rendered} rendered, {len(paths) - rendered} cached) "
+          f"in {time.perf_counter() - start:.2f}s -> {args.output_dir}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())